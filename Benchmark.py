@@ -0,0 +1,200 @@
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from QueryProcessor import DEFAULT_JOIN_MEMORY_LIMIT, QueryProcessor
+from qp_helper.bulk_insert import parse_insert
+from qp_helper.condition_adapter import NormalizedCondition
+from qp_helper.external_sort import estimate_row_size
+from qp_helper.parallel import WorkerPool
+
+# benchmark operator-operator QueryProcessor tanpa storage manager / optimizer beneran
+# jalanin: python Benchmark.py [nama_benchmark ...] [--rows N]
+
+
+def _bare_query_processor() -> QueryProcessor:
+    # operator join/sort/dll ga nyentuh dependency, jadi cukup diisi None
+    return QueryProcessor(
+        optimization_engine=None,
+        storage_manager=None,
+        data_retrieval_factory=None,
+        data_write_factory=None,
+        condition_factory=None,
+        schema_factory=None,
+    )
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def bench_range_join(rows: int = 10_000):
+    print("\n" + "="*60)
+    print(f"BENCH: THETA_JOIN a < b, {rows} x {rows} rows")
+    print("="*60)
+
+    qp = _bare_query_processor()
+    # b digeser supaya output kecil (~1.2k pasangan) dan yang diukur cost join-nya, bukan output
+    left = [{"a": i, "l": i} for i in range(rows)]
+    right = [{"b": i - rows + 50, "r": i} for i in range(rows)]
+
+    range_count, range_time = _timed(lambda: sum(1 for _ in qp._range_theta_join(iter(left), right, "a", "<", "b")))
+    print(f"range join  : {range_count} rows in {range_time:.3f}s")
+
+    nested_count, nested_time = _timed(lambda: sum(1 for _ in qp._nested_loop_join(iter(left), right, "a", "<", "b")))
+    print(f"nested loop : {nested_count} rows in {nested_time:.3f}s")
+
+    assert range_count == nested_count, "Range join should match nested loop"
+    print(f"speedup     : {nested_time / max(range_time, 1e-9):.1f}x")
+
+
+def bench_external_sort(rows: int = 200_000):
+    print("\n" + "="*60)
+    print(f"BENCH: ORDER BY GPA DESC, StudentID ASC on {rows} rows")
+    print("="*60)
+
+    qp = _bare_query_processor()
+    rng = random.Random(42)
+    data = [{"StudentID": i, "FullName": f"Student {i}", "GPA": round(rng.uniform(0, 4), 2)} for i in range(rows)]
+    order_by = [
+        SimpleNamespace(column=SimpleNamespace(column="GPA"), direction="DESC"),
+        SimpleNamespace(column=SimpleNamespace(column="StudentID"), direction="ASC"),
+    ]
+    data_bytes = sum(estimate_row_size(row) for row in data)
+    print(f"estimated input size: {data_bytes / 1024 / 1024:.1f} MiB")
+
+    expected = None
+    # budget >= ukuran data -> in-memory, makin kecil budget makin banyak run yang di-spill
+    for fraction in (2, 1, 1 / 2, 1 / 8, 1 / 32, 1 / 128):
+        qp.sort_memory_limit = max(1, int(data_bytes * fraction))
+        result, elapsed = _timed(lambda: list(qp._apply_sort(iter(data), order_by)))
+        mode = "in-memory" if fraction > 1 else "spill"
+        print(f"budget {qp.sort_memory_limit / 1024 / 1024:8.2f} MiB ({fraction:>7.1%} of input, {mode:>9}): {elapsed:.3f}s")
+        if expected is None:
+            expected = result
+        assert result == expected, "Spilled sort should match in-memory sort"
+
+
+def bench_bulk_insert(rows: int = 10_000):
+    print("\n" + "="*60)
+    print(f"BENCH: INSERT {rows} rows as 1 / 100 / {rows}-row statements")
+    print("="*60)
+
+    # storage manager palsu: cuma ngitung panggilan write_block dan row yang diterima
+    calls = {"write_block": 0, "rows": 0}
+
+    def write_block(data_write):
+        written = len(data_write.new_value) if isinstance(data_write.new_value, list) else 1
+        calls["write_block"] += 1
+        calls["rows"] += written
+        return written
+
+    schema = SimpleNamespace(get_attributes=lambda: [("StudentID", "int"), ("FullName", "varchar"), ("GPA", "float")])
+    qp = _bare_query_processor()
+    qp.storage_manager = SimpleNamespace(
+        write_block=write_block,
+        schema_manager=SimpleNamespace(get_table_schema=lambda table: schema),
+        # ngiklanin write_block multi-row, tanpa ini QP nulis satu row per write_block
+        supports_batch_write=True,
+    )
+    qp._data_write_factory = lambda **kwargs: SimpleNamespace(**kwargs)
+
+    values = [f"({i}, 'Student {i}', {i % 400 / 100})" for i in range(rows)]
+    for batch_size in (1, 100, rows):
+        statements = [
+            "INSERT INTO Student (StudentID, FullName, GPA) VALUES " + ", ".join(values[start:start + batch_size]) + ";"
+            for start in range(0, rows, batch_size)
+        ]
+        calls.update(write_block=0, rows=0)
+        # parse + validasi + write lewat jalur batch (jalur yang sama dengan execute_insert)
+        _, elapsed = _timed(lambda: [qp._execute_insert_batch(parse_insert(statement)) for statement in statements])
+        assert calls["rows"] == rows, "Every row should reach write_block"
+        print(f"{batch_size:>6} rows/statement: {len(statements):>6} statements, {calls['write_block']:>6} write_block calls, "
+              f"{elapsed:.3f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+def bench_parallel_scan(rows: int = 1_000_000):
+    print("\n" + "="*60)
+    print(f"BENCH: SIGMA over TABLE, {rows} rows, 1-8 workers ({os.cpu_count()} CPUs)")
+    print("="*60)
+
+    rng = random.Random(42)
+    data = [{"StudentID": i, "FullName": f"Student {i}", "GPA": round(rng.uniform(0, 4), 2)} for i in range(rows)]
+    qp = _bare_query_processor()
+    qp.parallel_threshold = 0
+    qp._fetch_table_data = lambda table, conditions=None, columns=None: SimpleNamespace(data=data)
+    # kondisi string (tanpa schema) -> ga bisa di-push ke storage, jadi di-filter di QP
+    conditions = ["GPA > 3.5", "FullName != 'Student 7'"]
+    filters = [(NormalizedCondition.normalize(condition), None) for condition in reversed(conditions)]
+
+    expected, serial_time = _timed(lambda: list(qp._apply_filters_serial(data, filters)))
+    print(f" serial   : {len(expected)} rows in {serial_time:.3f}s")
+
+    for mode in ("process", "thread"):
+        for degree in (1, 2, 4, 8):
+            qp.worker_pool = WorkerPool(degree, mode)
+            # pool dibikin dulu supaya waktu start worker ga ikut keukur
+            qp.worker_pool.executor.submit(int).result()
+            result, elapsed = _timed(lambda: list(qp._parallel_selection("Student", [], None, conditions, None)))
+            qp.worker_pool.shutdown()
+            print(f"{mode:>7} x{degree}: {len(result)} rows in {elapsed:.3f}s ({serial_time / max(elapsed, 1e-9):.2f}x)")
+            assert result == expected, "Parallel filter should match serial filter"
+
+
+def bench_parallel_join(rows: int = 500_000):
+    print("\n" + "="*60)
+    print(f"BENCH: JOIN a = b, {rows} x {rows // 5} rows, serial vs 2-8 workers ({os.cpu_count()} CPUs)")
+    print("="*60)
+
+    rng = random.Random(7)
+    left = [{"a": rng.randrange(rows // 5), "l": i} for i in range(rows)]
+    right = [{"b": i, "r": f"right {i}"} for i in range(rows // 5)]
+    qp = _bare_query_processor()
+    qp.parallel_threshold = 0
+
+    expected, serial_time = _timed(lambda: list(qp._hash_theta_join(iter(left), right, "a", "b")))
+    print(f"       serial: {len(expected)} rows in {serial_time:.3f}s")
+    expected.sort(key=lambda row: row["l"])
+
+    # degree 1 ga dijalanin: QP pakai hash join serial kalau degree <= 1, sama dengan baris serial di atas.
+    # run terakhir pakai budget kecil supaya jalur spill ke disk ikut keukur
+    runs = [(degree, DEFAULT_JOIN_MEMORY_LIMIT) for degree in (2, 4, 8)] + [(4, 4 * 1024 * 1024)]
+    for degree, memory_limit in runs:
+        qp.worker_pool = WorkerPool(degree, "process")
+        qp.join_memory_limit = memory_limit
+        qp.worker_pool.executor.submit(int).result()
+        result, elapsed = _timed(lambda: list(qp._hash_theta_join(iter(left), right, "a", "b")))
+        qp.worker_pool.shutdown()
+        label = f"process x{degree}" + (" spill" if memory_limit < DEFAULT_JOIN_MEMORY_LIMIT else "")
+        print(f"{label:>13}: {len(result)} rows in {elapsed:.3f}s ({serial_time / max(elapsed, 1e-9):.2f}x)")
+        # urutan hasil join paralel ikut urutan partisi, jadi dibandingin setelah di-sort
+        assert sorted(result, key=lambda row: row["l"]) == expected, "Parallel join should match serial hash join"
+
+
+BENCHMARKS = {
+    "range_join": bench_range_join,
+    "external_sort": bench_external_sort,
+    "bulk_insert": bench_bulk_insert,
+    "parallel_scan": bench_parallel_scan,
+    "parallel_join": bench_parallel_join,
+}
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    rows = None
+    if "--rows" in args:
+        idx = args.index("--rows")
+        rows = int(args[idx + 1])
+        del args[idx:idx + 2]
+
+    for name in args or list(BENCHMARKS):
+        bench = BENCHMARKS[name]
+        if rows is None:
+            bench()
+        else:
+            bench(rows)
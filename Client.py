@@ -1,40 +1,167 @@
 import socket
 import json
-from typing import Dict, Any
+import sys
+import time
+from typing import BinaryIO, Dict, Any, List
+
+from qp_helper.query_utils import split_statements
+from qp_helper.wire_protocol import FRAME_BATCH, FRAME_HEADER, FRAME_TRAILER, decode_rows, read_frame
 
 # Define the server details
 HOST = '127.0.0.1'  # Server is running locally
 PORT = 2345
 
-def receive_full_response(sock: socket.socket) -> bytes:
+# jumlah statement yang dikirim sekaligus sebelum nunggu response-nya (mode --file)
+PIPELINE_WINDOW = 500
+
+def receive_full_response(reader: BinaryIO) -> bytes:
     """
-    Receives data from the socket until a newline delimiter is found.
-    This is necessary because TCP streams can fragment messages.
+    Receives data until a newline delimiter is found.
+    Reader-nya buffered (socket.makefile), jadi response berikutnya yang udah
+    kebaca (pipelining) ga ikut kebuang.
     """
-    buffer = b""
+    return reader.readline()
+
+def recv_exactly(reader: BinaryIO, size: int) -> bytes:
+    """Receive exactly `size` bytes (dipakai buat baca frame protokol binary)."""
+    data = reader.read(size)
+    if len(data) < size:
+        raise ConnectionError("Server closed connection")
+    return data
+
+def receive_binary_result(reader: BinaryIO, quiet: bool = False) -> Dict[str, Any]:
+    """
+    Receive one result in binary protocol (HEADER, BATCH..., TRAILER), return isi TRAILER.
+    Row ditampilkan per batch begitu sampai, ga nunggu seluruh result.
+    """
+    columns = None
+    rows_shown = 0
+    if not quiet:
+        print("-" * 30)
     while True:
-        # Receive data in chunks
-        chunk = sock.recv(4096)
-        if not chunk:
-            # Server closed the connection
-            return buffer
-        buffer += chunk
-        
-        # Check for the message delimiter (the '\n' added by the server)
-        if b'\n' in buffer:
-            return buffer
-        
+        kind, payload = read_frame(lambda size: recv_exactly(reader, size))
+        if kind == FRAME_TRAILER:
+            if not quiet:
+                print(f"Status Message: {payload.get('message')}")
+                print(f"Transaction ID: {payload.get('transaction_id')}")
+                if payload.get("data") is not None:
+                    print(f"Data Received (Affected Rows/Result Code): {payload['data']}")
+                else:
+                    print(f"Data Received: {payload.get('rows_count')} rows")
+            return payload
+        if quiet:
+            continue
+        if kind == FRAME_HEADER:
+            columns = payload.get("columns")
+            print(f"Query #{payload.get('statement_id')}: {payload.get('query')}")
+            if columns:
+                print(f"Columns: {columns}")
+        elif kind == FRAME_BATCH:
+            rows = decode_rows(payload, columns)
+            if rows_shown == 0 and rows:
+                print(f"  First Row: {rows[0]}")
+            rows_shown += len(rows)
+            print(f"  ... {rows_shown} rows received")
+
+def receive_json_result(reader: BinaryIO, quiet: bool = False) -> Dict[str, Any] | None:
+    """Receive one JSON-line result, return dict-nya (None kalau koneksi ditutup server)."""
+    # Separate the JSON string from the newline delimiter
+    json_string = receive_full_response(reader).decode('utf-8').strip()
+    if not json_string:
+        return None
+
+    # deserialize into json
+    try:
+        result_dict: Dict[str, Any] = json.loads(json_string)
+    except json.JSONDecodeError:
+        print(f"Error decoding JSON response: {json_string[:50]}...")
+        return {}
+
+    if not quiet:
+        # display result
+        print("-" * 30)
+        print(f"Query #{result_dict.get('statement_id')}: {result_dict.get('query')}")
+        print(f"Status Message: {result_dict.get('message')}")
+        print(f"Transaction ID: {result_dict.get('transaction_id')}")
+
+        data = result_dict.get('data')
+        if isinstance(data, dict) and data.get('type') == 'Rows':
+            print(f"Data Received: {data['rows_count']} rows")
+            # Display the first row as an example
+            if data['data']:
+                print(f"  First Row: {data['data'][0]}")
+        elif isinstance(data, int):
+            print(f"Data Received (Affected Rows/Result Code): {data}")
+    return result_dict
+
+def receive_result(reader: BinaryIO, use_binary: bool, quiet: bool = False) -> Dict[str, Any] | None:
+    if use_binary:
+        return receive_binary_result(reader, quiet)
+    return receive_json_result(reader, quiet)
+
+def statements_before_quit(statements: List[str]) -> List[str]:
+    """Server berhenti di QUIT / EXIT, jadi statement setelahnya ga dapat response"""
+    for index, statement in enumerate(statements):
+        if statement.rstrip(";").strip().upper() in ["QUIT", "EXIT"]:
+            return statements[:index]
+    return statements
+
+def run_script(client_socket: socket.socket, reader: BinaryIO, path: str, use_binary: bool) -> None:
+    """
+    Jalankan file SQL (statement dipisah ';') dengan pipelining: PIPELINE_WINDOW statement
+    dikirim dalam satu baris batch, lalu response-nya dibaca, jadi 10k INSERT cuma butuh ~20 round trip.
+    """
+    with open(path, encoding='utf-8') as script:
+        statements = statements_before_quit(split_statements(script.read()))
+
+    errors = 0
+    round_trips = 0
+    started = time.perf_counter()
+    for offset in range(0, len(statements), PIPELINE_WINDOW):
+        window = statements[offset:offset + PIPELINE_WINDOW]
+        # satu batch = satu baris, newline di dalam statement diganti spasi
+        batch = " ".join(statement.replace("\n", " ") for statement in window)
+        client_socket.sendall((batch + "\n").encode('utf-8'))
+        round_trips += 1
+        for _ in window:
+            result = receive_result(reader, use_binary, quiet=True)
+            if result is None:
+                raise ConnectionError("Server closed connection")
+            message = result.get('message') or ""
+            if message.startswith("Error"):
+                errors += 1
+                print(f"Statement #{result.get('statement_id')} failed: {message}")
+
+    elapsed = time.perf_counter() - started
+    rate = len(statements) / elapsed if elapsed > 0 else 0.0
+    print(f"Executed {len(statements)} statements in {elapsed:.2f}s ({rate:.0f} stmt/s, {round_trips} round trips, {errors} errors)")
+
 def start_client():
+    # default pakai protokol binary (row di-stream per batch); --json buat mode kompatibilitas
+    args = sys.argv[1:]
+    use_binary = "--json" not in args
+    script_path = args[args.index("--file") + 1] if "--file" in args[:-1] else None
+
     client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     
     try:
         print(f"Attempting to connect to {HOST}:{PORT}...")
         client_socket.connect((HOST, PORT))
         print("Connection successful.")
+        reader = client_socket.makefile('rb')
 
         # 1. Receive initial greeting message from server
-        greeting_bytes = client_socket.recv(1024)
-        print(f"Server Greeting: {greeting_bytes.decode('utf-8')}")
+        greeting_bytes = receive_full_response(reader)
+        print(f"Server Greeting: {greeting_bytes.decode('utf-8').strip()}")
+
+        if use_binary:
+            # response SET PROTOCOL masih dalam format JSON, setelah itu semua result berupa frame
+            client_socket.sendall(b"SET PROTOCOL BINARY\n")
+            receive_full_response(reader)
+
+        if script_path is not None:
+            run_script(client_socket, reader, script_path, use_binary)
+            return
 
         while True:
             # Get user input for the query
@@ -42,43 +169,22 @@ def start_client():
             
             if query.upper() in ["QUIT", "EXIT"]:
                 print("Closing connection...")
-                client_socket.sendall(query.encode('utf-8'))
+                client_socket.sendall((query + "\n").encode('utf-8'))
                 break 
 
-            # 2. Send the query to the server
-            client_socket.sendall(query.encode('utf-8'))
-
-            # 3. Receive the full serialized ExecutionResult bytes
-            response_bytes_with_newline = receive_full_response(client_socket)
+            # 2. Send the query to the server (satu baris, boleh batch "stmt1; stmt2; ...")
+            statements = split_statements(query)
+            client_socket.sendall((query + "\n").encode('utf-8'))
 
-            # Separate the JSON string from the newline delimiter
-            json_string = response_bytes_with_newline.decode('utf-8').strip()
-            
-            if not json_string:
-                print("Server closed connection or sent empty response.")
+            # 3. Receive satu response per statement, urut sesuai statement_id
+            closed = False
+            for _ in statements_before_quit(statements):
+                if receive_result(reader, use_binary) is None:
+                    closed = True
+                    break
+            if closed or len(statements_before_quit(statements)) < len(statements):
+                print("Server closed connection.")
                 break
-
-            # deserialize into json
-            try:
-                result_dict: Dict[str, Any] = json.loads(json_string)
-                
-                # display result
-                print("-" * 30)
-                print(f"Query: {result_dict.get('query')}")
-                print(f"Status Message: {result_dict.get('message')}")
-                print(f"Transaction ID: {result_dict.get('transaction_id')}")
-                
-                data = result_dict.get('data')
-                if isinstance(data, dict) and data.get('type') == 'Rows':
-                    print(f"Data Received: {data['rows_count']} rows")
-                    # Display the first row as an example
-                    if data['data']:
-                        print(f"  First Row: {data['data'][0]}")
-                elif isinstance(data, int):
-                    print(f"Data Received (Affected Rows/Result Code): {data}")
-                
-            except json.JSONDecodeError:
-                print(f"Error decoding JSON response: {json_string[:50]}...")
                 
     except ConnectionRefusedError:
         print("Connection refused. Make sure the server is running on the correct host and port.")
@@ -89,4 +195,4 @@ def start_client():
         client_socket.close()
 
 if __name__ == '__main__':
-    start_client()
\ No newline at end of file
+    start_client()
@@ -1,14 +1,35 @@
 from datetime import datetime
 import uuid
 
-from typing import Any, Callable, Union, List, cast
+from typing import IO, Any, Callable, Iterable, Iterator, Union, List, cast
+from itertools import chain, islice
 import re
 import os
 
 from qp_model.ExecutionResult import ExecutionResult
 from qp_model.Rows import Rows
+from qp_model.PreparedStatement import PreparedStatement
 from qp_helper.query_utils import *
 from qp_helper.condition_adapter import NormalizedCondition
+from qp_helper.aggregate import group_columns, hash_aggregate, parse_aggregate, sorted_aggregate
+from qp_helper.sort_utils import order_by_key, top_n
+from qp_helper.external_sort import external_sort
+from qp_helper.plan_cache import PlanCache, plan_fingerprint
+from qp_helper.result_cache import ResultCache
+from qp_helper.buffer_cache import BufferCache
+from qp_helper.bulk_insert import InsertBatch, build_rows, chunked, convert_row, parse_insert, resolve_columns
+from qp_helper.csv_loader import CopyProgress, csv_records, iter_chunks, parse_copy, progress_printer, resolve_copy_path
+from qp_helper.parallel import WorkerPool, parallel_filter
+from qp_helper.parallel_join import JoinSpec, parallel_hash_join
+from qp_helper.query_profile import QueryProfile, is_profiling, parse_explain, record_storage_read
+from qp_helper.query_stats import QueryStats, begin_query, current_query, end_query, timed_phase
+from qp_helper.slow_query_log import SlowQueryEntry, SlowQueryLog, peak_rss_bytes
+from qp_helper.prepared import bind_parameters, find_parameter_slots, replace_placeholders
+from qp_helper.predicate import COMPARATORS, compile_selection
+from qp_helper.column_pruning import ScanPlan, plan_scan_columns, projection_columns
+from qp_helper.schema_utils import NUMERIC_TYPES, coerce_literal, get_column_types
+from qp_helper.storage_capabilities import BATCH_WRITE, MULTI_COLUMN_WRITE, supports
+from qp_helper.join_strategies import RANGE_OPERATORS, SKIP_ROW, hash_join, range_join
 
 
 from MariaDanB_API.IStorageManager import IStorageManager 
@@ -19,6 +40,32 @@ from MariaDanB_API.ISchema import ISchema
 from MariaDanB_API.IOptimizationEngine import IOptimizationEngine
 from MariaDanB_API.IQueryTree import IQueryTree as QueryTree
 
+# memory budget SORT sebelum spill ke disk (byte, estimasi)
+DEFAULT_SORT_MEMORY_LIMIT = 64 * 1024 * 1024
+# jumlah query plan yang disimpan di plan cache (0 = plan cache mati)
+DEFAULT_PLAN_CACHE_SIZE = 256
+# budget byte result cache SELECT (0 = result cache mati)
+DEFAULT_RESULT_CACHE_BYTES = 0
+# budget byte buffer cache hasil read_block (0 = buffer cache mati)
+DEFAULT_BUFFER_CACHE_BYTES = 0
+# jumlah row per chunk multi-row INSERT / COPY; satu write_block per chunk kalau storage manager supports_batch_write
+DEFAULT_INSERT_BATCH_ROWS = 1000
+# jumlah worker scan/filter paralel (1 = selalu serial) dan jenis pool-nya ("process" / "thread")
+DEFAULT_PARALLEL_DEGREE = 1
+DEFAULT_PARALLEL_MODE = "process"
+# jumlah row hasil scan minimal sebelum filter-nya dijalanin paralel
+DEFAULT_PARALLEL_THRESHOLD = 100_000
+# budget byte buffer partisi join paralel sebelum partisi di-spill ke disk. cuma buffer partisi yang dihitung:
+# input kanan join udah di-materialize jadi list sebelum join, jadi memory-nya di luar budget ini
+DEFAULT_JOIN_MEMORY_LIMIT = 64 * 1024 * 1024
+# direktori file yang boleh dibaca COPY ... FROM 'file' lewat SQL (None = COPY dari file dimatikan)
+DEFAULT_COPY_DIRECTORY = None
+# query yang lebih lama dari ini (detik) dicatat di slow query log (None = slow query log mati)
+DEFAULT_SLOW_QUERY_THRESHOLD = None
+DEFAULT_SLOW_QUERY_LOG_PATH = "slow_query.log"
+# ukuran file slow query log sebelum di-rotate
+DEFAULT_SLOW_QUERY_LOG_MAX_BYTES = 64 * 1024 * 1024
+
 class QueryProcessor:
     def __init__(
         self,
@@ -28,6 +75,19 @@ class QueryProcessor:
         data_write_factory: Callable[..., IDataWrite],
         condition_factory: Callable[..., ICondition],
         schema_factory: Callable[[], ISchema],
+        sort_memory_limit: int = DEFAULT_SORT_MEMORY_LIMIT,
+        plan_cache_size: int = DEFAULT_PLAN_CACHE_SIZE,
+        result_cache_bytes: int = DEFAULT_RESULT_CACHE_BYTES,
+        buffer_cache_bytes: int = DEFAULT_BUFFER_CACHE_BYTES,
+        insert_batch_rows: int = DEFAULT_INSERT_BATCH_ROWS,
+        parallel_degree: int = DEFAULT_PARALLEL_DEGREE,
+        parallel_threshold: int = DEFAULT_PARALLEL_THRESHOLD,
+        parallel_mode: str = DEFAULT_PARALLEL_MODE,
+        join_memory_limit: int = DEFAULT_JOIN_MEMORY_LIMIT,
+        slow_query_threshold: float | None = DEFAULT_SLOW_QUERY_THRESHOLD,
+        slow_query_log_path: str = DEFAULT_SLOW_QUERY_LOG_PATH,
+        slow_query_log_max_bytes: int = DEFAULT_SLOW_QUERY_LOG_MAX_BYTES,
+        copy_directory: str | None = DEFAULT_COPY_DIRECTORY,
     ) -> None:
         self.optimization_engine = optimization_engine
         self.storage_manager = storage_manager
@@ -37,8 +97,37 @@ class QueryProcessor:
         self._schema_factory = schema_factory
         self._transaction_active = False
         self._transaction_changes: list = []
-
+        self.sort_memory_limit = sort_memory_limit
+        self.plan_cache = PlanCache(plan_cache_size)
+        self.result_cache = ResultCache(result_cache_bytes) if result_cache_bytes > 0 else None
+        self.buffer_cache = BufferCache(buffer_cache_bytes) if buffer_cache_bytes > 0 else None
+        self.insert_batch_rows = insert_batch_rows
+        self.parallel_threshold = parallel_threshold
+        self.worker_pool = WorkerPool(parallel_degree, parallel_mode)
+        self.join_memory_limit = join_memory_limit
+        self.copy_directory = copy_directory
+        self.slow_query_log = (
+            SlowQueryLog(slow_query_log_path, slow_query_threshold, max_bytes=slow_query_log_max_bytes)
+            if slow_query_threshold is not None else None
+        )
+
+    # kalau caller (misal server) belum nge-track query ini, QueryStats-nya dibikin di sini;
+    # query yang lebih lama dari slow_query_threshold dikirim ke slow query log
     def execute_query(self, query : str) -> ExecutionResult:
+        stats = current_query()
+        owned = stats is None
+        if owned:
+            stats = begin_query()
+        try:
+            result = self._execute_query(query)
+        finally:
+            if owned:
+                end_query(stats)
+        rows_returned = result.data.rows_count if isinstance(result.data, Rows) else 0
+        self.log_if_slow(query, stats, rows_returned, isinstance(result.data, int) and result.data == -1)
+        return result
+
+    def _execute_query(self, query : str) -> ExecutionResult:
 
         transaction_uuid = uuid.uuid4()
         transaction_id = cast(int, transaction_uuid.int)
@@ -69,6 +158,12 @@ class QueryProcessor:
             elif query_type == QueryType.DROP_TABLE:
                 result_data = self.execute_drop_table(query)
 
+            elif query_type == QueryType.COPY:
+                result_data = self.execute_copy(query)
+
+            elif query_type == QueryType.EXPLAIN:
+                result_data = self.execute_explain(query)
+
             elif query_type == QueryType.BEGIN_TRANSACTION:
                 result_data =  self.execute_begin_transaction(query)
             
@@ -95,17 +190,81 @@ class QueryProcessor:
             print(f"Error processing query: {e}")
             return ExecutionResult(transaction_id=transaction_id, timestamp=datetime.now(), message="Error occured when processing query", data=-1, query=query)
 
+    # prepare query dengan placeholder "?" (SELECT / UPDATE / DELETE):
+    # parse + optimize sekali, posisi placeholder di query tree dicatat di handle
+    def prepare(self, query: str) -> PreparedStatement:
+        query_type = get_query_type(query)
+        if query_type not in (QueryType.SELECT, QueryType.UPDATE, QueryType.DELETE):
+            raise ValueError(f"PREPARE only supports SELECT, UPDATE and DELETE (got {query_type.name})")
+        
+        marked_query, param_count = replace_placeholders(query)
+        parsed_query = self._get_query_plan(marked_query, optimize=query_type == QueryType.SELECT)
+        if parsed_query.query_tree is None:
+            raise ValueError("PREPARE failed - optimizer produced empty query tree")
+        
+        slots = find_parameter_slots(parsed_query.query_tree)
+        missing = set(range(param_count)) - {slot.param_index for slot in slots}
+        if missing:
+            raise ValueError(f"PREPARE failed - placeholder {sorted(missing)} is not in a WHERE condition or SET value")
+        
+        return PreparedStatement(
+            statement_id=uuid.uuid4().hex,
+            query=query,
+            query_type=query_type,
+            param_count=param_count,
+            parsed_query=parsed_query,
+            slots=slots,
+        )
+
+    # execute prepared statement: value parameter dipasang ke copy query tree, tanpa parse / optimize ulang
+    # instrumentasi sama dengan execute_query (QueryStats + slow query log)
+    def execute(self, statement: PreparedStatement, params: Union[list, tuple] = ()) -> ExecutionResult:
+        stats = current_query()
+        owned = stats is None
+        if owned:
+            stats = begin_query()
+        try:
+            stats.plan = statement.parsed_query.query_tree
+            result = self._execute_prepared(statement, params)
+        finally:
+            if owned:
+                end_query(stats)
+        rows_returned = result.data.rows_count if isinstance(result.data, Rows) else 0
+        self.log_if_slow(statement.query, stats, rows_returned, isinstance(result.data, int) and result.data == -1)
+        return result
+
+    def _execute_prepared(self, statement: PreparedStatement, params: Union[list, tuple]) -> ExecutionResult:
+        transaction_id = cast(int, uuid.uuid4().int)
+        
+        if len(params) != statement.param_count:
+            return ExecutionResult(transaction_id=transaction_id, timestamp=datetime.now(), message=f"Error: expected {statement.param_count} parameters, got {len(params)}", data=-1, query=statement.query)
+        
+        try:
+            query_tree = bind_parameters(statement.parsed_query.query_tree, statement.slots, params)
+            
+            if statement.query_type == QueryType.SELECT:
+                result_data = self._execute_select_tree(query_tree)
+            elif statement.query_type == QueryType.UPDATE:
+                result_data = Rows.from_list([f"Updated {self._execute_update_tree(query_tree)} rows"])
+            else:
+                result_data = self._execute_delete_tree(query_tree)
+            
+            return ExecutionResult(transaction_id=transaction_id, timestamp=datetime.now(), message="Success", data=result_data, query=statement.query)
+        
+        except Exception as e:
+            print(f"Error executing prepared statement: {e}")
+            return ExecutionResult(transaction_id=transaction_id, timestamp=datetime.now(), message="Error occured when processing query", data=-1, query=statement.query)
+
     # execute SELECT query:
     # 1. parse query menggunakan query optimizer
     # 2. optimize query tree
     # 3. execute query tree dan retrieve data dari storage manager
     def execute_select(self, query: str) -> Union[Rows, int]:
         try:
-            parsed_query = self.optimization_engine.parse_query(query)
-            optimized_query = self.optimization_engine.optimize_query(parsed_query)
+            optimized_query = self._get_query_plan(query, optimize=True)
             if optimized_query.query_tree is None:
                 return Rows.from_list(["SELECT parsing failed - optimizer produced empty query tree"])
-            result_data = self._execute_query_tree(optimized_query.query_tree)
+            result_data = self._execute_select_tree(optimized_query.query_tree)
             
             return result_data
             
@@ -119,7 +278,7 @@ class QueryProcessor:
     # 3. execute update via storage manager
     def execute_update(self, query: str) -> Union[Rows, int]:
         try:
-            parsed_query = self.optimization_engine.parse_query(query)
+            parsed_query = self._get_query_plan(query, optimize=False)
             if parsed_query.query_tree is None:
                 return Rows.from_list(["UPDATE parsing failed - optimizer produced empty query tree"])
             result = self._execute_update_tree(parsed_query.query_tree)
@@ -130,50 +289,217 @@ class QueryProcessor:
             print(f"Error executing UPDATE query: {e}")
             return -1
 
-    # recursively execute query tree untuk SELECT operations
-    # traverse dari root ke leaf (TABLE node) dan apply operations saat return
+    # EXPLAIN: query tree (hasil optimize untuk SELECT) sebagai Rows, satu row per node.
+    # EXPLAIN ANALYZE (cuma SELECT): query dijalanin sampai habis tanpa result cache / buffer cache, tiap node
+    # dapat wall time, rows in/out, dan storage call/bytes. row hasil query-nya sendiri dibuang
+    def execute_explain(self, query: str) -> Union[Rows, int]:
+        try:
+            parsed = parse_explain(query)
+            if parsed is None:
+                return Rows.from_list(["EXPLAIN failed - expected EXPLAIN [ANALYZE] <query>"])
+            analyze, inner_query = parsed
+            inner_type = get_query_type(inner_query)
+            if inner_type not in (QueryType.SELECT, QueryType.UPDATE, QueryType.DELETE):
+                return Rows.from_list([f"EXPLAIN failed - unsupported query type {inner_type.name}"])
+            if analyze and inner_type != QueryType.SELECT:
+                return Rows.from_list(["EXPLAIN ANALYZE failed - only SELECT can be analyzed"])
+            
+            plan = self._get_query_plan(inner_query, optimize=inner_type == QueryType.SELECT)
+            if plan.query_tree is None:
+                return Rows.from_list(["EXPLAIN failed - optimizer produced empty query tree"])
+            
+            profile = QueryProfile(plan.query_tree)
+            if analyze:
+                scan_plan = plan_scan_columns(plan.query_tree, self._get_column_types)
+                for _ in self._iter_query_tree(plan.query_tree, scan_plan, profile):
+                    pass
+            return Rows.from_list(profile.rows(analyze))
+        
+        except Exception as e:
+            print(f"Error executing EXPLAIN query: {e}")
+            return -1
+
+    # parse (dan optimize untuk SELECT) lewat plan cache, query yang sama ga di-parse ulang
+    # plan yang di-cache di-share antar eksekusi, jadi query tree-nya ga boleh dimutasi
+    def _get_query_plan(self, query: str, optimize: bool) -> Any:
+        kind = "optimized" if optimize else "parsed"
+        cached = self.plan_cache.get(kind, query)
+        if cached is not None:
+            self._note_plan(cached)
+            return cached
+        
+        with timed_phase("parse"):
+            parsed_query = self.optimization_engine.parse_query(query)
+        if optimize:
+            with timed_phase("optimize"):
+                parsed_query = self.optimization_engine.optimize_query(parsed_query)
+        
+        if parsed_query.query_tree is not None:
+            self.plan_cache.put(kind, query, parsed_query, self._tree_tables(parsed_query.query_tree))
+        self._note_plan(parsed_query)
+        return parsed_query
+
+    # simpan plan di QueryStats query yang lagi jalan (buat slow query log)
+    def _note_plan(self, parsed_query: Any) -> None:
+        stats = current_query()
+        if stats is not None:
+            stats.plan = parsed_query.query_tree
+
+    # kirim query ke slow query log kalau durasinya >= threshold. entry cuma dibikin untuk query lambat
+    # dan di-format + ditulis di thread writer, jadi query cepat cuma bayar satu perbandingan
+    def log_if_slow(self, query: str, stats: QueryStats, rows_returned: int, error: bool = False) -> None:
+        if self.slow_query_log is None:
+            return
+        duration = stats.elapsed()
+        if not self.slow_query_log.is_slow(duration):
+            return
+        self.slow_query_log.submit(SlowQueryEntry(
+            query=query.strip(),
+            duration=duration,
+            phases=dict(stats.phases),
+            rows_scanned=stats.rows_scanned,
+            rows_returned=rows_returned,
+            plan=stats.plan,
+            error=error,
+            peak_memory=peak_rss_bytes(),
+        ))
+
+    # nama semua tabel (TABLE leaf) di query tree
+    def _tree_tables(self, node: QueryTree) -> set:
+        tables = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current is None:
+                continue
+            if current.type == "TABLE":
+                tables.add(self._table_name(current.val))
+            stack.extend(current.childs or [])
+        return tables
+
+    # SELECT versi streaming: return iterator row yang di-pull langsung dari pipeline,
+    # jadi caller (misal server protokol binary) bisa ngirim row sebelum query selesai.
+    # beda dengan execute_select, error parse di-raise ke caller.
+    # use_result_cache=False buat consumer yang baca sebagian-sebagian (cursor), supaya row ga ikut ditampung
+    def stream_select(self, query: str, use_result_cache: bool = True) -> Iterator[Any]:
+        optimized_query = self._get_query_plan(query, optimize=True)
+        if optimized_query.query_tree is None:
+            raise ValueError("SELECT parsing failed - optimizer produced empty query tree")
+        return self._stream_select_tree(optimized_query.query_tree, use_result_cache)
+
+    def _execute_select_tree(self, query_tree: QueryTree) -> Rows:
+        return Rows.from_list(list(self._stream_select_tree(query_tree)))
+
+    # SELECT lewat result cache (kalau aktif): key-nya fingerprint plan, versi tabel di-snapshot
+    # sebelum eksekusi supaya hasil yang kebaca barengan sama write ga ikut disimpan.
+    # hasil cuma disimpan kalau iterator-nya dihabisin sampai akhir
+    def _stream_select_tree(self, query_tree: QueryTree, use_result_cache: bool = True) -> Iterator[Any]:
+        if self.result_cache is None or not use_result_cache:
+            yield from self._iter_query_tree(query_tree, plan_scan_columns(query_tree, self._get_column_types))
+            return
+        
+        fingerprint = plan_fingerprint(query_tree)
+        cached_rows = self.result_cache.get(fingerprint)
+        if cached_rows is not None:
+            yield from cached_rows
+            return
+        
+        versions = self.result_cache.snapshot(self._tree_tables(query_tree))
+        rows = []
+        for row in self._iter_query_tree(query_tree, plan_scan_columns(query_tree, self._get_column_types)):
+            # copy disimpan sebelum row di-yield, caller bisa aja langsung mutasi row-nya
+            rows.append(dict(row) if isinstance(row, dict) else row)
+            yield row
+        self.result_cache.put(fingerprint, versions, rows)
+
+    # dipanggil setelah QP nulis ke tabel (UPDATE / INSERT / DELETE / DDL) supaya cache yang baca tabel itu basi
+    def _mark_table_written(self, table_name: Any) -> None:
+        table = self._table_name(table_name)
+        if self.result_cache is not None:
+            self.result_cache.bump(table)
+        if self.buffer_cache is not None:
+            self.buffer_cache.invalidate_table(table)
+
+    # statistik cache (hit ratio, byte yang dipegang, dll) buat monitoring
+    def cache_stats(self) -> dict:
+        return {
+            "plan_cache": self.plan_cache.stats(),
+            "result_cache": self.result_cache.stats() if self.result_cache is not None else None,
+            "buffer_cache": self.buffer_cache.stats() if self.buffer_cache is not None else None,
+        }
+
+    # execute query tree untuk SELECT operations
+    # pipeline di-build sekali lalu row di-pull dari root, hasil akhir baru di-materialize di sini
     def _execute_query_tree(self, node: QueryTree) -> Rows:
+        scan_plan = plan_scan_columns(node, self._get_column_types)
+        return Rows.from_list(list(self._iter_query_tree(node, scan_plan)))
+
+    # recursively build operator pipeline (generator) dari query tree
+    # SIGMA, PROJECT, LIMIT, JOIN (sisi kiri) streaming row per row,
+    # cuma operator blocking (SORT, GROUP, sisi kanan JOIN/CARTESIAN) yang buffer row
+    # profile (EXPLAIN ANALYZE) ngebungkus tiap node; kalau None pipeline-nya persis sama tanpa wrapper
+    def _iter_query_tree(self, node: QueryTree, scan_plan: ScanPlan | None = None, profile: QueryProfile | None = None) -> Iterator[Any]:
         if node is None:
-            return Rows.from_list([])
+            return iter(())
         
+        if scan_plan is None:
+            scan_plan = ScanPlan()
+        
+        if profile is not None:
+            return profile.measure(node, lambda: self._build_operator(node, scan_plan, profile))
+        return self._build_operator(node, scan_plan, None)
+
+    def _build_operator(self, node: QueryTree, scan_plan: ScanPlan, profile: QueryProfile | None) -> Iterator[Any]:
         if node.type == "TABLE":
-            return self._fetch_table_data(node.val)
+            return self._scan_table(node.val, columns=scan_plan.table_columns.get(id(node)))
+        
+        if node.type == "SIGMA":
+            pushed_down = self._push_down_selection(node, scan_plan)
+            if pushed_down is not None:
+                return pushed_down
+        
+        if node.type == "PROJECT":
+            aggregated = self._push_aggregates_into_group(node, scan_plan, profile)
+            if aggregated is not None:
+                return aggregated
         
-        child_results = []
-        for child in node.childs:
-            child_result = self._execute_query_tree(child)
-            child_results.append(child_result)
+        if node.type == "LIMIT" and node.childs and node.childs[0].type == "SORT":
+            top_n_rows = self._push_limit_into_sort(node, scan_plan, profile)
+            if top_n_rows is not None:
+                return top_n_rows
+        
+        child_iters = [self._iter_query_tree(child, scan_plan, profile) for child in node.childs]
         
         if node.type == "PROJECT":
-            return self._apply_projection(child_results[0], node.val)
+            # scan di bawahnya udah fetch persis kolom ini, ga perlu bikin dict baru per row
+            if id(node) in scan_plan.redundant_projections:
+                return child_iters[0]
+            return self._apply_projection(child_iters[0], node.val)
         
         elif node.type == "SIGMA":
-            return self._apply_selection(child_results[0], node.val)
+            return self._apply_selection(child_iters[0], node.val)
         
         elif node.type == "JOIN" or node.type == "NATURAL_JOIN" or node.type == "THETA_JOIN":
-            return self._apply_join(child_results[0], child_results[1], node.val, node.type)
+            return self._apply_join(child_iters[0], child_iters[1], node.val, node.type)
         
         elif node.type == "CARTESIAN":
-            return self._apply_cartesian(child_results[0], child_results[1])
+            return self._apply_cartesian(child_iters[0], child_iters[1])
         
         elif node.type == "SORT":
-            return self._apply_sort(child_results[0], node.val)
+            return self._apply_sort(child_iters[0], node.val)
         
         elif node.type == "LIMIT":
-            return self._apply_limit(child_results[0], node.val)
+            return self._apply_limit(child_iters[0], node.val)
         
         elif node.type == "GROUP":
-            return self._apply_group(child_results[0], node.val)
+            presorted = self._is_sorted_on(node.childs[0] if node.childs else None, group_columns(node.val))
+            return self._apply_group(child_iters[0], node.val, scan_plan.group_aggregates.get(id(node)), presorted)
         
         elif node.type == "OR":
-            combined_data = []
-            for result in child_results:
-                combined_data.extend(result.data)
-            unique_data = list(set(combined_data))
-            return Rows.from_list(unique_data)
+            return self._apply_union(child_iters)
         
         else:
-            return child_results[0] if child_results else Rows.from_list([])
+            return child_iters[0] if child_iters else iter(())
 
     # execute UPDATE query tree
     # returns jumlah rows yang ter-update
@@ -202,17 +528,154 @@ class QueryProcessor:
         
         return 0
 
-    def _fetch_table_data(self, table_name: Any) -> Rows:
-        try:
-            if hasattr(table_name, 'name'):
-                table_str = str(table_name.name)
+    # SIGMA (bisa bertumpuk) yang langsung di atas TABLE: kondisi yang bisa dinyatakan sebagai
+    # Condition storage dikirim ke read_block, sisanya tetap di-filter di python
+    # return None kalau pattern-nya bukan SIGMA-over-TABLE
+    def _push_down_selection(self, node: QueryTree, scan_plan: ScanPlan) -> Iterator[Any] | None:
+        conditions = []
+        current = node
+        while current is not None and current.type == "SIGMA":
+            conditions.append(current.val)
+            current = current.childs[0] if current.childs else None
+        
+        if current is None or current.type != "TABLE":
+            return None
+        
+        column_types = self._get_column_types(current.val)
+        storage_conditions = []
+        residual_conditions = []
+        for condition in conditions:
+            storage_condition = self._to_storage_condition(condition, column_types) if column_types else None
+            if storage_condition is None:
+                residual_conditions.append(condition)
             else:
-                table_str = str(table_name)
+                storage_conditions.append(storage_condition)
+        
+        columns = scan_plan.table_columns.get(id(current))
+        if residual_conditions and self.worker_pool.degree > 1:
+            parallel_rows = self._parallel_selection(current.val, storage_conditions, columns, residual_conditions, column_types)
+            if parallel_rows is not None:
+                return parallel_rows
+        
+        rows = self._scan_table(current.val, storage_conditions, columns)
+        # conditions dikumpulin dari atas ke bawah, filter paling dalam di-apply duluan
+        for condition in reversed(residual_conditions):
+            normalized = NormalizedCondition.normalize(condition)
+            column_type = column_types.get(normalized.column) if column_types and normalized else None
+            rows = self._apply_selection(rows, condition, column_type)
+        return rows
+
+    # filter residual di worker pool kalau hasil scan-nya >= parallel_threshold row
+    # (projection udah di-push ke scan, jadi worker cuma filter). urutan row sama dengan versi serial
+    def _parallel_selection(
+        self,
+        table_name: Any,
+        storage_conditions: list,
+        columns: list | None,
+        residual_conditions: list,
+        column_types: dict | None,
+    ) -> Iterator[Any] | None:
+        filters = []
+        for condition in reversed(residual_conditions):
+            normalized = NormalizedCondition.normalize(condition)
+            if normalized:
+                filters.append((normalized, column_types.get(normalized.column) if column_types else None))
+        
+        rows = self._fetch_table_data(table_name, storage_conditions, columns).data
+        if not filters:
+            return iter(rows)
+        if len(rows) < self.parallel_threshold:
+            return self._apply_filters_serial(rows, filters)
+        return parallel_filter(self.worker_pool, rows, filters)
+
+    def _apply_filters_serial(self, rows: Iterable[Any], filters: list) -> Iterator[Any]:
+        for normalized, column_type in filters:
+            rows = filter(compile_selection(normalized, column_type), rows)
+        return iter(rows)
+
+    # tutup worker pool scan paralel dan flush slow query log (dipanggil waktu server shutdown)
+    def close(self) -> None:
+        self.worker_pool.shutdown()
+        if self.slow_query_log is not None:
+            self.slow_query_log.close()
+
+    # translate kondisi SIGMA ke Condition storage manager
+    # cuma kalau hasilnya dijamin sama dengan _apply_selection, selain itu return None
+    def _to_storage_condition(self, condition: Any, column_types: dict) -> ICondition | None:
+        normalized = NormalizedCondition.normalize(condition)
+        if not normalized or normalized.column not in column_types:
+            return None
+        if normalized.operator not in ("=", "!=", ">", "<", ">=", "<="):
+            return None
+        
+        column_type = column_types[normalized.column]
+        if normalized.typed:
+            # parameter prepared statement udah bertipe, ga perlu coerce; NULL tetap di-filter di python
+            operand = normalized.value
+            if operand is None:
+                return None
+            if type(operand) is str:
+                # string vs kolom numerik dan operator selain = / != juga di python (samain semantics compile_selection)
+                if column_type in NUMERIC_TYPES or normalized.operator not in ("=", "!="):
+                    return None
+            elif column_type not in NUMERIC_TYPES:
+                return None
+        elif column_type in NUMERIC_TYPES:
+            # kolom numerik di-compare sebagai angka, literal cukup di-convert sekali
+            try:
+                operand = coerce_literal(normalized.value, column_type)
+            except ValueError:
+                return None
+        else:
+            # kolom string: _apply_selection cuma exact match kalau literal-nya bukan angka
+            if normalized.operator not in ("=", "!="):
+                return None
+            try:
+                float(normalized.value)
+                return None
+            except ValueError:
+                operand = normalized.value
+        
+        storage_op = "<>" if normalized.operator == "!=" else normalized.operator
+        try:
+            return self._condition_factory(column=normalized.column, operation=storage_op, operand=operand)
+        except Exception:
+            return None
+
+    # ambil {kolom: tipe} dari schema manager, None kalau tabel / schema-nya ga ketemu
+    def _get_column_types(self, table_name: Any) -> dict | None:
+        try:
+            schema = self.storage_manager.schema_manager.get_table_schema(self._table_name(table_name))
+        except Exception:
+            return None
+        return get_column_types(schema)
+
+    def _table_name(self, table_name: Any) -> str:
+        if hasattr(table_name, 'name'):
+            return str(table_name.name)
+        return str(table_name)
+
+    # columns None artinya fetch semua kolom ("*")
+    def _fetch_table_data(self, table_name: Any, conditions: list | None = None, columns: list | None = None) -> Rows:
+        try:
+            table_str = self._table_name(table_name)
             
-            data_retrieval = self._data_retrieval_factory(table=table_str, column="*", conditions=[])
-            result = self.storage_manager.read_block(data_retrieval)
+            def read_block() -> Any:
+                data_retrieval = self._data_retrieval_factory(table=table_str, column=columns or "*", conditions=conditions or [])
+                rows = self.storage_manager.read_block(data_retrieval)
+                record_storage_read(rows)
+                return rows
+            
+            # EXPLAIN ANALYZE selalu baca ke storage supaya rows_in / storage_calls ga tergantung isi cache
+            if self.buffer_cache is not None and not is_profiling():
+                result = self.buffer_cache.read(table_str, columns, conditions, read_block)
+            else:
+                result = read_block()
             
             if result is not None and isinstance(result, list):
+                stats = current_query()
+                if stats is not None:
+                    stats.rows_scanned += len(result)
                 return Rows.from_list(result)
             else:
                 return Rows.from_list([])
@@ -221,131 +684,76 @@ class QueryProcessor:
             print(f"Error fetching data from Storage Manager: {e}")
             return Rows.from_list([])
 
+    # leaf operator - storage manager masih return list, tapi dari sini row di-yield satu-satu
+    def _scan_table(self, table_name: Any, conditions: list | None = None, columns: list | None = None) -> Iterator[Any]:
+        yield from self._fetch_table_data(table_name, conditions, columns).data
+
     # apply PROJECT operation - select specific columns
-    def _apply_projection(self, data: Rows, columns: Any) -> Rows:
-        if isinstance(columns, str):
-            if columns.strip() == "*":
-                return data
-            col_list = [col.strip() for col in columns.split(",") if col.strip()]
-        elif isinstance(columns, (list, tuple)):
-            if len(columns) == 1 and str(columns[0]).strip() == "*":
-                return data
-            col_list = [str(col).strip() for col in columns if str(col).strip()]
-        else:
-            return data
-        
+    def _apply_projection(self, rows: Iterable[Any], columns: Any) -> Iterator[Any]:
+        col_list = projection_columns(columns)
         if not col_list:
-            return data
-        
-        projected_data = []
-        for row in data.data:
-            if isinstance(row, dict):
-                projected_row = {col: row.get(col) for col in col_list if col in row}
-                projected_data.append(projected_row)
-            else:
-                projected_data.append(row)
+            return iter(rows)
         
-        return Rows.from_list(projected_data)
+        return (
+            {col: row[col] for col in col_list if col in row} if isinstance(row, dict) else row
+            for row in rows
+        )
 
     # apply SIGMA operation - filter rows based on WHERE condition
-    def _apply_selection(self, data: Rows, condition: Any) -> Rows:
+    # kondisi di-compile sekali jadi predicate, column_type (dari schema) kalau diketahui
+    def _apply_selection(self, rows: Iterable[Any], condition: Any, column_type: str | None = None) -> Iterator[Any]:
         # Normalize condition to internal format
         normalized = NormalizedCondition.normalize(condition)
         if not normalized:
-            return data
+            return iter(rows)
         
-        col_name = normalized.column
-        operator = normalized.operator
-        value = normalized.value
-        filtered_data = []
-        
-        for row in data.data:
-            if isinstance(row, dict) and col_name in row:
-                row_value = str(row[col_name])
-                
-                try:
-                    row_value_num = float(row_value)
-                    value_num = float(value)
-                    
-                    if operator == "=" and row_value_num == value_num:
-                        filtered_data.append(row)
-                    elif operator == "!=" and row_value_num != value_num:
-                        filtered_data.append(row)
-                    elif operator == ">" and row_value_num > value_num:
-                        filtered_data.append(row)
-                    elif operator == "<" and row_value_num < value_num:
-                        filtered_data.append(row)
-                    elif operator == ">=" and row_value_num >= value_num:
-                        filtered_data.append(row)
-                    elif operator == "<=" and row_value_num <= value_num:
-                        filtered_data.append(row)
-                except ValueError:
-                    if operator == "=" and row_value == value:
-                        filtered_data.append(row)
-                    elif operator == "!=" and row_value != value:
-                        filtered_data.append(row)
-        
-        return Rows.from_list(filtered_data)
+        return filter(compile_selection(normalized, column_type), rows)
 
     # apply join operation - support JOIN, NATURAL_JOIN, and THETA_JOIN
-    def _apply_join(self, left_data: Rows, right_data: Rows, condition: str, join_type: str) -> Rows:
-        if not left_data.data or not right_data.data:
-            return Rows.from_list([])
-        
-        result = []
+    # sisi kiri di-stream, sisi kanan di-buffer karena di-scan ulang untuk tiap row kiri
+    def _apply_join(self, left_rows: Iterable[Any], right_rows: Iterable[Any], condition: str, join_type: str) -> Iterator[Any]:
+        right_list = list(right_rows)
+        if not right_list:
+            return iter(())
         
         if join_type == "JOIN":
             # inner join: hanya me-return baris yang memenuhi kondisi join
-            result = self._theta_join(left_data.data, right_data.data, condition)
+            return self._theta_join(left_rows, right_list, condition)
         
         elif join_type == "NATURAL_JOIN":
             # natural join: join berdasarkan kolom dengan value yang sama
-            result = self._natural_join(left_data.data, right_data.data)
+            return self._natural_join(left_rows, right_list)
         
         elif join_type == "THETA_JOIN":
             # theta join: join berdasarkan kondisi tertentu (=, <, >, <=, >=, !=)
-            result = self._theta_join(left_data.data, right_data.data, condition)
+            return self._theta_join(left_rows, right_list, condition)
         
-        return Rows.from_list(result)
+        return iter(())
     
     # natural join berdasarkan kolom dengan nilai yang sama
-    def _natural_join(self, left_rows: list, right_rows: list) -> list:
-        result = []
+    def _natural_join(self, left_rows: Iterable[Any], right_rows: list) -> Iterator[Any]:
+        left_iter = iter(left_rows)
+        left_first = next(left_iter, None)
         
-        if not left_rows or not right_rows:
-            return result
+        if left_first is None or not right_rows:
+            return
         
-        left_first = left_rows[0]
         right_first = right_rows[0]
         
         if not isinstance(left_first, dict) or not isinstance(right_first, dict):
-            return result
-        
-        common_cols = set(left_first.keys()) & set(right_first.keys())
-        
-        # join rows berdasarkan common columns
-        for left_row in left_rows:
-            for right_row in right_rows:
-                # cek apakah semua common columns memiliki nilai yang sama
-                match = all(left_row.get(col) == right_row.get(col) for col in common_cols)
-                
-                if match:
-                    # combine rows, common columns dari left_row
-                    combined = {**left_row}
-                    for key, val in right_row.items():
-                        if key not in common_cols:
-                            combined[key] = val
-                    result.append(combined)
+            return
         
-        return result
+        common_cols = tuple(set(left_first.keys()) & set(right_first.keys()))
+        # join rows berdasarkan common columns (common columns diambil dari left_row) - selalu equality jadi langsung hash join
+        spec = JoinSpec(left_columns=common_cols, right_columns=common_cols, natural=True)
+        yield from self._equi_join(self._chain_first(left_first, left_iter), right_rows, spec)
     
     # theta join berdasarkan kondisi
-    def _theta_join(self, left_rows: list, right_rows: list, condition: str) -> list:
-        result = []
-        
+    def _theta_join(self, left_rows: Iterable[Any], right_rows: list, condition: str) -> Iterator[Any]:
         if not condition:
             # jika tidak ada condition, return cartesian product
-            return self._cartesian_join(left_rows, right_rows)
+            yield from self._cartesian_join(left_rows, right_rows)
+            return
         
         # parse condition: format "left_col op right_col" atau "left_col op value"
         operators = [">=", "<=", "!=", "=", ">", "<"]
@@ -362,118 +770,186 @@ class QueryProcessor:
                 break
         
         if not operator or not left_col:
-            return self._cartesian_join(left_rows, right_rows)
+            yield from self._cartesian_join(left_rows, right_rows)
+            return
+        
+        # equality antar kolom -> hash join, inequality -> range join, sisanya (!=) nested loop
+        right_first = right_rows[0] if right_rows else None
+        if isinstance(right_first, dict) and right_col_or_value in right_first:
+            if operator == "=":
+                yield from self._hash_theta_join(left_rows, right_rows, left_col, right_col_or_value)
+                return
+            if operator in RANGE_OPERATORS:
+                yield from self._range_theta_join(left_rows, right_rows, left_col, operator, right_col_or_value)
+                return
+        
+        yield from self._nested_loop_join(left_rows, right_rows, left_col, operator, right_col_or_value)
+    
+    # hash join untuk kondisi "left_col = right_col"
+    # key pakai equi_join_key biar numeric vs string tetap sama kaya _evaluate_condition
+    def _hash_theta_join(self, left_rows: Iterable[Any], right_rows: list, left_col: str, right_col: str) -> Iterator[Any]:
+        # row kanan yang ga punya right_col dibandingin ke literal right_col, sama kaya nested loop
+        spec = JoinSpec(left_columns=(left_col,), right_columns=(right_col,), natural=False)
+        yield from self._equi_join(left_rows, right_rows, spec)
+    
+    # hash join serial, atau radix-partitioned join di worker pool kalau paralel aktif dan
+    # total row kedua sisi >= parallel_threshold. sisi kiri cuma di-peek secukupnya buat ngecek threshold
+    def _equi_join(self, left_rows: Iterable[Any], right_rows: list, spec: JoinSpec) -> Iterator[Any]:
+        if self.worker_pool.degree > 1:
+            left_iter = iter(left_rows)
+            left_prefix = list(islice(left_iter, max(0, self.parallel_threshold - len(right_rows))))
+            left_rows = chain(left_prefix, left_iter)
+            if len(left_prefix) + len(right_rows) >= self.parallel_threshold:
+                return parallel_hash_join(self.worker_pool, left_rows, right_rows, spec, self.join_memory_limit)
+        return hash_join(left_rows, right_rows, spec.left_key, spec.right_key, spec.combine)
+    
+    # sort-based range join untuk kondisi "left_col <|<=|>|>= right_col"
+    def _range_theta_join(self, left_rows: Iterable[Any], right_rows: list, left_col: str, operator: str, right_col: str) -> Iterator[Any]:
+        def left_value(row: Any) -> Any:
+            if not isinstance(row, dict) or left_col not in row:
+                return SKIP_ROW
+            return row[left_col]
+        
+        def right_value(row: Any) -> Any:
+            if not isinstance(row, dict):
+                return SKIP_ROW
+            # sama kaya nested loop: kalau kolomnya ga ada, bandingin ke literal
+            return row.get(right_col, right_col)
+        
+        yield from range_join(left_rows, right_rows, left_value, right_value, operator, lambda left_row, right_row: {**left_row, **right_row})
+    
+    # nested loop join - fallback untuk kondisi yang ga bisa di-hash / di-sort (misal !=)
+    def _nested_loop_join(self, left_rows: Iterable[Any], right_rows: list, left_col: str, operator: str, right_col_or_value: str) -> Iterator[Any]:
+        compare = COMPARATORS.get(operator)
+        if compare is None:
+            return
         
-        # join rows berdasarkan kondisi
         for left_row in left_rows:
+            if not isinstance(left_row, dict) or left_col not in left_row:
+                continue
+            left_val = left_row[left_col]
             for right_row in right_rows:
-                if isinstance(left_row, dict) and isinstance(right_row, dict):
-                    if left_col in left_row:
-                        left_val = left_row[left_col]
-                        
-                        # cek apakah right_col_or_value adalah kolom di right_row
-                        if right_col_or_value in right_row:
-                            right_val = right_row[right_col_or_value]
-                        else:
-                            right_val = right_col_or_value
-                        
-                        # evaluasi condition
-                        if self._evaluate_condition(left_val, operator, right_val):
-                            combined = {**left_row, **right_row}
-                            result.append(combined)
-        
-        return result
+                if isinstance(right_row, dict):
+                    # cek apakah right_col_or_value adalah kolom di right_row
+                    right_val = right_row.get(right_col_or_value, right_col_or_value)
+                    
+                    # evaluasi condition
+                    if compare(left_val, right_val):
+                        yield {**left_row, **right_row}
     
     # cartesian product untuk join
-    def _cartesian_join(self, left_rows: list, right_rows: list) -> list:
-        result = []
+    def _cartesian_join(self, left_rows: Iterable[Any], right_rows: list) -> Iterator[Any]:
         for left_row in left_rows:
             for right_row in right_rows:
                 if isinstance(left_row, dict) and isinstance(right_row, dict):
-                    combined = {**left_row, **right_row}
-                    result.append(combined)
-        return result
+                    yield {**left_row, **right_row}
+
+    # sambung lagi row pertama yang udah di-peek ke sisa iterator
+    @staticmethod
+    def _chain_first(first: Any, rest: Iterator[Any]) -> Iterator[Any]:
+        yield first
+        yield from rest
     
     # evaluasi kondisi untuk join
     def _evaluate_condition(self, left_val, operator: str, right_val) -> bool:
-        try:
-            # coba convert ke float untuk numeric comparison
-            left_num = float(left_val)
-            right_num = float(right_val)
-            
-            if operator == "=":
-                return left_num == right_num
-            elif operator == "!=":
-                return left_num != right_num
-            elif operator == ">":
-                return left_num > right_num
-            elif operator == "<":
-                return left_num < right_num
-            elif operator == ">=":
-                return left_num >= right_num
-            elif operator == "<=":
-                return left_num <= right_num
-        except (ValueError, TypeError):
-            # string comparison jika tidak bisa convert ke number
-            left_str = str(left_val)
-            right_str = str(right_val)
-            
-            if operator == "=":
-                return left_str == right_str
-            elif operator == "!=":
-                return left_str != right_str
-            elif operator == ">":
-                return left_str > right_str
-            elif operator == "<":
-                return left_str < right_str
-            elif operator == ">=":
-                return left_str >= right_str
-            elif operator == "<=":
-                return left_str <= right_str
-        
-        return False
+        compare = COMPARATORS.get(operator)
+        return compare(left_val, right_val) if compare else False
 
     # apply CARTESIAN product
-    def _apply_cartesian(self, left_data: Rows, right_data: Rows) -> Rows:
-        result = []
-        for left_row in left_data.data:
-            for right_row in right_data.data:
-                if isinstance(left_row, dict) and isinstance(right_row, dict):
-                    combined = {**left_row, **right_row}
-                    result.append(combined)
-        
-        return Rows.from_list(result)
-
-    def _apply_sort(self, data: Rows, column: str) -> Rows:
+    def _apply_cartesian(self, left_rows: Iterable[Any], right_rows: Iterable[Any]) -> Iterator[Any]:
+        return self._cartesian_join(left_rows, list(right_rows))
 
+    # blocking operator - butuh semua row dulu sebelum bisa emit row pertama
+    # satu kali sort stabil pakai composite key (ASC/DESC per OrderByItem, aman untuk None),
+    # kalau input lebih gede dari sort_memory_limit di-spill ke disk lalu di-merge
+    def _apply_sort(self, rows: Iterable[Any], column: Any) -> Iterator[Any]:
         # column = list of OrderByItem
-        for node in reversed(column):
-            column_str = node.column.column
-            ascending = node.direction.upper() == "ASC"
-            data.data.sort(key=lambda datum: datum.get(column_str), reverse=not ascending)
+        yield from external_sort(rows, order_by_key(column), self.sort_memory_limit)
 
-        # NOTE : DONE yak bang -bri
-        # NOTE : dah ku benerin yak bang - kiwz
-    
-        return data
+    # LIMIT langsung di atas SORT -> top-N pakai bounded heap, ga perlu sort semua row
+    # return None kalau limit-nya ga valid, biar jalan lewat SORT + LIMIT biasa
+    def _push_limit_into_sort(self, node: QueryTree, scan_plan: ScanPlan, profile: QueryProfile | None = None) -> Iterator[Any] | None:
+        try:
+            limit_num = int(node.val)
+        except (TypeError, ValueError):
+            return None
+        if limit_num < 0:
+            return None
+        
+        sort_node = node.childs[0]
+        sort_input = self._iter_query_tree(sort_node.childs[0], scan_plan, profile) if sort_node.childs else iter(())
+        return self._apply_top_n(sort_input, sort_node.val, limit_num)
+
+    def _apply_top_n(self, rows: Iterable[Any], order_by: Any, limit_num: int) -> Iterator[Any]:
+        yield from top_n(rows, order_by, limit_num)
 
     # apply LIMIT operation
-    def _apply_limit(self, data: Rows, limit: str) -> Rows:
+    # islice berhenti pull dari child begitu limit tercapai, jadi operator di bawahnya ga di-drain
+    def _apply_limit(self, rows: Iterable[Any], limit: str) -> Iterator[Any]:
         try:
             limit_num = int(limit)
-            limited_data = data.data[:limit_num]
-            return Rows.from_list(limited_data)
+            return islice(rows, limit_num)
         except ValueError:
-            return data
+            return iter(rows)
+    # PROJECT yang ada aggregate function-nya (COUNT/SUM/AVG/MIN/MAX):
+    # aggregate dihitung di GROUP di bawahnya (atau atas seluruh input kalau ga ada GROUP),
+    # lalu di-project pakai label aggregate. return None kalau ga ada aggregate sama sekali
+    def _push_aggregates_into_group(self, node: QueryTree, scan_plan: ScanPlan, profile: QueryProfile | None = None) -> Iterator[Any] | None:
+        columns = projection_columns(node.val)
+        if not columns:
+            return None
+        specs = [parse_aggregate(col) for col in columns]
+        aggregates = [spec for spec in specs if spec]
+        if not aggregates:
+            return None
+        
+        child = node.childs[0] if node.childs else None
+        # HAVING (SIGMA), ORDER BY (SORT) dan LIMIT di atas GROUP jalan di row hasil group,
+        # jadi GROUP-nya dicari lewat node-node itu; aggregate-nya dititip ke GROUP lewat scan_plan
+        group = child
+        while group is not None and group.type in ("SIGMA", "SORT", "LIMIT"):
+            group = group.childs[0] if group.childs else None
+        if group is not None and group.type == "GROUP":
+            scan_plan.group_aggregates[id(group)] = aggregates
+            rows = self._iter_query_tree(child, scan_plan, profile)
+        else:
+            rows = self._apply_group(self._iter_query_tree(child, scan_plan, profile), None, aggregates)
+        
+        labels = [spec.label if spec else col for col, spec in zip(columns, specs)]
+        return self._apply_projection(rows, labels)
+
+    # cek apakah output node udah sorted di kolom-kolom ini (SORT yang key depannya kolom GROUP BY)
+    def _is_sorted_on(self, node: QueryTree, columns: List[str]) -> bool:
+        if node is None or node.type != "SORT" or not columns:
+            return False
+        try:
+            leading = [str(item.column.column) for item in node.val[:len(columns)]]
+        except (AttributeError, TypeError):
+            return False
+        return len(leading) == len(columns) and set(leading) == set(columns)
+
     # apply GROUP BY operation
-    def _apply_group(self, data: Rows, column: str) -> Rows:
-        return Rows.from_list([{"info": f"GROUP BY {column} - basic implementation"}])
+    # hash aggregation (memory sebanding jumlah group), atau streaming aggregate kalau input udah sorted
+    def _apply_group(self, rows: Iterable[Any], column: Any, aggregates: list | None = None, presorted: bool = False) -> Iterator[Any]:
+        columns = group_columns(column)
+        if presorted:
+            return sorted_aggregate(rows, columns, aggregates or [])
+        return hash_aggregate(rows, columns, aggregates or [])
+
+    # apply OR - gabung hasil semua child tanpa duplikat, urutan kemunculan pertama dipertahankan
+    def _apply_union(self, child_iters: List[Iterator[Any]]) -> Iterator[Any]:
+        seen = set()
+        for rows in child_iters:
+            for row in rows:
+                key = tuple(sorted(row.items())) if isinstance(row, dict) else row
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield row
 
     # perform UPDATE operation via storage manager
     # returns number of rows updated
     def _perform_update(self, table_name: str, update_operations: list, conditions: list) -> int:
-        updates = {}
-
         # NOTE: PENTING, dari SM cuma nerima new_value, ga bisa nilai "kolom * 0.4"
         
         first_condition = conditions[0] if conditions else None # dari spek cuma consider 1 condition aja
@@ -483,14 +959,24 @@ class QueryProcessor:
         
         cond_objs = [self._condition_factory(column=first_condition.attr.column, operation=first_condition.op, operand=first_condition.value)] if first_condition else []
 
+        assignments = {update.column: update.value for update in update_operations[0]}
+        if not assignments:
+            return 0
+        # satu write_block per kolom sesuai kontrak IDataWrite; kalau storage manager supports_multi_column_write,
+        # semua SET digabung jadi satu write (column = list kolom, new_value = dict kolom -> value)
+        if len(assignments) > 1 and supports(self.storage_manager, MULTI_COLUMN_WRITE):
+            writes = [(list(assignments), assignments)]
+        else:
+            writes = list(assignments.items())
+
         try:
             total_updated = 0
-            for update in update_operations[0]:
+            for column, new_value in writes:
                 data_write = self._data_write_factory(
                     table=repr(table_name),
-                    column=update.column,
+                    column=column,
                     conditions=cond_objs,
-                    new_value=update.value,
+                    new_value=new_value,
                 )
                 
                 result = self.storage_manager.write_block(data_write)
@@ -503,6 +989,9 @@ class QueryProcessor:
         except Exception as e:
             print(f"Error calling Storage Manager write_block: {e}")
             return 0
+        
+        finally:
+            self._mark_table_written(table_name)
 
     # parse condition string to Condition object
     def _parse_condition(self, condition_str: str) -> ICondition | None:
@@ -520,6 +1009,15 @@ class QueryProcessor:
     # parse INSERT (dari optimizer) & panggil write_block dari storage manager
     def execute_insert(self, query: str) -> Union[Rows, int]:
         try:
+            # INSERT ... VALUES (satu atau banyak tuple) di-parse sendiri supaya validasi + coerce ke schema
+            # selalu sama; parser optimizer cuma dipakai untuk bentuk INSERT lain
+            try:
+                batch = parse_insert(query)
+            except ValueError:
+                batch = None
+            if batch is not None and len(batch.rows) >= 1:
+                return self._execute_insert_batch(batch)
+
             parsed = None
             try:
                 parsed = self.optimization_engine.parse_query(query)
@@ -576,6 +1074,8 @@ class QueryProcessor:
             except Exception as e:
                 print(f"Error calling StorageManager.write_block for insert: {e}")
                 return -1
+            finally:
+                self._mark_table_written(table_name)
 
             return Rows.from_list(["INSERT executed - storage manager returned no status"])
 
@@ -583,19 +1083,130 @@ class QueryProcessor:
             print(f"Error executing INSERT: {e}")
             return -1
 
+    # INSERT ... VALUES: semua tuple divalidasi + di-coerce sekali terhadap schema tabel,
+    # lalu dikirim ke storage manager per chunk (lihat _write_rows)
+    def _execute_insert_batch(self, batch: InsertBatch) -> Union[Rows, int]:
+        try:
+            rows = build_rows(batch, self._get_column_types(batch.table))
+        except ValueError as e:
+            return Rows.from_list([f"INSERT failed - {e}"])
+
+        inserted = 0
+        try:
+            for chunk in chunked(rows, self.insert_batch_rows):
+                inserted += self._write_rows(batch.table, chunk)
+        except Exception as e:
+            print(f"Error calling StorageManager.write_block for batch insert: {e}")
+            return -1
+        finally:
+            self._mark_table_written(batch.table)
+
+        return Rows.from_list([f"Inserted {inserted} rows"])
+
+    # tulis sekumpulan row: satu write_block (new_value = list row dict) kalau storage manager
+    # supports_batch_write, selain itu satu write_block per row sesuai kontrak IDataWrite
+    def _write_rows(self, table_name: str, rows: List[dict]) -> int:
+        if len(rows) > 1 and supports(self.storage_manager, BATCH_WRITE):
+            batches = [rows]
+        else:
+            batches = [[row] for row in rows]
+        
+        written = 0
+        for batch in batches:
+            data_write = self._data_write_factory(
+                table=table_name,
+                column=None,
+                conditions=[],
+                new_value=batch if len(batch) > 1 else batch[0],
+            )
+            res = self.storage_manager.write_block(data_write)
+            written += res if isinstance(res, int) else len(batch)
+        return written
+
+    # COPY table [(columns)] FROM 'file.csv' [WITH CSV HEADER] [DELIMITER 'x']
+    # query bisa datang dari client jaringan, jadi file-nya harus ada di dalam copy_directory
+    def execute_copy(self, query: str) -> Union[Rows, int]:
+        command = parse_copy(query)
+        if command is None:
+            return Rows.from_list(["COPY parsing failed - expected COPY table [(columns)] FROM 'file.csv'"])
+
+        progress = CopyProgress()
+        try:
+            self.copy_from(
+                command.table,
+                resolve_copy_path(self.copy_directory, command.path),
+                columns=command.columns,
+                header=command.header,
+                delimiter=command.delimiter,
+                on_progress=progress_printer(f"COPY {command.table}"),
+                progress=progress,
+            )
+        except (OSError, ValueError) as e:
+            return Rows.from_list([f"COPY failed after {progress.rows} rows - {e}"])
+        except Exception as e:
+            print(f"Error executing COPY: {e}")
+            return -1
+
+        return Rows.from_list([f"COPY {progress.rows} rows in {progress.elapsed:.2f}s ({progress.rows_per_second:,.0f} rows/s)"])
+
+    # bulk load CSV (path atau file object) ke tabel: file dibaca per chunk insert_batch_rows baris,
+    # tiap chunk di-coerce pakai schema tabel lalu ditulis lewat _write_rows,
+    # jadi memory tetap berapa pun ukuran file. Row yang udah ditulis sebelum error ga di-rollback.
+    # API lokal: path ga dibatasi copy_directory (yang dibatasi cuma COPY lewat SQL, lihat execute_copy)
+    def copy_from(
+        self,
+        table_name: str,
+        source: Union[str, IO[str]],
+        columns: List[str] | None = None,
+        header: bool = False,
+        delimiter: str = ",",
+        on_progress: Callable[[CopyProgress], None] | None = None,
+        progress: CopyProgress | None = None,
+    ) -> CopyProgress:
+        progress = progress or CopyProgress()
+        file = open(source, newline="", encoding="utf-8") if isinstance(source, str) else source
+        try:
+            header_columns, records = csv_records(file, delimiter, header)
+            typed_columns = resolve_columns(table_name, list(columns or header_columns), self._get_column_types(table_name))
+            row_number = 0
+            for chunk in iter_chunks(records, self.insert_batch_rows):
+                rows = []
+                for values in chunk:
+                    row_number += 1
+                    rows.append(convert_row(typed_columns, values, row_number))
+                progress.rows += self._write_rows(table_name, rows)
+                progress.chunks += 1
+                if on_progress is not None:
+                    on_progress(progress)
+        finally:
+            if isinstance(source, str):
+                file.close()
+            if progress.rows:
+                self._mark_table_written(table_name)
+        return progress
+
     def execute_delete(self, query: str) -> Union[Rows, int]:
         try:
             parsed = None
             try:
-                parsed = self.optimization_engine.parse_query(query)
+                parsed = self._get_query_plan(query, optimize=False)
             except Exception:
                 parsed = None
 
+            return self._execute_delete_tree(parsed.query_tree if parsed else None)
+
+        except Exception as e:
+            print(f"Error executing DELETE: {e}")
+            return -1
+
+    # execute DELETE query tree lewat delete_block storage manager
+    def _execute_delete_tree(self, query_tree: QueryTree) -> Union[Rows, int]:
+        try:
             table_name = None
             conditions = []
 
-            if parsed and parsed.query_tree and getattr(parsed.query_tree, "type", "").upper() == "DELETE":
-                current = parsed.query_tree
+            if query_tree is not None and getattr(query_tree, "type", "").upper() == "DELETE":
+                current = query_tree
                 while current:
                     t = getattr(current, "type", "").upper()
                     if t == "SIGMA":
@@ -633,6 +1244,8 @@ class QueryProcessor:
                     return Rows.from_list([f"Deleted rows via storage manager: {res}"])
             except Exception as e:
                 print(f"Error calling StorageManager.delete_block: {e}")
+            finally:
+                self._mark_table_written(table_name)
 
             return Rows.from_list(["DELETE executed - storage manager returned no status"])
 
@@ -696,6 +1309,8 @@ class QueryProcessor:
         # save to Schema Manager
         self.storage_manager.schema_manager.add_table_schema(table_name, new_schema)
         self.storage_manager.schema_manager.save_schemas()
+        self.plan_cache.invalidate_table(table_name)
+        self._mark_table_written(table_name)
 
         # physical data file 
         file_path = os.path.join(self.storage_manager.base_path, f"{table_name}.dat")
@@ -708,6 +1323,11 @@ class QueryProcessor:
         return Rows.from_list([f"Table '{table_name}' created successfully."])
 
     def execute_drop_table(self, query: str) -> Union[Rows, int]:
+        # plan yang baca tabel ini udah ga valid begitu schema-nya berubah
+        match = re.search(r"(?i)DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?(\w+)", query)
+        if match:
+            self.plan_cache.invalidate_table(match.group(1))
+            self._mark_table_written(match.group(1))
         return Rows.from_list(["DROP TABLE - to be implemented (info cara drop tabel dari storagemngr)"])
 
 
@@ -1,27 +1,127 @@
 # server.py - main Query Processor Server
 # orchestrates query routing ke komponen yang tepat
 
-import socket
-import threading, json
+import asyncio
+import json
+import os
+import re
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
 
 from qp_helper.demo_dependencies import build_query_processor
+from qp_helper.metrics import MetricsRegistry
+from qp_helper.prepared import parse_literal_list
+from qp_helper.query_stats import QueryStats, begin_query, end_query, resume_query
+from qp_helper.query_utils import QueryType, get_query_type, split_statements
+from qp_helper.wire_protocol import result_frames
+from qp_model.Cursor import Cursor
 from qp_model.ExecutionResult import ExecutionResult
+from qp_model.PreparedStatement import PreparedStatement
+from qp_model.Rows import Rows
+
+# PREPARE name AS <query> / EXECUTE name (p1, p2, ...) / DEALLOCATE name
+_PREPARE_PATTERN = re.compile(r"(?is)^PREPARE\s+(\w+)\s+AS\s+(.+?);?$")
+_EXECUTE_PATTERN = re.compile(r"(?is)^EXECUTE\s+(\w+)\s*(\(.*\))?\s*;?$")
+_DEALLOCATE_PATTERN = re.compile(r"(?is)^DEALLOCATE\s+(?:PREPARE\s+)?(\w+)\s*;?$")
+# DECLARE name CURSOR FOR <select> / FETCH [n | NEXT | ALL] [FROM] name / CLOSE name
+_DECLARE_PATTERN = re.compile(r"(?is)^DECLARE\s+(\w+)\s+(?:NO\s+SCROLL\s+)?CURSOR\s+(?:WITH(?:OUT)?\s+HOLD\s+)?FOR\s+(.+?);?$")
+_FETCH_PATTERN = re.compile(r"(?is)^FETCH\s+(?:(NEXT|ALL|\d+)\s+)?(?:(?:FROM|IN)\s+)?(\w+)\s*;?$")
+_CLOSE_PATTERN = re.compile(r"(?is)^CLOSE\s+(\w+)\s*;?$")
+# SET PROTOCOL BINARY / SET PROTOCOL JSON
+_SET_PROTOCOL_PATTERN = re.compile(r"(?is)^SET\s+PROTOCOL\s+(BINARY|JSON)\s*;?$")
+_SHOW_METRICS_PATTERN = re.compile(r"(?is)^SHOW\s+METRICS\s*;?$")
+# command yang di-handle server sendiri, dipakai buat label type di metrics
+SERVER_COMMANDS = ("PREPARE", "EXECUTE", "DEALLOCATE", "DECLARE", "FETCH", "CLOSE", "SET", "SHOW")
+# type yang row-nya dihitung di qp_rows_returned_total (query lain cuma balikin pesan info)
+ROW_RETURNING_TYPES = ("SELECT", "FETCH", "EXECUTE")
+
+PROTOCOL_JSON = "json"
+PROTOCOL_BINARY = "binary"
+
+SERVER_HOST = '0.0.0.0'
+SERVER_PORT = 2345
+SERVER_GREETING = "MariaDanB Query Processor ready"
+LISTEN_BACKLOG = 1024
+# batas panjang satu query (byte); query > 4 KB tetap utuh karena dibaca sampai newline
+MAX_QUERY_BYTES = 16 * 1024 * 1024
+# jumlah thread yang ngeksekusi query barengan
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+# waktu maksimal (detik) nunggu query yang lagi jalan waktu shutdown
+SHUTDOWN_DRAIN_TIMEOUT = 30.0
+# cursor yang ga di-FETCH selama ini (detik) ditutup otomatis
+CURSOR_IDLE_TIMEOUT = 300.0
+# interval pengecekan cursor idle (detik)
+CURSOR_SWEEP_INTERVAL = 30.0
+# jumlah cursor terbuka maksimal per koneksi
+MAX_CURSORS_PER_SESSION = 16
+# jumlah frame yang boleh antri antara thread eksekusi dan socket (backpressure protokol binary)
+FRAME_QUEUE_SIZE = 8
+# port HTTP buat scrape Prometheus (GET /metrics); None = metrics cuma bisa dibaca lewat SHOW METRICS
+METRICS_PORT = None
+
+@dataclass(eq=False)
+class ClientSession:
+    """State per koneksi client (prepared statement, protokol, dll)"""
+    prepared: dict = field(default_factory=dict)
+    # "json" (satu baris JSON per result, mode kompatibilitas) atau "binary" (frame, lihat qp_helper/wire_protocol.py)
+    protocol: str = PROTOCOL_JSON
+    cursors: dict = field(default_factory=dict)
+    # nomor statement terakhir di koneksi ini, dipakai buat nge-tag response
+    last_statement_id: int = 0
+    
+    def next_statement_id(self) -> int:
+        self.last_statement_id += 1
+        return self.last_statement_id
 
 class QueryProcessorServer:
     
     def __init__(self):
         """Initialize server dengan QueryProcessor sebagai model utama"""
         self.query_processor = build_query_processor()
+        # session dipakai kalau caller ga punya session sendiri (misal dipanggil langsung, bukan via socket)
+        self.default_session = ClientSession()
+        self.metrics = MetricsRegistry()
+        self._describe_metrics()
     
-    def execute_query(self, query: str) -> ExecutionResult:
+    def execute_query(self, query: str, session: ClientSession | None = None) -> ExecutionResult:
         """
         Main entry point untuk execute query.
         Delegate ke komponen yang sesuai berdasarkan query type.
         """
         query_stripped = query.strip()
+        stats = begin_query()
+        try:
+            result = self._dispatch_query(query_stripped, session or self.default_session)
+        finally:
+            end_query(stats)
+        rows = result.data.rows_count if isinstance(result.data, Rows) else 0
+        self.record_query(query_stripped, stats, self._is_error(result), rows)
+        return result
+    
+    def _dispatch_query(self, query_stripped: str, session: ClientSession) -> ExecutionResult:
         query_upper = query_stripped.upper()
         
         try:
+            # prepared statement disimpan per session, sisanya langsung ke QueryProcessor
+            if query_upper.startswith(("PREPARE", "EXECUTE", "DEALLOCATE")):
+                return self.execute_prepared_command(query_stripped, session)
+            
+            if query_upper.startswith(("DECLARE", "FETCH", "CLOSE")):
+                return self.execute_cursor_command(query_stripped, session)
+            
+            match = _SET_PROTOCOL_PATTERN.match(query_stripped)
+            if match:
+                session.protocol = match.group(1).lower()
+                return self._info_result(query_stripped, f"PROTOCOL {session.protocol.upper()}")
+            
+            if _SHOW_METRICS_PATTERN.match(query_stripped):
+                return ExecutionResult(transaction_id=None, timestamp=datetime.now(), message="Success", data=Rows.from_list(self.metrics.render().splitlines()), query=query_stripped)
+            
             # delegate all queries (data + transaction control) to QueryProcessor
             return self.query_processor.execute_query(query_stripped)
         
@@ -35,6 +135,202 @@ class QueryProcessorServer:
                 query=query_stripped
             )
     
+    def stream_query(self, query: str, session: ClientSession | None = None) -> tuple[ExecutionResult, Iterator | None]:
+        """
+        Versi streaming execute_query: SELECT biasa return (result tanpa data, iterator row)
+        supaya row bisa dikirim sambil query jalan; query lain dieksekusi biasa dan iterator-nya None.
+        """
+        query_stripped = query.strip()
+        if get_query_type(query_stripped) != QueryType.SELECT:
+            return self.execute_query(query_stripped, session), None
+        
+        stats = begin_query()
+        try:
+            rows = self.query_processor.stream_select(query_stripped)
+        except Exception as e:
+            print(f"[Server Error] {str(e)}")
+            self.record_query(query_stripped, stats, True, 0)
+            self.query_processor.log_if_slow(query_stripped, stats, 0, True)
+            return self._error_result(query_stripped, f"Error: {str(e)}"), None
+        finally:
+            end_query(stats)
+        
+        result = ExecutionResult(transaction_id=None, timestamp=datetime.now(), message="Success", data=Rows.from_list([]), query=query_stripped)
+        return result, self._track_rows(query_stripped, stats, rows)
+    
+    def _track_rows(self, query: str, stats: QueryStats, rows: Iterator) -> Iterator:
+        """
+        Hitung row SELECT streaming; metrics + slow query log dicatat waktu iterator habis / berhenti
+        (waktu execute termasuk encode + kirim). Row yang di-scan pipeline ikut kecatat di QueryStats query ini.
+        """
+        count = 0
+        error = False
+        resume_query(stats)
+        try:
+            for row in rows:
+                count += 1
+                yield row
+        except Exception:
+            error = True
+            raise
+        finally:
+            end_query(stats)
+            self.record_query(query, stats, error, count)
+            self.query_processor.log_if_slow(query, stats, count, error)
+    
+    def record_query(self, query: str, stats: QueryStats, error: bool, rows: int):
+        """Update metrics untuk satu query yang udah selesai (fase parse / optimize dari QueryStats, sisanya execute)"""
+        elapsed = stats.elapsed()
+        query_type = self._metric_type(query)
+        labels = (("type", query_type),)
+        metrics = self.metrics
+        metrics.mark_query()
+        metrics.inc("qp_queries_total", labels)
+        if error:
+            metrics.inc("qp_query_errors_total", labels)
+        if rows and query_type in ROW_RETURNING_TYPES:
+            metrics.inc("qp_rows_returned_total", labels, rows)
+        metrics.observe("qp_query_duration_seconds", elapsed, labels)
+        for phase in ("parse", "optimize"):
+            if phase in stats.phases:
+                metrics.observe("qp_query_phase_seconds", stats.phases[phase], (("phase", phase),))
+        metrics.observe("qp_query_phase_seconds", max(elapsed - sum(stats.phases.values()), 0.0), (("phase", "execute"),))
+    
+    def record_serialize(self, seconds: float):
+        self.metrics.observe("qp_query_phase_seconds", seconds, (("phase", "serialize"),))
+    
+    def _metric_type(self, query: str) -> str:
+        query_type = get_query_type(query)
+        if query_type != QueryType.UNKNOWN:
+            return query_type.name
+        keyword = query.split(None, 1)[0].upper() if query.split() else ""
+        return keyword if keyword in SERVER_COMMANDS else "UNKNOWN"
+    
+    @staticmethod
+    def _is_error(result: ExecutionResult) -> bool:
+        return (isinstance(result.data, int) and result.data == -1) or str(result.message).startswith("Error")
+    
+    def _describe_metrics(self):
+        describe = self.metrics.describe
+        describe("qp_queries_total", "counter", "Queries executed, by query type.")
+        describe("qp_query_errors_total", "counter", "Queries that returned an error, by query type.")
+        describe("qp_rows_returned_total", "counter", "Rows returned to clients, by query type.")
+        describe("qp_query_duration_seconds", "histogram", "End-to-end query latency (excluding serialization), by query type.")
+        describe("qp_query_phase_seconds", "histogram", "Query latency per phase: parse, optimize, execute, serialize.")
+        describe("qp_queries_per_second", "gauge", "Queries per second over the last minute.")
+        describe("qp_uptime_seconds", "gauge", "Seconds since the server started.")
+        describe("qp_cache_hits_total", "counter", "Cache hits, by cache.")
+        describe("qp_cache_misses_total", "counter", "Cache misses, by cache.")
+        describe("qp_cache_evictions_total", "counter", "Cache evictions, by cache.")
+        describe("qp_cache_hit_ratio", "gauge", "Cache hit ratio since start, by cache.")
+        describe("qp_cache_entries", "gauge", "Entries held, by cache.")
+        describe("qp_cache_bytes", "gauge", "Bytes held by byte-budgeted caches.")
+        self.metrics.register_collector(self._collect_server_metrics)
+    
+    def _collect_server_metrics(self):
+        yield "qp_queries_per_second", (), self.metrics.queries_per_second()
+        yield "qp_uptime_seconds", (), time.time() - self.metrics.started
+        for cache, stats in self.query_processor.cache_stats().items():
+            if stats is None:
+                continue
+            labels = (("cache", cache),)
+            yield "qp_cache_hits_total", labels, stats["hits"]
+            yield "qp_cache_misses_total", labels, stats["misses"]
+            yield "qp_cache_evictions_total", labels, stats["evictions"]
+            yield "qp_cache_hit_ratio", labels, stats["hit_ratio"]
+            yield "qp_cache_entries", labels, stats["entries"]
+            if cache != "plan_cache":
+                yield "qp_cache_bytes", labels, stats["weight"]
+    
+    def execute_prepared_command(self, query: str, session: ClientSession) -> ExecutionResult:
+        """Handle PREPARE / EXECUTE / DEALLOCATE untuk satu session"""
+        match = _PREPARE_PATTERN.match(query)
+        if match:
+            name, statement_query = match.group(1).lower(), match.group(2)
+            statement: PreparedStatement = self.query_processor.prepare(statement_query)
+            session.prepared[name] = statement
+            return self._info_result(query, f"PREPARE {name} ({statement.param_count} parameters)")
+        
+        match = _EXECUTE_PATTERN.match(query)
+        if match:
+            name = match.group(1).lower()
+            statement = session.prepared.get(name)
+            if statement is None:
+                return self._error_result(query, f"Error: prepared statement '{name}' does not exist")
+            params = parse_literal_list(match.group(2) or "")
+            return self.query_processor.execute(statement, params)
+        
+        match = _DEALLOCATE_PATTERN.match(query)
+        if match:
+            name = match.group(1).lower()
+            if session.prepared.pop(name, None) is None:
+                return self._error_result(query, f"Error: prepared statement '{name}' does not exist")
+            return self._info_result(query, f"DEALLOCATE {name}")
+        
+        return self._error_result(query, "Error: unknown query syntax")
+    
+    def execute_cursor_command(self, query: str, session: ClientSession) -> ExecutionResult:
+        """Handle DECLARE / FETCH / CLOSE cursor untuk satu session"""
+        self.expire_cursors(session)
+        
+        match = _DECLARE_PATTERN.match(query)
+        if match:
+            name, select_query = match.group(1).lower(), match.group(2)
+            if name in session.cursors:
+                return self._error_result(query, f"Error: cursor '{name}' already exists")
+            if len(session.cursors) >= MAX_CURSORS_PER_SESSION:
+                return self._error_result(query, f"Error: too many open cursors (max {MAX_CURSORS_PER_SESSION})")
+            if get_query_type(select_query) != QueryType.SELECT:
+                return self._error_result(query, "Error: DECLARE CURSOR only supports SELECT")
+            # pipeline baru jalan waktu FETCH, jadi memory server cuma sebesar batch yang di-fetch
+            rows = self.query_processor.stream_select(select_query, use_result_cache=False)
+            session.cursors[name] = Cursor(name=name, query=select_query, rows=rows)
+            return self._info_result(query, f"DECLARE CURSOR {name}")
+        
+        match = _FETCH_PATTERN.match(query)
+        if match:
+            amount, name = (match.group(1) or "NEXT").upper(), match.group(2).lower()
+            cursor: Cursor | None = session.cursors.get(name)
+            if cursor is None:
+                return self._error_result(query, f"Error: cursor '{name}' does not exist")
+            count = None if amount == "ALL" else 1 if amount == "NEXT" else int(amount)
+            rows = cursor.fetch(count)
+            return ExecutionResult(transaction_id=None, timestamp=datetime.now(), message="Success", data=Rows.from_list(rows), query=query)
+        
+        match = _CLOSE_PATTERN.match(query)
+        if match:
+            name = match.group(1).lower()
+            cursor = session.cursors.pop(name, None)
+            if cursor is None:
+                return self._error_result(query, f"Error: cursor '{name}' does not exist")
+            cursor.close()
+            return self._info_result(query, f"CLOSE CURSOR {name}")
+        
+        return self._error_result(query, "Error: unknown query syntax")
+    
+    def expire_cursors(self, session: ClientSession, timeout: float = CURSOR_IDLE_TIMEOUT) -> int:
+        """Tutup cursor yang idle lebih dari timeout detik, return jumlah yang ditutup"""
+        expired = 0
+        for name, cursor in list(session.cursors.items()):
+            if cursor.idle_seconds() > timeout and cursor.close(blocking=False):
+                session.cursors.pop(name, None)
+                expired += 1
+        return expired
+    
+    def close_session(self, session: ClientSession):
+        """Dipanggil waktu koneksi ditutup: lepas semua cursor dan prepared statement session"""
+        for cursor in list(session.cursors.values()):
+            # cursor yang lagi di-FETCH di thread lain dilepas aja, generator-nya ditutup waktu di-GC
+            cursor.close(blocking=False)
+        session.cursors.clear()
+        session.prepared.clear()
+    
+    def _info_result(self, query: str, info: str) -> ExecutionResult:
+        return ExecutionResult(transaction_id=None, timestamp=datetime.now(), message="Success", data=Rows.from_list([info]), query=query)
+    
+    def _error_result(self, query: str, message: str) -> ExecutionResult:
+        return ExecutionResult(transaction_id=None, timestamp=datetime.now(), message=message, data=-1, query=query)
+    
     # transaction lifecycle is handled by QueryProcessor / QueryExecutor
     
     def get_current_transaction(self):
@@ -43,6 +339,7 @@ class QueryProcessorServer:
     
     def shutdown(self):
         """Graceful shutdown - server cleanup"""
+        self.query_processor.close()
         print("[Shutdown] Server shutdown complete")
 
 
@@ -59,10 +356,31 @@ class CLIInterface:
     - run() - main CLI loop
     """
     
-    def __init__(self, server: QueryProcessorServer):
+    def __init__(
+        self,
+        server: QueryProcessorServer,
+        host: str = SERVER_HOST,
+        port: int = SERVER_PORT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        metrics_port: int | None = METRICS_PORT,
+    ):
         """Initialize CLI dengan server instance"""
         self.server = server
-        raise NotImplementedError("CLI Interface belum diimplementasikan - assign ke team member")
+        self.host = host
+        self.port = port
+        self.metrics_port = metrics_port
+        # query dieksekusi di pool berukuran tetap, koneksi idle cuma makan coroutine
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stopping: asyncio.Event | None = None
+        # task handler per koneksi, dan writer koneksi yang lagi nunggu query (idle)
+        self._handlers: set = set()
+        self._idle: set = set()
+        self._sessions: set = set()
+        server.metrics.describe("qp_active_connections", "gauge", "Open client connections.")
+        server.metrics.describe("qp_connections_total", "counter", "Client connections accepted.")
+        server.metrics.register_collector(lambda: [("qp_active_connections", (), len(self._sessions))])
     
     def display_banner(self):
         """Display server banner dan available commands"""
@@ -80,85 +398,236 @@ class CLIInterface:
         """Get formatted input prompt"""
         raise NotImplementedError("To be implemented")
     
-    def handle_client(self, client_socket : socket.socket, client_address):
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         """
-        The function executed by the server upon a client connection.
-        It handles sending and receiving data for that specific client.
+        Coroutine per koneksi client. Framing: satu baris (diakhiri newline) berisi satu statement
+        atau batch "stmt1; stmt2; ...". Client boleh ngirim banyak baris tanpa nunggu response (pipelining);
+        statement dieksekusi berurutan dan tiap response di-tag statement_id (nomor urut per koneksi).
+        Eksekusi query jalan di executor pool supaya event loop ga ke-block.
         """
+        client_address = writer.get_extra_info("peername")
         print(f"Connection accepted from: {client_address}")
+        session = ClientSession()
+        self._handlers.add(asyncio.current_task())
+        self._sessions.add(session)
+        self.server.metrics.inc("qp_connections_total")
 
         try:
-           while True:
-                query_bytes = client_socket.recv(4096) 
-                if not query_bytes:
+            writer.write(f"{SERVER_GREETING}\n".encode("utf-8"))
+            await writer.drain()
+
+            while not self._stopping.is_set():
+                self._idle.add(writer)
+                try:
+                    query = await self._read_query(reader, writer, session)
+                finally:
+                    self._idle.discard(writer)
+                if query is None:
                     break
+                if not query:
+                    continue
+
+                for statement in split_statements(query):
+                    if statement.rstrip(";").strip().upper() in ["QUIT", "EXIT"]:
+                        return
 
-                query = query_bytes.decode('utf-8').strip()
-                print(f"[{client_address}] Query: {query}")
-                
-                if query.upper() in ["QUIT", "EXIT"]:
-                    break 
-
-                # exec query
-                execResult: ExecutionResult = self.server.execute_query(query)
-                
-                # Convert the ExecutionResult object to a JSON dictionary
-                result_dict = execResult.to_json_dict()
-                
-                # Convert the dictionary to a JSON string, then encode it to bytes
-                json_string = json.dumps(result_dict) + "\n"
-                data_to_send = json_string.encode('utf-8')
-                
-                # Send the byte data
-                client_socket.sendall(data_to_send)
+                    statement_id = session.next_statement_id()
+                    print(f"[{client_address}] Query #{statement_id}: {statement}")
+                    await self._respond(writer, statement, session, statement_id)
 
+        except (ConnectionError, asyncio.CancelledError):
+            pass
         except Exception as e:
             print(f"Error handling client {client_address}: {e}")
 
         finally:
-            # 3. Always close the connection
-            client_socket.close()
+            self._handlers.discard(asyncio.current_task())
+            self._sessions.discard(session)
+            self.server.close_session(session)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
             print(f"🚪 Connection with {client_address} closed.")
-    
-    def run(self):
-        HOST = '0.0.0.0'
-        PORT = 2345
 
-        # Create a TCP/IP socket
-        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        
-        # Allows the socket to be immediately reusable (useful for debugging)
-        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    async def _read_query(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, session: ClientSession) -> str | None:
+        """Baca satu query (sampai newline). Return None kalau koneksi ditutup."""
+        try:
+            line = await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            # client lama yang ga kirim newline: sisa data sebelum EOF dianggap query terakhir
+            line = e.partial
+            if not line.strip():
+                return None
+        except asyncio.LimitOverrunError:
+            # error dikirim pakai protokol session (frame kalau udah SET PROTOCOL BINARY), lalu koneksi ditutup
+            result = self.server._error_result("", f"Error: query exceeds {MAX_QUERY_BYTES} bytes")
+            writer.write(self._encode_result(result, session.protocol, session.next_statement_id()))
+            await writer.drain()
+            return None
+        return line.decode("utf-8").strip()
+
+    async def _respond(self, writer: asyncio.StreamWriter, query: str, session: ClientSession, statement_id: int):
+        """Eksekusi satu statement lalu kirim response-nya sesuai protokol session"""
+        # protokol dicek sebelum eksekusi, jadi response SET PROTOCOL masih pakai protokol lama
+        protocol = session.protocol
+        if protocol == PROTOCOL_BINARY:
+            result, rows = await self._loop.run_in_executor(self._executor, self.server.stream_query, query, session)
+            if rows is not None:
+                await self._send_frames(writer, lambda: result_frames(result, rows, statement_id=statement_id))
+                return
+            # result udah lengkap (bukan SELECT streaming), semua frame dikirim sekaligus
+        else:
+            # exec query di thread pool
+            result = await self._loop.run_in_executor(self._executor, self.server.execute_query, query, session)
+
+        started = time.perf_counter()
+        payload = self._encode_result(result, protocol, statement_id)
+        self.server.record_serialize(time.perf_counter() - started)
+        writer.write(payload)
+        await writer.drain()
 
+    @staticmethod
+    def _encode_result(result: ExecutionResult, protocol: str, statement_id: int) -> bytes:
+        """Encode result yang udah lengkap: semua frame (binary) atau satu baris JSON"""
+        if protocol == PROTOCOL_BINARY:
+            return b"".join(result_frames(result, statement_id=statement_id))
+        result_dict = result.to_json_dict()
+        result_dict["statement_id"] = statement_id
+        return (json.dumps(result_dict) + "\n").encode("utf-8")
+
+    async def _send_frames(self, writer: asyncio.StreamWriter, produce: Callable[[], Iterable[bytes]]):
+        """
+        produce() (eksekusi query + encode frame) jalan di executor pool, frame dikirim ke socket
+        lewat queue terbatas: kalau client lambat baca, thread eksekusi ikut nunggu (backpressure).
+        Kalau koneksi putus di tengah jalan, pipeline-nya dihentikan.
+        """
+        frames: asyncio.Queue = asyncio.Queue(maxsize=FRAME_QUEUE_SIZE)
+        cancelled = threading.Event()
+        loop = self._loop
+
+        def push(frame):
+            if not cancelled.is_set():
+                asyncio.run_coroutine_threadsafe(frames.put(frame), loop).result()
+
+        def producer():
+            try:
+                for frame in produce():
+                    if cancelled.is_set():
+                        break
+                    push(frame)
+            finally:
+                push(None)
+
+        task = loop.run_in_executor(self._executor, producer)
         try:
-            # Bind the socket to the address and port
-            server_socket.bind((HOST, PORT))
-            
-            # Enable the server to accept connections (up to 5 queued connections)
-            server_socket.listen(5)
-            print(f"Server listening on {HOST}:{PORT}")
-
-            while True:
-                # Wait for a connection
-                # client_socket is the new socket used for communication
-                # client_address is the (host, port) of the client
-                client_socket, client_address = server_socket.accept()
-                
-                # Start a new thread to handle the client communication
-                client_handler = threading.Thread(
-                    target=self.handle_client,
-                    args=(client_socket, client_address)
-                )
-                client_handler.start()
+            while (frame := await frames.get()) is not None:
+                writer.write(frame)
+                await writer.drain()
+            await task
+        finally:
+            if not task.done():
+                # consumer gagal (koneksi putus): lepasin producer yang lagi nunggu queue
+                cancelled.set()
+                while not task.done():
+                    while not frames.empty():
+                        frames.get_nowait()
+                    await asyncio.wait({task}, timeout=0.05)
+
+    async def serve(self):
+        """Jalankan asyncio server sampai stop() dipanggil (atau SIGINT / SIGTERM), lalu shutdown graceful"""
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="qp-worker")
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(sig, self._stopping.set)
+            except (NotImplementedError, RuntimeError):
+                # windows / bukan main thread: Ctrl+C tetap nge-cancel serve() lewat asyncio.run
+                pass
+
+        tcp_server = await asyncio.start_server(
+            self.handle_client, self.host, self.port, limit=MAX_QUERY_BYTES, backlog=LISTEN_BACKLOG
+        )
+        print(f"Server listening on {self.host}:{self.port} ({self.max_workers} workers)")
 
+        metrics_server = None
+        if self.metrics_port is not None:
+            metrics_server = await asyncio.start_server(self._serve_metrics, self.host, self.metrics_port)
+            print(f"Metrics available on http://{self.host}:{self.metrics_port}/metrics")
+
+        sweeper = asyncio.create_task(self._expire_idle_cursors())
+        try:
+            await self._stopping.wait()
+        finally:
+            sweeper.cancel()
+            if metrics_server is not None:
+                metrics_server.close()
+            await self._shutdown(tcp_server)
+
+    async def _serve_metrics(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """HTTP minimal buat Prometheus: GET /metrics -> text exposition format, path lain 404"""
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            # header request dibaca sampai baris kosong lalu diabaikan
+            while (await reader.readline()).strip():
+                pass
+            if len(request_line) >= 2 and request_line[0] == "GET" and request_line[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.server.metrics.render().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _expire_idle_cursors(self):
+        """Tutup cursor idle secara berkala, termasuk di koneksi yang udah ga ngirim query"""
+        while True:
+            await asyncio.sleep(CURSOR_SWEEP_INTERVAL)
+            for session in list(self._sessions):
+                self.server.expire_cursors(session)
+
+    async def _shutdown(self, tcp_server: asyncio.AbstractServer):
+        """
+        Berhenti nerima koneksi baru, tutup koneksi yang idle, lalu tunggu koneksi
+        yang lagi ngeksekusi query selesai ngirim response-nya (maksimal SHUTDOWN_DRAIN_TIMEOUT).
+        """
+        self._stopping.set()
+        tcp_server.close()
+
+        for writer in list(self._idle):
+            writer.close()
+
+        busy = [task for task in self._handlers if not task.done()]
+        if busy:
+            print(f"[Shutdown] Waiting for {len(busy)} in-flight queries...")
+            _, still_running = await asyncio.wait(busy, timeout=SHUTDOWN_DRAIN_TIMEOUT)
+            for task in still_running:
+                task.cancel()
+
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.server.shutdown()
+
+    def stop(self):
+        """Minta server berhenti (aman dipanggil dari thread lain)"""
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    def run(self):
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            pass
         except Exception as e:
             print(f"Server error: {e}")
-        
-        finally:
-            # This part may not be reached in a typical server loop, 
-            # but is good practice for graceful shutdown
-            server_socket.close()
-        raise NotImplementedError("To be implemented")
 
 
 def main():
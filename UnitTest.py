@@ -1,4 +1,35 @@
 from qp_helper.demo_dependencies import build_query_processor
+from Server import QueryProcessorServer
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from qp_helper.aggregate import parse_aggregate
+from qp_helper.buffer_cache import BufferCache
+from qp_helper.bulk_insert import parse_insert
+from qp_helper.lru_cache import LRUCache
+from qp_helper.metrics import MetricsRegistry
+from qp_helper.parallel import WorkerPool, parallel_filter
+from qp_helper.parallel_join import JoinSpec, parallel_hash_join
+from qp_helper.plan_cache import describe_value, plan_fingerprint
+from qp_helper.csv_loader import resolve_copy_path
+from qp_helper.result_cache import ResultCache
+from qp_helper.condition_adapter import NormalizedCondition
+from qp_helper.predicate import compile_selection
+from qp_helper.sort_utils import sort_value_key, top_n
+from qp_helper.external_sort import estimate_row_size
+from qp_helper.prepared import bind_parameters, find_parameter_slots, parse_literal_list, replace_placeholders
+from qp_helper.query_stats import QueryStats
+from qp_helper.query_utils import split_statements
+from qp_helper.slow_query_log import SlowQueryLog
+from qp_helper import wire_protocol
+from qp_helper.wire_protocol import CODEC_JSON, CODEC_MSGPACK, FRAME_BATCH, FRAME_HEADER, FRAME_TRAILER, decode_rows, encode_frame, read_frame, result_frames
+from qp_model.Cursor import Cursor
+from qp_model.ExecutionResult import ExecutionResult
+from qp_model.Rows import Rows
 
 # TODO: masih belum sesuai
 
@@ -166,6 +197,975 @@ def test_select_where_with_limit():
     assert result.data.rows_count <= 3, "Should return at most 3 rows"
     print("✓ Test passed!")
 
+def test_explain_analyze():
+    print("\n" + "="*60)
+    print("TEST 10: EXPLAIN ANALYZE")
+    print("="*60)
+    
+    qp = build_query_processor()
+    qp.buffer_cache = BufferCache(1024 * 1024)
+    query = "EXPLAIN ANALYZE SELECT * FROM Student LIMIT 5;"
+    result = qp.execute_query(query)
+    
+    print(f"Query: {query}")
+    print(f"Message: {result.message}")
+    for row in result.data.data:
+        print(row)
+    
+    assert result.message == "Success", "Query should succeed"
+    root = result.data.data[0]
+    assert root["parent"] is None, "First row should be the root node"
+    assert root["executed"] and root["rows_out"] <= 5, "Root should report at most 5 output rows"
+    assert all("time_ms" in row for row in result.data.data), "Every node should have timing"
+    
+    # run kedua (buffer cache udah dihangatin SELECT biasa) harus ngasih profile yang sama
+    query = "EXPLAIN ANALYZE SELECT * FROM Student WHERE StudentID > 25;"
+    first = qp.execute_query(query)
+    qp.execute_query("SELECT * FROM Student WHERE StudentID > 25;")
+    second = qp.execute_query(query)
+    counters = ("operator", "executed", "rows_in", "rows_out", "storage_calls", "storage_bytes")
+    first_profile = [{key: row[key] for key in counters} for row in first.data.data]
+    second_profile = [{key: row[key] for key in counters} for row in second.data.data]
+    print(f"Second run: {second_profile}")
+    assert first_profile == second_profile, "Repeated EXPLAIN ANALYZE should report the same counts"
+    assert sum(row["storage_calls"] for row in second.data.data) >= 1, "EXPLAIN ANALYZE should read from storage every time"
+    print("✓ Test passed!")
+
+def test_group_by_aggregates():
+    print("\n" + "="*60)
+    print("TEST 11: GROUP BY with Aggregates")
+    print("="*60)
+    
+    qp = build_query_processor()
+    rows = [
+        {"Major": "CS", "GPA": 3.0},
+        {"Major": "EE", "GPA": 2.0},
+        {"Major": "CS", "GPA": 4.0},
+        {"Major": "EE", "GPA": 3.0},
+        {"Major": "CS", "GPA": 3.5},
+    ]
+    aggregates = [parse_aggregate(expr) for expr in ("COUNT(*)", "SUM(GPA)", "AVG(GPA)", "MIN(GPA)", "MAX(GPA) AS best")]
+    result = list(qp._apply_group(rows, "Major", aggregates))
+    
+    for row in result:
+        print(row)
+    
+    assert [row["Major"] for row in result] == ["CS", "EE"], "Groups should come out in first-seen order"
+    cs, ee = result
+    assert cs["COUNT(*)"] == 3 and cs["SUM(GPA)"] == 10.5, "CS count/sum mismatch"
+    assert cs["AVG(GPA)"] == 3.5 and cs["MIN(GPA)"] == 3.0 and cs["best"] == 4.0, "CS avg/min/max mismatch"
+    assert ee["COUNT(*)"] == 2 and ee["AVG(GPA)"] == 2.5, "EE count/avg mismatch"
+    print("✓ Test passed!")
+
+def test_aggregates_with_null():
+    print("\n" + "="*60)
+    print("TEST 12: Aggregates with NULL values")
+    print("="*60)
+    
+    qp = build_query_processor()
+    rows = [
+        {"Major": "CS", "GPA": None},
+        {"Major": "CS", "GPA": 3.0},
+        {"Major": "EE", "GPA": None},
+    ]
+    aggregates = [parse_aggregate(expr) for expr in ("COUNT(*)", "COUNT(GPA)", "SUM(GPA)", "AVG(GPA)", "MIN(GPA)", "MAX(GPA)")]
+    result = {row["Major"]: row for row in qp._apply_group(rows, "Major", aggregates)}
+    
+    for row in result.values():
+        print(row)
+    
+    assert result["CS"]["COUNT(*)"] == 2 and result["CS"]["COUNT(GPA)"] == 1, "COUNT(col) should skip NULL"
+    assert result["CS"]["SUM(GPA)"] == 3.0 and result["CS"]["AVG(GPA)"] == 3.0, "SUM/AVG should ignore NULL"
+    ee = result["EE"]
+    assert ee["COUNT(*)"] == 1 and ee["COUNT(GPA)"] == 0, "All-NULL group should count 0 values"
+    assert ee["SUM(GPA)"] is None and ee["AVG(GPA)"] is None, "SUM/AVG of only NULL should be NULL"
+    assert ee["MIN(GPA)"] is None and ee["MAX(GPA)"] is None, "MIN/MAX of only NULL should be NULL"
+    
+    empty = list(qp._apply_group([], None, aggregates))
+    assert len(empty) == 1 and empty[0]["COUNT(*)"] == 0 and empty[0]["SUM(GPA)"] is None, "Aggregate without GROUP BY should return one row"
+    print("✓ Test passed!")
+
+def test_group_hash_matches_sorted():
+    print("\n" + "="*60)
+    print("TEST 13: Hash and Sorted GROUP BY agree")
+    print("="*60)
+    
+    qp = build_query_processor()
+    rows = [
+        {"Major": major, "Year": year, "GPA": None if i % 7 == 0 else round(2.0 + (i % 9) * 0.25, 2)}
+        for i, (major, year) in enumerate((m, y) for m in ("CS", "EE", "IF", "MA") for y in (2021, 2022, 2023) for _ in range(4))
+    ]
+    rows.reverse()
+    aggregates = [parse_aggregate(expr) for expr in ("COUNT(*)", "COUNT(GPA)", "SUM(GPA)", "AVG(GPA)", "MIN(GPA)", "MAX(GPA)")]
+    presorted = sorted(rows, key=lambda row: (row["Major"], row["Year"]))
+    
+    hashed = list(qp._apply_group(rows, "Major, Year", aggregates))
+    streamed = list(qp._apply_group(presorted, "Major, Year", aggregates, presorted=True))
+    
+    print(f"Groups (hash): {len(hashed)}, groups (sorted): {len(streamed)}")
+    
+    def by_key(result):
+        return {(row["Major"], row["Year"]): row for row in result}
+    
+    assert len(hashed) == len(streamed) == 12, "Both paths should produce 12 groups"
+    hashed, streamed = by_key(hashed), by_key(streamed)
+    for key, row in hashed.items():
+        other = streamed[key]
+        for spec in aggregates:
+            a, b = row[spec.label], other[spec.label]
+            same = (a is None and b is None) or (a is not None and b is not None and abs(a - b) < 1e-9)
+            assert same, f"{spec.label} differs for {key}: {a} != {b}"
+    print("✓ Test passed!")
+
+def test_prepared_placeholders():
+    print("\n" + "="*60)
+    print("TEST 14: Prepared Statement Placeholders")
+    print("="*60)
+    
+    query = "SELECT * FROM Student WHERE FullName = 'Who?' AND StudentID = ? AND GPA > ?;"
+    marked, count = replace_placeholders(query)
+    print(f"Marked query: {marked}")
+    
+    assert count == 2, "Only placeholders outside string literals should be counted"
+    assert "'Who?'" in marked, "Placeholder inside a string literal should be kept"
+    assert "'__qp_param_0__'" in marked and "'__qp_param_1__'" in marked, "Placeholders should become marker literals"
+    
+    # SIGMA dengan kondisi string (text), SIGMA dengan ConditionNode (condition), dan item SET (update)
+    condition = SimpleNamespace(column="GPA", operator=">", value="'__qp_param_1__'")
+    text_sigma = SimpleNamespace(type="SIGMA", val="StudentID = '__qp_param_0__'", childs=[SimpleNamespace(type="TABLE", val="Student", childs=[])])
+    condition_sigma = SimpleNamespace(type="SIGMA", val=condition, childs=[text_sigma])
+    update = SimpleNamespace(type="UPDATE", val=[SimpleNamespace(column="FullName", value="'__qp_param_2__'")], childs=[condition_sigma])
+    
+    slots = find_parameter_slots(update)
+    print(f"Slots: {slots}")
+    assert sorted((slot.kind, slot.param_index) for slot in slots) == [("condition", 1), ("text", 0), ("update", 2)], "Every marker should get a slot"
+    
+    bound = bind_parameters(update, slots, [7, 3.5, "Budi"])
+    assert bound.val[0].value == "Budi", "SET value should be bound"
+    assert bound.childs[0].val.value == 3.5, "Condition value should be bound"
+    text_bound = bound.childs[0].childs[0].val
+    assert (text_bound.column, text_bound.operator, text_bound.value) == ("StudentID", "=", 7), "Text condition should be bound"
+    assert update.val[0].value == "'__qp_param_2__'" and condition.value == "'__qp_param_1__'", "Original tree should not change"
+    assert text_sigma.val == "StudentID = '__qp_param_0__'", "Original text condition should not change"
+    
+    assert parse_literal_list("(17, 'Bu''di', 3.5, NULL)") == [17, "Bu'di", 3.5, None], "Literal list should be parsed"
+    print("✓ Test passed!")
+
+def test_prepared_execute():
+    print("\n" + "="*60)
+    print("TEST 15: PREPARE and EXECUTE")
+    print("="*60)
+    
+    qp = build_query_processor()
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "slow.log")
+        qp.slow_query_log = SlowQueryLog(log_path, threshold=0.0)
+        
+        statement = qp.prepare("SELECT * FROM Student WHERE StudentID = ?;")
+        result = qp.execute(statement, [3])
+        mismatch = qp.execute(statement, [])
+        qp.close()
+        
+        print(f"Parameters: {statement.param_count}")
+        print(f"Message: {result.message}")
+        print(f"Mismatch message: {mismatch.message}")
+        
+        assert statement.param_count == 1, "Statement should have one parameter"
+        assert result.message == "Success", "EXECUTE should succeed"
+        assert mismatch.data == -1 and "expected 1 parameters, got 0" in mismatch.message, "Parameter count mismatch should be an error"
+        
+        with open(log_path, encoding="utf-8") as log_file:
+            entries = [json.loads(line) for line in log_file]
+        assert len(entries) == 2, "Both EXECUTE calls should reach the slow query log"
+        assert entries[0]["plan"] and not entries[0]["error"] and entries[1]["error"], "Slow log entry should carry plan and error flag"
+    print("✓ Test passed!")
+
+def test_result_cache_invalidation():
+    print("\n" + "="*60)
+    print("TEST 16: Result Cache sees writes")
+    print("="*60)
+    
+    qp = build_query_processor()
+    qp.result_cache = ResultCache(1024 * 1024)
+    query = "SELECT StudentID, GPA FROM Student WHERE StudentID = 3;"
+    
+    before = qp.execute_query(query)
+    cached = qp.execute_query(query)
+    original_gpa = before.data.data[0]["GPA"]
+    new_gpa = 1.25 if original_gpa != 1.25 else 1.5
+    try:
+        update = qp.execute_query(f"UPDATE Student SET GPA = {new_gpa} WHERE StudentID = 3;")
+        after = qp.execute_query(query)
+    finally:
+        qp.execute_query(f"UPDATE Student SET GPA = {original_gpa} WHERE StudentID = 3;")
+    
+    print(f"Before: {before.data.data}")
+    print(f"After: {after.data.data}")
+    print(f"Cache stats: {qp.cache_stats()['result_cache']}")
+    
+    assert update.message == "Success", "UPDATE should succeed"
+    assert cached.data.data == before.data.data, "Repeated SELECT should return the cached rows"
+    assert qp.cache_stats()["result_cache"]["hits"] >= 1, "Repeated SELECT should hit the result cache"
+    assert float(after.data.data[0]["GPA"]) == new_gpa, "SELECT after UPDATE should see the new value"
+    print("✓ Test passed!")
+
+def test_buffer_cache_isolation():
+    print("\n" + "="*60)
+    print("TEST 17: Buffer Cache rows are not shared")
+    print("="*60)
+    
+    qp = build_query_processor()
+    qp.buffer_cache = BufferCache(1024 * 1024)
+    query = "SELECT * FROM Student WHERE StudentID = 3;"
+    
+    first = qp.execute_query(query)
+    original = dict(first.data.data[0])
+    first.data.data[0]["GPA"] = -1
+    second = qp.execute_query(query)
+    second.data.data[0]["FullName"] = "changed"
+    third = qp.execute_query(query)
+    
+    print(f"Cached row: {third.data.data}")
+    print(f"Cache stats: {qp.cache_stats()['buffer_cache']}")
+    
+    assert qp.cache_stats()["buffer_cache"]["hits"] >= 2, "Repeated scans should hit the buffer cache"
+    assert third.data.data[0] == original, "Mutating a returned row should not change the cached row"
+    print("✓ Test passed!")
+
+def test_buffer_cache_invalidation():
+    print("\n" + "="*60)
+    print("TEST 18: Buffer Cache sees UPDATE and INSERT")
+    print("="*60)
+    
+    qp = build_query_processor()
+    qp.buffer_cache = BufferCache(1024 * 1024)
+    query = "SELECT * FROM Student;"
+    
+    before = qp.execute_query(query)
+    original_gpa = next(row["GPA"] for row in before.data.data if row["StudentID"] == 3)
+    new_gpa = 1.25 if original_gpa != 1.25 else 1.5
+    try:
+        qp.execute_query(f"UPDATE Student SET GPA = {new_gpa} WHERE StudentID = 3;")
+        after_update = qp.execute_query(query)
+        qp.execute_query("INSERT INTO Student (StudentID, FullName, GPA) VALUES (9999, 'Cache Test', 3.0);")
+        after_insert = qp.execute_query(query)
+    finally:
+        qp.execute_query(f"UPDATE Student SET GPA = {original_gpa} WHERE StudentID = 3;")
+        qp.execute_query("DELETE FROM Student WHERE StudentID = 9999;")
+    
+    print(f"Rows before: {before.data.rows_count}, after INSERT: {after_insert.data.rows_count}")
+    
+    updated = next(row for row in after_update.data.data if row["StudentID"] == 3)
+    assert float(updated["GPA"]) == new_gpa, "SELECT after UPDATE should see the new value"
+    assert after_insert.data.rows_count == before.data.rows_count + 1, "SELECT after INSERT should see the new row"
+    assert any(row["FullName"] == "Cache Test" for row in after_insert.data.data), "Inserted row should be returned"
+    print("✓ Test passed!")
+
+def test_copy_path_confined():
+    print("\n" + "="*60)
+    print("TEST 19: COPY paths stay inside copy_directory")
+    print("="*60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        copy_dir = os.path.join(tmp, "copy")
+        os.makedirs(os.path.join(copy_dir, "sub"))
+        allowed = resolve_copy_path(copy_dir, "sub/../data.csv")
+        print(f"Resolved: {allowed}")
+        assert allowed == os.path.join(os.path.realpath(copy_dir), "data.csv"), "Relative path should resolve inside the directory"
+        
+        rejected = [None, os.path.join(tmp, "data.csv"), "../data.csv", "sub/../../data.csv"]
+        for path in rejected:
+            try:
+                resolve_copy_path(copy_dir if path else None, path or "data.csv")
+            except ValueError as e:
+                print(f"Rejected {path!r}: {e}")
+            else:
+                raise AssertionError(f"Path {path!r} should be rejected")
+    
+    qp = build_query_processor()
+    result = qp.execute_query("COPY Student FROM '/etc/passwd';")
+    print(f"Message: {result.data.data}")
+    assert "disabled" in result.data.data[0], "COPY from a file should be off without copy_directory"
+    print("✓ Test passed!")
+
+def test_update_write_shapes():
+    print("\n" + "="*60)
+    print("TEST 20: UPDATE write_block shapes")
+    print("="*60)
+    
+    qp = build_query_processor()
+    writes = []
+    
+    def write_block(data_write):
+        writes.append((data_write.column, data_write.new_value, list(data_write.conditions)))
+        return 4
+    
+    class ConditionNode:
+        # bentuk kondisi WHERE dari optimizer yang diterima _perform_update
+        def __init__(self, column, op, value):
+            self.attr, self.op, self.value = SimpleNamespace(column=column), op, value
+    
+    qp.storage_manager = SimpleNamespace(write_block=write_block)
+    qp._data_write_factory = lambda **kwargs: SimpleNamespace(**kwargs)
+    qp._condition_factory = lambda column, operation, operand: (column, operation, operand)
+    assignments = [[SimpleNamespace(column="GPA", value=3.9), SimpleNamespace(column="FullName", value="Budi")]]
+    where = [ConditionNode("StudentID", "=", 3)]
+    
+    # default: satu write_block per kolom, kondisi WHERE ikut di tiap write
+    updated = qp._perform_update("Student", assignments, where)
+    print(f"Writes: {writes}")
+    assert updated == 4, "UPDATE should report the rows written by storage"
+    condition = [("StudentID", "=", 3)]
+    assert writes == [("GPA", 3.9, condition), ("FullName", "Budi", condition)], "Default should be one write_block per column"
+    
+    writes.clear()
+    qp.storage_manager.supports_multi_column_write = True
+    qp._perform_update("Student", assignments, where)
+    print(f"Writes: {writes}")
+    assert writes == [(["GPA", "FullName"], {"GPA": 3.9, "FullName": "Budi"}, condition)], "Capable storage should get one write_block"
+    print("✓ Test passed!")
+
+def _same_rows(actual, expected):
+    # bandingin hasil join sebagai multiset (urutan output strategi join boleh beda)
+    return sorted(map(repr, actual)) == sorted(map(repr, expected))
+
+def test_hash_join_matches_nested_loop():
+    print("\n" + "="*60)
+    print("TEST 21: Hash Join matches Nested Loop")
+    print("="*60)
+    
+    qp = build_query_processor()
+    big = [{"a": i % 7, "l": i} for i in range(60)] + [{"a": "3", "l": "str"}, {"a": 2.0, "l": "float"}, {"a": None, "l": "null"}, {"l": "no key"}]
+    small = [{"b": i, "r": i * 10} for i in range(0, 10, 2)] + [{"b": "4", "r": "str"}, {"b": 4, "r": "dup"}, {"r": "no b"}]
+    
+    # kiri lebih besar (build di kanan) dan kiri lebih kecil (build di kiri)
+    for left, right in ((big, small), (small, big)):
+        left_col, right_col = ("a", "b") if left is big else ("b", "a")
+        hashed = list(qp._theta_join(iter(left), right, f"{left_col} = {right_col}"))
+        looped = list(qp._nested_loop_join(iter(left), right, left_col, "=", right_col))
+        print(f"{len(left)} x {len(right)} rows: hash {len(hashed)}, nested loop {len(looped)}")
+        assert hashed and _same_rows(hashed, looped), "Hash join should match nested loop join"
+    
+    # natural join: key = semua kolom yang sama di kedua sisi
+    left = [{"id": i % 5, "k": i % 3, "x": i} for i in range(40)]
+    right = [{"id": i, "k": i % 3, "y": i * 2} for i in range(8)] + [{"id": 1, "k": 1, "y": "dup"}]
+    natural = list(qp._natural_join(iter(left), right))
+    expected = [{**l, **r} for l in left for r in right if l["id"] == r["id"] and l["k"] == r["k"]]
+    print(f"Natural join: {len(natural)} rows")
+    assert natural and _same_rows(natural, expected), "Natural join should match on every common column"
+    print("✓ Test passed!")
+
+def test_range_join_matches_nested_loop():
+    print("\n" + "="*60)
+    print("TEST 22: Range Join matches Nested Loop")
+    print("="*60)
+    
+    qp = build_query_processor()
+    left = [{"a": value, "l": i} for i, value in enumerate([1, 3, 3, 5, 7, 7, 7, 10, "3", 2.5, "abc"])] + [{"l": "no a"}]
+    right = [{"b": value, "r": i} for i, value in enumerate([3, 3, 5, 0, 10, 10, "7", 6.5, "abd"])]
+    
+    for operator in ("<", "<=", ">", ">="):
+        ranged = list(qp._theta_join(iter(left), right, f"a {operator} b"))
+        looped = list(qp._nested_loop_join(iter(left), right, "a", operator, "b"))
+        print(f"a {operator} b: range {len(ranged)}, nested loop {len(looped)}")
+        assert ranged and _same_rows(ranged, looped), f"Range join should match nested loop for {operator}"
+    print("✓ Test passed!")
+
+def _legacy_selection(row, condition):
+    # semantics filter SIGMA sebelum di-compile: angka vs angka numerik, sisanya cuma = / != sebagai string
+    if not isinstance(row, dict) or condition.column not in row:
+        return False
+    row_value = str(row[condition.column])
+    compare = {"=": lambda a, b: a == b, "!=": lambda a, b: a != b, ">": lambda a, b: a > b,
+               "<": lambda a, b: a < b, ">=": lambda a, b: a >= b, "<=": lambda a, b: a <= b}[condition.operator]
+    try:
+        return compare(float(row_value), float(condition.value))
+    except ValueError:
+        return condition.operator in ("=", "!=") and compare(row_value, condition.value)
+
+def test_compiled_predicates():
+    print("\n" + "="*60)
+    print("TEST 23: Compiled predicates match the row-by-row filter")
+    print("="*60)
+    
+    values = [5, "5", 5.0, 10, "10", 9, "9", -1, 2.5, "2.50", "abc", "", None, True, False, "1e1", float("inf")]
+    rows = [{"v": value} for value in values] + [{"other": 5}, "not a dict"]
+    conditions = [f"v {op} {literal}" for op in ("=", "!=", ">", "<", ">=", "<=") for literal in ("5", "9", "10", "2.5", "abc", "1", "0")]
+    
+    checked = 0
+    for text in conditions:
+        condition = NormalizedCondition.from_string(text)
+        expected = [_legacy_selection(row, condition) for row in rows]
+        # kolom tanpa schema, kolom numerik, dan kolom string harus ngasih hasil yang sama
+        for column_type in (None, "int", "float", "varchar"):
+            predicate = compile_selection(condition, column_type)
+            actual = [predicate(row) for row in rows]
+            assert actual == expected, f"{text} ({column_type}): {actual} != {expected}"
+            checked += 1
+    
+    print(f"Checked {checked} condition / column type combinations over {len(rows)} rows")
+    greater = compile_selection(NormalizedCondition.from_string("v > 9"), None)
+    assert greater({"v": "10"}) and not greater({"v": "9"}), "Numeric strings should compare as numbers"
+    assert not compile_selection(NormalizedCondition.from_string("v > abc"), None)({"v": "abd"}), "Only = and != compare strings"
+    print("✓ Test passed!")
+
+def _order_by(*items):
+    # OrderByItem versi kecil: item.column.column dan item.direction
+    return [SimpleNamespace(column=SimpleNamespace(column=name), direction=direction) for name, direction in items]
+
+def _reference_sort(rows, order_by):
+    # sort stabil berulang per item dari belakang (reverse=True tetap stabil di python)
+    for item in reversed(order_by):
+        name = item.column.column
+        rows = sorted(rows, key=lambda row: sort_value_key(row.get(name)), reverse=item.direction == "DESC")
+    return rows
+
+def _sort_fixture():
+    # banyak key yang sama (cek stabil lewat "seq"), NULL, dan int / float campur
+    majors = ["CS", "EE", None, "IF"]
+    return [
+        {"seq": i, "Major": majors[i % 4], "GPA": None if i % 11 == 0 else [3, 3.5, 2, 3.0, 4][i % 5], "Year": 2020 + i % 3}
+        for i in range(200)
+    ]
+
+SORT_ORDERS = [
+    _order_by(("GPA", "ASC")),
+    _order_by(("GPA", "DESC")),
+    _order_by(("Major", "ASC"), ("GPA", "DESC")),
+    _order_by(("Major", "DESC"), ("Year", "ASC"), ("GPA", "DESC")),
+    _order_by(("Year", "DESC"), ("Major", "DESC")),
+]
+
+def test_top_n_matches_sort():
+    print("\n" + "="*60)
+    print("TEST 24: Top-N matches full sort")
+    print("="*60)
+    
+    qp = build_query_processor()
+    rows = _sort_fixture()
+    for order_by in SORT_ORDERS:
+        expected = _reference_sort(rows, order_by)
+        for n in (0, 1, 7, 50, len(rows), len(rows) + 5):
+            result = list(qp._apply_top_n(iter(rows), order_by, n))
+            assert result == expected[:n], f"Top-{n} differs for {[(i.column.column, i.direction) for i in order_by]}"
+    
+    print(f"Checked {len(SORT_ORDERS)} ORDER BY lists")
+    assert top_n(rows, SORT_ORDERS[0], -1) == [], "Negative LIMIT should return nothing"
+    print("✓ Test passed!")
+
+def test_external_sort_spill():
+    print("\n" + "="*60)
+    print("TEST 25: Spilled external sort matches in-memory sort")
+    print("="*60)
+    
+    qp = build_query_processor()
+    rows = _sort_fixture()
+    input_bytes = sum(estimate_row_size(row) for row in rows)
+    # budget kecil banget: tiap beberapa row jadi satu run di disk, lalu di-merge k-way
+    for memory_limit in (1, 2048, input_bytes * 2):
+        qp.sort_memory_limit = memory_limit
+        for order_by in SORT_ORDERS:
+            result = list(qp._apply_sort(iter(rows), order_by))
+            assert result == _reference_sort(rows, order_by), f"Sort with {memory_limit} byte budget differs"
+        print(f"budget {memory_limit} bytes ({memory_limit / input_bytes:.1%} of input): OK")
+    print("✓ Test passed!")
+
+def _node(node_type, val, *childs):
+    # QueryTree versi kecil: type, val, childs
+    return SimpleNamespace(type=node_type, val=val, childs=list(childs))
+
+def test_group_below_having_and_order_by():
+    print("\n" + "="*60)
+    print("TEST 26: GROUP BY under HAVING / ORDER BY / LIMIT")
+    print("="*60)
+    
+    qp = build_query_processor()
+    rows = [{"Major": major, "GPA": gpa} for major, gpa in (("EE", 2.0), ("CS", 3.0), ("IF", 3.5), ("CS", 4.0), ("EE", 3.0))]
+    qp._scan_table = lambda table_name, conditions=None, columns=None: iter(rows)
+    
+    def group(source=None):
+        return _node("GROUP", "Major", source or _node("TABLE", "S"))
+    
+    # SELECT Major, COUNT(*) FROM S GROUP BY Major ORDER BY Major
+    tree = _node("PROJECT", "Major, COUNT(*)", _node("SORT", _order_by(("Major", "ASC")), group()))
+    result = list(qp._iter_query_tree(tree))
+    print(f"ORDER BY: {result}")
+    assert result == [{"Major": "CS", "COUNT(*)": 2}, {"Major": "EE", "COUNT(*)": 2}, {"Major": "IF", "COUNT(*)": 1}], "ORDER BY should sort the groups"
+    
+    # ... HAVING COUNT(*) > 1
+    tree = _node("PROJECT", "Major, COUNT(*), MAX(GPA)", _node("SIGMA", "COUNT(*) > 1", group()))
+    result = list(qp._iter_query_tree(tree))
+    print(f"HAVING: {result}")
+    assert result == [{"Major": "EE", "COUNT(*)": 2, "MAX(GPA)": 3.0}, {"Major": "CS", "COUNT(*)": 2, "MAX(GPA)": 4.0}], "HAVING should filter the groups"
+    
+    # ... ORDER BY Major DESC LIMIT 2, GROUP di atas input yang udah sorted (streaming aggregate)
+    sorted_input = _node("SORT", _order_by(("Major", "ASC")), _node("TABLE", "S"))
+    tree = _node("PROJECT", "Major, SUM(GPA)", _node("LIMIT", 2, _node("SORT", _order_by(("Major", "DESC")), group(sorted_input))))
+    result = list(qp._iter_query_tree(tree))
+    print(f"ORDER BY + LIMIT: {result}")
+    assert result == [{"Major": "IF", "SUM(GPA)": 3.5}, {"Major": "EE", "SUM(GPA)": 5.0}], "LIMIT should keep the first groups"
+    print("✓ Test passed!")
+
+def test_lru_and_plan_cache():
+    print("\n" + "="*60)
+    print("TEST 27: LRU eviction order and plan cache")
+    print("="*60)
+    
+    cache = LRUCache(3)
+    for key in "abc":
+        cache.put(key, key.upper())
+    assert cache.get("a") == "A", "Fresh entry should be found"
+    cache.put("d", "D")
+    assert "b" not in cache and all(key in cache for key in "acd"), "Least recently used entry should go first"
+    cache.put("c", "C2")
+    cache.put("e", "E")
+    assert "a" not in cache and cache.get("c") == "C2", "Re-put should refresh recency and value"
+    assert cache.stats()["evictions"] == 2, "Two entries should have been evicted"
+    
+    weighted = LRUCache(10, weigher=len)
+    weighted.put("x", "aaaa")
+    weighted.put("y", "bbbb")
+    assert not weighted.put("big", "c" * 11), "Entry heavier than the cache should be rejected"
+    weighted.put("z", "cccc")
+    assert "x" not in weighted and weighted.weight == 8, "Weighted cache should evict down to capacity"
+    
+    qp = build_query_processor()
+    parsed = []
+    
+    def parse_query(query):
+        parsed.append(query)
+        return SimpleNamespace(query_tree=_node("PROJECT", "*", _node("TABLE", "Student")))
+    
+    qp.optimization_engine = SimpleNamespace(parse_query=parse_query, optimize_query=lambda parsed_query: parsed_query)
+    first = qp._get_query_plan("SELECT *  FROM Student;", optimize=True)
+    second = qp._get_query_plan("SELECT * FROM Student", optimize=True)
+    assert first is second and len(parsed) == 1, "Same query modulo whitespace should hit the plan cache"
+    qp._get_query_plan("SELECT * FROM Student", optimize=False)
+    assert len(parsed) == 2, "Parsed-only plans should be cached separately from optimized ones"
+    
+    qp.execute_drop_table("DROP TABLE student;")
+    qp._get_query_plan("SELECT * FROM Student", optimize=True)
+    print(f"Parse calls: {len(parsed)}, stats: {qp.plan_cache.stats()}")
+    assert len(parsed) == 3, "Schema change on the table should invalidate its plans"
+    print("✓ Test passed!")
+
+def test_prepared_string_parameters():
+    print("\n" + "="*60)
+    print("TEST 28: Prepared parameters with quotes, operators and NULL")
+    print("="*60)
+    
+    qp = build_query_processor()
+    rows = [
+        {"FullName": "a = b", "Score": 1},
+        {"FullName": "O'Brien", "Score": 2},
+        {"FullName": "x' OR '1'='1", "Score": 3},
+        {"FullName": "042", "Score": 42},
+        {"FullName": "42", "Score": 5},
+        {"FullName": None, "Score": 6},
+    ]
+    qp._scan_table = lambda table_name, conditions=None, columns=None: iter(rows)
+    qp._get_column_types = lambda table_name: None
+    
+    def run(condition_text, value):
+        tree = _node("PROJECT", "Score", _node("SIGMA", condition_text, _node("TABLE", "S")))
+        slots = find_parameter_slots(tree)
+        assert len(slots) == 1, f"{condition_text} should have one parameter slot"
+        return [row["Score"] for row in qp._iter_query_tree(bind_parameters(tree, slots, [value]))]
+    
+    for value, expected in (("a = b", [1]), ("O'Brien", [2]), ("x' OR '1'='1", [3]), ("42", [5]), ("None", [])):
+        result = run("FullName = '__qp_param_0__'", value)
+        print(f"FullName = {value!r}: {result}")
+        assert result == expected, f"String parameter {value!r} should match exactly"
+    assert run("FullName = '__qp_param_0__'", None) == [], "NULL parameter should not match anything"
+    assert run("FullName != '__qp_param_0__'", "O'Brien") == [1, 3, 42, 5], "!= with a quoted parameter should keep the other non-NULL rows"
+    assert run("Score >= '__qp_param_0__'", 6) == [42, 6], "Numeric parameter should compare as a number"
+    assert find_parameter_slots(_node("SIGMA", "'__qp_param_0__' = FullName", _node("TABLE", "S"))) == [], "Parameter in place of a column should not be bound"
+    
+    # pushdown ke storage: string ke kolom string boleh, string ke kolom numerik dan NULL tetap di python
+    column_types = {"FullName": "varchar", "Score": "integer"}
+    bound = NormalizedCondition(column="FullName", operator="=", value="42", typed=True)
+    assert qp._to_storage_condition(bound, column_types) is not None, "String parameter on a string column should be pushed down"
+    assert qp._to_storage_condition(NormalizedCondition(column="Score", operator="=", value="42", typed=True), column_types) is None, "String parameter on a numeric column should stay in python"
+    assert qp._to_storage_condition(NormalizedCondition(column="FullName", operator="=", value=None, typed=True), column_types) is None, "NULL parameter should stay in python"
+    print("✓ Test passed!")
+
+def test_plan_fingerprint_deep_conditions():
+    print("\n" + "="*60)
+    print("TEST 29: Plan fingerprint of deeply nested conditions")
+    print("="*60)
+    
+    def and_chain(last_column):
+        # ((((c0 = 0 AND c1 = 1) AND c2 = 2) ...) AND <last_column> = 6), kolom terakhir paling dalam
+        condition = SimpleNamespace(attr=SimpleNamespace(column=last_column), op="=", value=6)
+        for i in range(6):
+            condition = SimpleNamespace(op="AND", left=condition, right=SimpleNamespace(attr=SimpleNamespace(column=f"c{i}"), op="=", value=i))
+        return _node("PROJECT", "*", _node("SIGMA", condition, _node("TABLE", "Student")))
+    
+    first, second = plan_fingerprint(and_chain("GPA")), plan_fingerprint(and_chain("StudentID"))
+    print(f"GPA: {first}\nStudentID: {second}")
+    assert first != second, "Plans differing only deep inside a condition should not collide"
+    assert first == plan_fingerprint(and_chain("GPA")), "Same plan should get the same fingerprint"
+    
+    # referensi balik (misal condition -> parent) ga boleh bikin rekursi tanpa akhir
+    cyclic = SimpleNamespace(op="=", value=1)
+    cyclic.owner = SimpleNamespace(condition=cyclic)
+    assert "<cycle>" in describe_value(cyclic), "Back references should be cut"
+    shared = SimpleNamespace(column="GPA")
+    assert describe_value([shared, shared]).count("GPA") == 2, "Shared (non-cyclic) values should be described in full"
+    print("✓ Test passed!")
+
+def test_result_cache_isolation():
+    print("\n" + "="*60)
+    print("TEST 30: Result Cache returns private row copies")
+    print("="*60)
+    
+    qp = build_query_processor()
+    qp.result_cache = ResultCache(1024 * 1024)
+    query = "SELECT StudentID, FullName FROM Student WHERE StudentID = 3;"
+    
+    # miss: row yang di-stream ke caller langsung dimutasi
+    first = qp.execute_query(query)
+    expected = [dict(row) for row in first.data.data]
+    for row in first.data.data:
+        row["FullName"] = "mutated"
+    # hit: row dari cache juga dimutasi
+    second = qp.execute_query(query)
+    second.data.data[0]["FullName"] = "mutated again"
+    third = qp.execute_query(query)
+    
+    print(f"Expected: {expected}")
+    print(f"Third run: {third.data.data}")
+    assert qp.cache_stats()["result_cache"]["hits"] >= 2, "Repeated SELECT should hit the result cache"
+    assert third.data.data == expected, "Mutating returned rows should not change the cached result"
+    print("✓ Test passed!")
+
+def _read_frames(data):
+    # baca semua frame dari bytes, read_exactly versi buffer
+    buffer = memoryview(data)
+    position = 0
+    
+    def read_exactly(size):
+        nonlocal position
+        if position + size > len(buffer):
+            raise EOFError("connection closed")
+        chunk = bytes(buffer[position:position + size])
+        position += size
+        return chunk
+    
+    frames = []
+    while position < len(buffer):
+        frames.append(read_frame(read_exactly))
+    return frames
+
+def test_wire_frame_codec():
+    print("\n" + "="*60)
+    print("TEST 31: Binary protocol frame codec")
+    print("="*60)
+    
+    codecs = [CODEC_JSON] + ([CODEC_MSGPACK] if wire_protocol.msgpack is not None else [])
+    value = {"columns": ["StudentID", "FullName"], "rows": [[1, "Bu'di"], [2, None]], "ratio": 0.5}
+    for codec in codecs:
+        frames = _read_frames(b"".join(encode_frame(kind, value, codec) for kind in (FRAME_HEADER, FRAME_BATCH, FRAME_TRAILER)))
+        assert frames == [(FRAME_HEADER, value), (FRAME_BATCH, value), (FRAME_TRAILER, value)], f"Codec {codec} should round-trip"
+    print(f"Round-trip OK for codecs {codecs}")
+    
+    rows = [{"StudentID": i, "FullName": f"Student {i}"} for i in range(5)]
+    result = ExecutionResult(transaction_id=7, timestamp=datetime.now(), message="Success", data=Rows.from_list(rows), query="SELECT * FROM Student;")
+    frames = _read_frames(b"".join(result_frames(result, codec=CODEC_JSON, batch_rows=2, statement_id=3)))
+    kinds = [kind for kind, _ in frames]
+    header, trailer = frames[0][1], frames[-1][1]
+    decoded = [row for kind, batch in frames if kind == FRAME_BATCH for row in decode_rows(batch, header["columns"])]
+    print(f"Frames: {[chr(kind) for kind in kinds]}")
+    assert kinds == [FRAME_HEADER, FRAME_BATCH, FRAME_BATCH, FRAME_BATCH, FRAME_TRAILER], "5 rows in batches of 2 should make 3 BATCH frames"
+    assert header["columns"] == ["StudentID", "FullName"] and header["statement_id"] == trailer["statement_id"] == 3, "Header should carry columns and statement id"
+    assert decoded == rows and trailer["rows_count"] == 5 and trailer["message"] == "Success", "Rows should decode back to dicts"
+    
+    def failing_rows():
+        yield rows[0]
+        raise RuntimeError("disk gone")
+    frames = _read_frames(b"".join(result_frames(result, rows=failing_rows(), codec=CODEC_JSON)))
+    trailer = frames[-1][1]
+    assert [kind for kind, _ in frames] == [FRAME_HEADER, FRAME_BATCH, FRAME_TRAILER], "Rows before the error should still be sent"
+    assert trailer["message"] == "Error: disk gone" and trailer["data"] == -1 and trailer["rows_count"] == 1, "Error mid-stream should be reported in the trailer"
+    
+    update = ExecutionResult(transaction_id=8, timestamp=datetime.now(), message="Success", data=4, query="UPDATE Student SET GPA = 4;")
+    frames = _read_frames(b"".join(result_frames(update, codec=CODEC_JSON)))
+    assert [kind for kind, _ in frames] == [FRAME_HEADER, FRAME_TRAILER] and frames[-1][1]["data"] == 4, "Non-row result should only send HEADER and TRAILER"
+    print("✓ Test passed!")
+
+def test_cursor_fetch_and_close():
+    print("\n" + "="*60)
+    print("TEST 32: Cursor FETCH and CLOSE")
+    print("="*60)
+    
+    # pipeline palsu yang nyatet kapan generator-nya ditutup
+    state = {"pulled": 0, "closed": False}
+    
+    def pipeline(total):
+        try:
+            for i in range(total):
+                state["pulled"] += 1
+                yield {"n": i}
+        finally:
+            state["closed"] = True
+    
+    cursor = Cursor(name="c", query="SELECT ...", rows=pipeline(5))
+    assert [row["n"] for row in cursor.fetch(2)] == [0, 1] and state["pulled"] == 2, "FETCH 2 should only pull two rows"
+    assert [row["n"] for row in cursor.fetch(None)] == [2, 3, 4] and cursor.exhausted, "FETCH ALL should drain the cursor"
+    assert cursor.fetch(1) == [] and cursor.fetch(None) == [] and cursor.fetched == 5, "FETCH after exhaustion should return nothing"
+    assert state["closed"], "Exhausted cursor should release its pipeline"
+    
+    state.update(pulled=0, closed=False)
+    cursor = Cursor(name="c", query="SELECT ...", rows=pipeline(100))
+    cursor.fetch(3)
+    assert cursor.close() and state["closed"] and state["pulled"] == 3, "CLOSE mid-stream should stop the pipeline"
+    assert cursor.fetch(1) == [], "FETCH after CLOSE should return nothing"
+    
+    server = QueryProcessorServer()
+    declare = server.execute_query("DECLARE c CURSOR FOR SELECT * FROM Student;")
+    first = server.execute_query("FETCH 3 FROM c;")
+    rest = server.execute_query("FETCH ALL c;")
+    after = server.execute_query("FETCH NEXT c;")
+    closed = server.execute_query("CLOSE c;")
+    missing = server.execute_query("FETCH NEXT c;")
+    print(f"Fetched {first.data.rows_count} + {rest.data.rows_count} rows, then {after.data.rows_count}")
+    assert declare.message == "Success" and first.data.rows_count == 3, "FETCH 3 should return three rows"
+    assert rest.data.rows_count >= 1 and after.data.rows_count == 0, "FETCH after exhaustion should return no rows"
+    assert closed.message == "Success" and missing.data == -1 and "does not exist" in missing.message, "Closed cursor should be gone"
+    
+    server.execute_query("DECLARE d CURSOR FOR SELECT * FROM Student;")
+    server.execute_query("FETCH NEXT d;")
+    assert server.execute_query("CLOSE d;").message == "Success" and not server.default_session.cursors, "CLOSE mid-stream should drop the cursor"
+    print("✓ Test passed!")
+
+def test_split_statements():
+    print("\n" + "="*60)
+    print("TEST 33: Splitting semicolon batches")
+    print("="*60)
+    
+    batch = "SELECT * FROM Student WHERE FullName = 'a;b'; UPDATE Student SET FullName = \"x;y\" WHERE StudentID = 1;SELECT 1"
+    statements = split_statements(batch)
+    for statement in statements:
+        print(statement)
+    assert statements == [
+        "SELECT * FROM Student WHERE FullName = 'a;b';",
+        "UPDATE Student SET FullName = \"x;y\" WHERE StudentID = 1;",
+        "SELECT 1",
+    ], "';' inside quotes should not split, last statement may omit ';'"
+    
+    assert split_statements("SELECT 'it''s; fine';") == ["SELECT 'it''s; fine';"], "Escaped quote inside a literal should not end it"
+    assert split_statements(" ; ;SELECT 1;;  ") == ["SELECT 1;"], "Empty statements should be dropped"
+    assert split_statements("") == [] and split_statements("SELECT 1") == ["SELECT 1"], "Single statement without ';' should be kept"
+    print("✓ Test passed!")
+
+def test_multi_row_insert():
+    print("\n" + "="*60)
+    print("TEST 34: Multi-row INSERT parsing and batched writes")
+    print("="*60)
+    
+    batch = parse_insert("INSERT INTO Student (StudentID, FullName, GPA) VALUES (1, 'Budi, S.Kom', 3.5), (2, 'O''Neil (jr)', NULL),(3,\"x)\",4);")
+    print(f"Parsed: {batch}")
+    assert batch.table == "Student" and batch.columns == ["StudentID", "FullName", "GPA"], "Table and column list should be parsed"
+    assert batch.rows == [[1, "Budi, S.Kom", 3.5], [2, "O'Neil (jr)", None], [3, "x)", 4]], "Quoted commas / parentheses and NULL should be parsed"
+    assert parse_insert("INSERT INTO Student SELECT * FROM Other;") is None, "INSERT without VALUES should not be parsed here"
+    for broken in ("INSERT INTO Student VALUES (1, 'a'", "INSERT INTO Student VALUES (1) x (2)"):
+        try:
+            parse_insert(broken)
+            assert False, f"{broken!r} should be rejected"
+        except ValueError as e:
+            print(f"Rejected: {e}")
+    
+    qp = build_query_processor()
+    writes = []
+    
+    def write_block(data_write):
+        writes.append(data_write.new_value)
+        return len(data_write.new_value) if isinstance(data_write.new_value, list) else 1
+    
+    qp.storage_manager = SimpleNamespace(write_block=write_block)
+    qp._data_write_factory = lambda **kwargs: SimpleNamespace(**kwargs)
+    qp._get_column_types = lambda table_name: {"StudentID": "integer", "FullName": "varchar", "GPA": "float"}
+    qp.insert_batch_rows = 2
+    query = "INSERT INTO Student VALUES (1, 'A', 3), (2, 'B', 3.5), (3, 'C', NULL), (4, 'D', 2), (5, 'E', 1);"
+    
+    # default: satu write_block per row, value udah di-coerce ke tipe schema
+    result = qp.execute_insert(query)
+    print(f"{result.data[0]}, writes: {len(writes)}")
+    assert result.data == ["Inserted 5 rows"] and len(writes) == 5, "Default storage should get one write_block per row"
+    assert writes[0] == {"StudentID": 1, "FullName": "A", "GPA": 3.0} and writes[2]["GPA"] is None, "Values should be coerced to the schema types"
+    
+    writes.clear()
+    qp.storage_manager.supports_batch_write = True
+    result = qp.execute_insert(query)
+    print(f"{result.data[0]}, write sizes: {[len(value) if isinstance(value, list) else 1 for value in writes]}")
+    assert result.data == ["Inserted 5 rows"] and len(writes) == 3, "Batch-capable storage should get one write_block per chunk"
+    assert [row["StudentID"] for row in writes[0]] == [1, 2] and writes[2] == {"StudentID": 5, "FullName": "E", "GPA": 1.0}, "Chunks should follow insert_batch_rows"
+    
+    writes.clear()
+    mismatch = qp.execute_insert("INSERT INTO Student VALUES (1, 'A', 3), (2, 'B');")
+    bad_type = qp.execute_insert("INSERT INTO Student (StudentID, GPA) VALUES (1, 2.0), ('x', 3.0);")
+    print(f"{mismatch.data[0]}\n{bad_type.data[0]}")
+    assert "row 2 has 2 values, expected 3" in mismatch.data[0], "Column-count mismatch should name the row"
+    assert "row 2, column 'StudentID'" in bad_type.data[0], "Type mismatch should name the row and column"
+    assert writes == [], "Invalid batch should not write anything"
+    print("✓ Test passed!")
+
+def test_parallel_selection():
+    print("\n" + "="*60)
+    print("TEST 35: Parallel selection matches serial filter")
+    print("="*60)
+    
+    rows = [{"seq": i, "Major": ["CS", "EE", "IF"][i % 3], "GPA": None if i % 13 == 0 else (i % 9) * 0.5} for i in range(500)]
+    tree = _node("PROJECT", "*", _node("SIGMA", "GPA > 2.5", _node("SIGMA", "Major != CS", _node("TABLE", "Student"))))
+    
+    def make_qp():
+        qp = build_query_processor()
+        qp._fetch_table_data = lambda table_name, conditions=None, columns=None: Rows.from_list(rows)
+        qp._get_column_types = lambda table_name: None
+        return qp
+    
+    serial = list(make_qp()._iter_query_tree(tree))
+    qp = make_qp()
+    # thread mode + threshold 0 biar jalur paralel kepakai tanpa spawn process
+    qp.worker_pool = WorkerPool(4, "thread")
+    qp.parallel_threshold = 0
+    try:
+        parallel = list(qp._iter_query_tree(tree))
+        print(f"Serial: {len(serial)} rows, parallel: {len(parallel)} rows")
+        assert qp.worker_pool._executor is not None, "Selection should have gone through the worker pool"
+        assert serial and parallel == serial, "Parallel selection should return the serial rows in the same order"
+        
+        filters = [(NormalizedCondition.normalize("GPA > 2.5"), None), (NormalizedCondition.normalize("Major != CS"), "varchar")]
+        unordered = list(parallel_filter(qp.worker_pool, rows, filters, ordered=False))
+        assert _same_rows(unordered, serial), "Unordered parallel filter should return the same rows"
+        
+        stream = parallel_filter(qp.worker_pool, rows, filters)
+        first = [next(stream) for _ in range(3)]
+        stream.close()
+        assert first == serial[:3], "Consumer stopping early (LIMIT) should still get the first rows in order"
+        assert list(parallel_filter(qp.worker_pool, [], filters)) == [], "Empty input should return nothing"
+    finally:
+        qp.close()
+    print("✓ Test passed!")
+
+def test_parallel_join_spill():
+    print("\n" + "="*60)
+    print("TEST 36: Radix-partitioned parallel join (with spill)")
+    print("="*60)
+    
+    qp = build_query_processor()
+    qp.worker_pool = WorkerPool(4, "thread")
+    qp.parallel_threshold = 0
+    # budget kecil: hampir semua bucket ke-spill ke disk
+    qp.join_memory_limit = 2048
+    big = [{"a": i % 37, "l": i} for i in range(2000)] + [{"a": "3", "l": "str"}, {"a": 2.0, "l": "float"}, {"a": None, "l": "null"}, {"l": "no key"}]
+    small = [{"b": i, "r": i * 10} for i in range(0, 40, 3)] + [{"b": "6", "r": "str"}, {"b": 6, "r": "dup"}, {"r": "no b"}]
+    try:
+        joined = list(qp._theta_join(iter(big), small, "a = b"))
+        looped = list(qp._nested_loop_join(iter(big), small, "a", "=", "b"))
+        print(f"Theta join: parallel {len(joined)}, nested loop {len(looped)}")
+        assert qp.worker_pool._executor is not None, "Join should have gone through the worker pool"
+        assert joined and _same_rows(joined, looped), "Parallel hash join should match nested loop join"
+        
+        left = [{"id": i % 50, "k": i % 3, "x": i} for i in range(1500)]
+        right = [{"id": i, "k": i % 3, "y": i * 2} for i in range(60)] + [{"id": 1, "k": 1, "y": "dup"}]
+        natural = list(qp._natural_join(iter(left), right))
+        expected = [{**l, **r} for l in left for r in right if l["id"] == r["id"] and l["k"] == r["k"]]
+        print(f"Natural join: {len(natural)} rows")
+        assert natural and _same_rows(natural, expected), "Parallel natural join should match on every common column"
+        
+        # spill file ditulis di tmp_dir selama join jalan dan dibersihin setelah selesai
+        spec = JoinSpec(left_columns=("a",), right_columns=("b",), natural=False)
+        with tempfile.TemporaryDirectory() as tmp:
+            stream = parallel_hash_join(qp.worker_pool, iter(big), small, spec, memory_limit=1024, tmp_dir=tmp)
+            rows = [next(stream)]
+            spill_dirs = os.listdir(tmp)
+            spilled = sum(len(os.listdir(os.path.join(tmp, name))) for name in spill_dirs)
+            rows.extend(stream)
+            print(f"Spill files while running: {spilled}, left after join: {os.listdir(tmp)}")
+            assert spilled > 0, "Small memory budget should spill buckets to tmp_dir"
+            assert _same_rows(rows, looped), "Spilled join should return the same rows"
+            assert os.listdir(tmp) == [], "Spill files should be removed after the join"
+            
+            # hasil tetap benar kalau semua muat di memory (ga ada spill sama sekali)
+            in_memory = list(parallel_hash_join(qp.worker_pool, iter(big), small, spec, memory_limit=64 * 1024 * 1024, tmp_dir=tmp))
+            assert _same_rows(in_memory, looped) and os.listdir(tmp) == [], "In-memory join should not touch tmp_dir"
+    finally:
+        qp.close()
+    print("✓ Test passed!")
+
+def test_metrics_shards_merge():
+    print("\n" + "="*60)
+    print("TEST 37: Sharded metrics merge into one Prometheus output")
+    print("="*60)
+    
+    registry = MetricsRegistry(buckets=(0.01, 0.1, 1.0))
+    registry.describe("qp_queries_total", "counter", "Queries executed")
+    registry.describe("qp_query_duration_seconds", "histogram", "Query latency")
+    registry.register_collector(lambda: [("qp_open_cursors", (), 2)])
+    labels = (("type", "SELECT"),)
+    
+    # tiap thread nulis ke shard-nya sendiri, scrape harus ngejumlahin semua shard
+    def work():
+        for i in range(1000):
+            registry.inc("qp_queries_total", labels)
+            registry.observe("qp_query_duration_seconds", (0.005, 0.05, 0.5, 5.0)[i % 4], labels)
+    
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    registry.inc("qp_queries_total", (("type", 'odd "label"\n'),), 2)
+    
+    output = registry.render()
+    print(output)
+    lines = set(output.splitlines())
+    assert 'qp_queries_total{type="SELECT"} 8000' in lines, "Counters from every thread should be summed"
+    assert 'qp_queries_total{type="odd \\"label\\"\\n"} 2' in lines, "Label values should be escaped"
+    for bound, count in (("0.01", 2000), ("0.1", 4000), ("1", 6000), ("+Inf", 8000)):
+        assert f'qp_query_duration_seconds_bucket{{type="SELECT",le="{bound}"}} {count}' in lines, f"Bucket le={bound} should be cumulative"
+    assert 'qp_query_duration_seconds_count{type="SELECT"} 8000' in lines, "Histogram count should cover every shard"
+    total = float(next(line for line in lines if line.startswith("qp_query_duration_seconds_sum")).split()[-1])
+    assert abs(total - 2000 * (0.005 + 0.05 + 0.5 + 5.0)) < 1e-6, "Histogram sum should cover every shard"
+    assert "# TYPE qp_query_duration_seconds histogram" in lines and "qp_open_cursors 2" in lines, "Descriptions and gauges should be rendered"
+    print("✓ Test passed!")
+
+def test_slow_query_log_rotation():
+    print("\n" + "="*60)
+    print("TEST 38: Slow query log threshold and rotation")
+    print("="*60)
+    
+    qp = build_query_processor()
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "logs", "slow.log")
+        qp.slow_query_log = SlowQueryLog(log_path, threshold=1.0, max_bytes=1024, backup_count=2)
+        for i in range(12):
+            # query "lambat" dimulai 2 detik lalu, query cepat barusan
+            qp.log_if_slow(f"SELECT * FROM Student WHERE StudentID = {i};", QueryStats(started=time.perf_counter() - 2.0), rows_returned=i)
+            qp.log_if_slow(f"SELECT {i} AS fast;", QueryStats(), rows_returned=1)
+        qp.slow_query_log.close()
+        
+        files = sorted(os.listdir(os.path.dirname(log_path)))
+        print(f"Files: {files}")
+        assert files == ["slow.log", "slow.log.1", "slow.log.2"], "Log should rotate and keep backup_count old files"
+        entries = []
+        # file paling lama dulu: slow.log.2, slow.log.1, slow.log
+        for name in ("slow.log.2", "slow.log.1", "slow.log"):
+            path = os.path.join(os.path.dirname(log_path), name)
+            assert os.path.getsize(path) <= 1024, f"{name} should stay under max_bytes"
+            with open(path, encoding="utf-8") as log_file:
+                entries.extend(json.loads(line) for line in log_file)
+    
+    returned = [entry["rows_returned"] for entry in entries]
+    print(f"Entries kept (rows_returned): {returned}")
+    assert all("fast" not in entry["query"] for entry in entries), "Queries under the threshold should not be logged"
+    assert all(entry["duration_ms"] >= 1000 for entry in entries), "Logged entries should be over the threshold"
+    assert returned == list(range(12 - len(returned), 12)), "Rotation should keep the newest entries in order"
+    assert len(returned) < 12, "Oldest file should be dropped after backup_count rotations"
+    assert len({entry["fingerprint"] for entry in entries}) == 1, "Queries differing only in literals should share a fingerprint"
+    print("✓ Test passed!")
+
 if __name__ == "__main__":
     print("\n" + "="*60)
     print("QUERY PROCESSOR UNIT TESTS - SELECT & UPDATE")
@@ -181,6 +1181,35 @@ if __name__ == "__main__":
         test_select_with_limit()
         test_select_projection_with_limit()
         test_select_where_with_limit()
+        test_explain_analyze()
+        test_group_by_aggregates()
+        test_aggregates_with_null()
+        test_group_hash_matches_sorted()
+        test_prepared_placeholders()
+        test_prepared_execute()
+        test_result_cache_invalidation()
+        test_buffer_cache_isolation()
+        test_buffer_cache_invalidation()
+        test_copy_path_confined()
+        test_update_write_shapes()
+        test_hash_join_matches_nested_loop()
+        test_range_join_matches_nested_loop()
+        test_compiled_predicates()
+        test_top_n_matches_sort()
+        test_external_sort_spill()
+        test_group_below_having_and_order_by()
+        test_lru_and_plan_cache()
+        test_prepared_string_parameters()
+        test_plan_fingerprint_deep_conditions()
+        test_result_cache_isolation()
+        test_wire_frame_codec()
+        test_cursor_fetch_and_close()
+        test_split_statements()
+        test_multi_row_insert()
+        test_parallel_selection()
+        test_parallel_join_spill()
+        test_metrics_shards_merge()
+        test_slow_query_log_rotation()
         
         print("\n" + "="*60)
         print("ALL TESTS PASSED! ✓")
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from qp_helper.sort_utils import sort_value_key
+
+# GROUP BY + aggregate function (COUNT, SUM, AVG, MIN, MAX)
+# accumulator makan row satu-satu, jadi memory cuma sebanding jumlah group
+
+_AGGREGATE_PATTERN = re.compile(
+    r"^\s*(COUNT|SUM|AVG|MIN|MAX)\s*\(\s*(\*|[\w.]+)\s*\)(?:\s+AS\s+(\w+))?\s*$",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class AggregateSpec:
+    function: str  # COUNT, SUM, AVG, MIN, MAX
+    argument: str  # nama kolom atau "*"
+    label: str     # nama kolom di row hasil (alias kalau ada)
+
+    def accumulator(self) -> "Accumulator":
+        return _ACCUMULATORS[self.function]()
+
+
+def parse_aggregate(expression: Any) -> Optional[AggregateSpec]:
+    match = _AGGREGATE_PATTERN.match(str(expression))
+    if not match:
+        return None
+    function = match.group(1).upper()
+    argument = match.group(2)
+    label = match.group(3) or f"{function}({argument})"
+    return AggregateSpec(function=function, argument=argument, label=label)
+
+
+def group_columns(group_val: Any) -> List[str]:
+    """Kolom GROUP BY dari val GROUP node: string "a, b", list string, atau list column ref."""
+    if group_val is None:
+        return []
+    if isinstance(group_val, str):
+        return [col.strip() for col in group_val.split(",") if col.strip()]
+    if not isinstance(group_val, (list, tuple)):
+        group_val = [group_val]
+    columns = []
+    for item in group_val:
+        column = getattr(item, "column", item)
+        column = getattr(column, "column", column)
+        if str(column).strip():
+            columns.append(str(column).strip())
+    return columns
+
+
+def _as_number(value: Any) -> Optional[float]:
+    if type(value) is int or type(value) is float:
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Accumulator:
+    def add(self, value: Any) -> None:
+        raise NotImplementedError
+
+    def result(self) -> Any:
+        raise NotImplementedError
+
+
+class CountAccumulator(Accumulator):
+    # COUNT(*) dapet value dummy per row, COUNT(col) skip NULL
+    def __init__(self) -> None:
+        self.count = 0
+
+    def add(self, value: Any) -> None:
+        if value is not None:
+            self.count += 1
+
+    def result(self) -> Any:
+        return self.count
+
+
+class SumAccumulator(Accumulator):
+    def __init__(self) -> None:
+        self.total: Any = None
+
+    def add(self, value: Any) -> None:
+        number = _as_number(value) if value is not None else None
+        if number is None:
+            return
+        self.total = number if self.total is None else self.total + number
+
+    def result(self) -> Any:
+        return self.total
+
+
+class AvgAccumulator(Accumulator):
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, value: Any) -> None:
+        number = _as_number(value) if value is not None else None
+        if number is None:
+            return
+        self.total += number
+        self.count += 1
+
+    def result(self) -> Any:
+        return self.total / self.count if self.count else None
+
+
+class MinAccumulator(Accumulator):
+    def __init__(self) -> None:
+        self.value: Any = None
+        self.key: Any = None
+
+    def add(self, value: Any) -> None:
+        if value is None:
+            return
+        key = sort_value_key(value)
+        if self.key is None or key < self.key:
+            self.value, self.key = value, key
+
+    def result(self) -> Any:
+        return self.value
+
+
+class MaxAccumulator(MinAccumulator):
+    def add(self, value: Any) -> None:
+        if value is None:
+            return
+        key = sort_value_key(value)
+        if self.key is None or key > self.key:
+            self.value, self.key = value, key
+
+
+_ACCUMULATORS = {
+    "COUNT": CountAccumulator,
+    "SUM": SumAccumulator,
+    "AVG": AvgAccumulator,
+    "MIN": MinAccumulator,
+    "MAX": MaxAccumulator,
+}
+
+
+def _feed(accumulators: List[Accumulator], aggregates: List[AggregateSpec], row: Any) -> None:
+    for accumulator, spec in zip(accumulators, aggregates):
+        if spec.argument == "*":
+            accumulator.add(True)
+        else:
+            accumulator.add(row.get(spec.argument) if isinstance(row, dict) else None)
+
+
+def _emit(columns: List[str], key: tuple, accumulators: List[Accumulator], aggregates: List[AggregateSpec]) -> Dict[str, Any]:
+    result = dict(zip(columns, key))
+    for accumulator, spec in zip(accumulators, aggregates):
+        result[spec.label] = accumulator.result()
+    return result
+
+
+def _group_key(row: Any, columns: List[str]) -> tuple:
+    if not isinstance(row, dict):
+        return tuple(None for _ in columns)
+    return tuple(row.get(col) for col in columns)
+
+
+def hash_aggregate(rows: Iterable[Any], columns: List[str], aggregates: List[AggregateSpec]) -> Iterator[Dict[str, Any]]:
+    """
+    Hash aggregation: satu entry accumulator per group, row hasil urut sesuai group pertama muncul.
+    Tanpa kolom GROUP BY hasilnya selalu satu row (aggregate atas seluruh input).
+    """
+    groups: Dict[tuple, List[Accumulator]] = {}
+    for row in rows:
+        key = _group_key(row, columns)
+        accumulators = groups.get(key)
+        if accumulators is None:
+            accumulators = [spec.accumulator() for spec in aggregates]
+            groups[key] = accumulators
+        _feed(accumulators, aggregates, row)
+
+    if not groups and not columns:
+        groups[()] = [spec.accumulator() for spec in aggregates]
+
+    for key, accumulators in groups.items():
+        yield _emit(columns, key, accumulators, aggregates)
+
+
+def sorted_aggregate(rows: Iterable[Any], columns: List[str], aggregates: List[AggregateSpec]) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming aggregation untuk input yang udah sorted di kolom GROUP BY:
+    group di-emit begitu key-nya berubah, jadi cuma satu group yang dipegang di memory.
+    """
+    current_key: Optional[tuple] = None
+    accumulators: List[Accumulator] = []
+    for row in rows:
+        key = _group_key(row, columns)
+        if current_key is None or key != current_key:
+            if current_key is not None:
+                yield _emit(columns, current_key, accumulators, aggregates)
+            current_key = key
+            accumulators = [spec.accumulator() for spec in aggregates]
+        _feed(accumulators, aggregates, row)
+
+    if current_key is not None:
+        yield _emit(columns, current_key, accumulators, aggregates)
+    elif not columns:
+        yield _emit(columns, (), [spec.accumulator() for spec in aggregates], aggregates)
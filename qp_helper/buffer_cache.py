@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from qp_helper.plan_cache import describe_value
+from qp_helper.result_cache import ResultCache
+
+
+class BufferCache:
+    """
+    Buffer cache hasil scan storage_manager.read_block, di antara QP dan storage manager.
+    Key-nya (tabel, kolom, kondisi pushdown); budget byte dengan LRU eviction.
+    Di-invalidate per tabel setiap QP nulis ke tabel itu (write yang ga lewat QP ga ketahuan).
+    Row di-copy waktu masuk dan keluar cache (lewat ResultCache), jadi caller bebas mutasi row hasilnya.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._entries = ResultCache(max_bytes)
+
+    @staticmethod
+    def _key(table: str, columns: Optional[Sequence[str]], conditions: Optional[list]) -> tuple:
+        return (
+            table.lower(),
+            tuple(columns) if columns else "*",
+            describe_value(list(conditions)) if conditions else "",
+        )
+
+    def read(
+        self,
+        table: str,
+        columns: Optional[Sequence[str]],
+        conditions: Optional[list],
+        loader: Callable[[], List[Any]],
+    ) -> List[Any]:
+        """Ambil hasil scan dari cache, kalau miss panggil loader() (read_block) lalu simpan hasilnya."""
+        key = self._key(table, columns, conditions)
+        cached = self._entries.get(key)
+        if cached is not None:
+            return cached
+        # versi tabel di-snapshot sebelum baca, jadi scan yang barengan sama write ga ikut disimpan
+        versions = self._entries.snapshot([table])
+        rows = loader()
+        if isinstance(rows, list):
+            self._entries.put(key, versions, rows)
+        return rows
+
+    def invalidate_table(self, table_name: str) -> None:
+        self._entries.bump(table_name)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._entries.stats()
+        stats["bytes_held"] = stats["weight"]
+        return stats
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from qp_helper.prepared import parse_literal_list
+from qp_helper.schema_utils import FLOAT_TYPES, INTEGER_TYPES, coerce_literal
+
+# INSERT INTO table [(col, ...)] VALUES (...), (...), ...
+_INSERT_PATTERN = re.compile(r"(?is)^\s*INSERT\s+INTO\s+(\w+)\s*(?:\(([^)]*)\))?\s*VALUES\s*(.+?)\s*;?\s*$")
+
+
+@dataclass
+class InsertBatch:
+    table: str
+    columns: List[str]          # kosong kalau query ga nyebut kolom (pakai urutan schema)
+    rows: List[List[Any]]       # value per tuple, udah di-parse jadi int / float / str / None
+
+
+def split_value_tuples(text: str) -> List[str]:
+    """Pecah "(1, 'a'), (2, 'b)')" jadi ["(1, 'a')", "(2, 'b)')"]; koma / kurung di dalam string literal diabaikan."""
+    tuples: List[str] = []
+    depth = 0
+    quote = None
+    start = -1
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if quote is not None:
+            if char == quote:
+                # quote ganda ('') di dalam literal = karakter quote biasa
+                if index + 1 < len(text) and text[index + 1] == quote:
+                    index += 1
+                else:
+                    quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == "(":
+            if depth == 0:
+                start = index
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth < 0:
+                raise ValueError("unbalanced parentheses in VALUES")
+            if depth == 0:
+                tuples.append(text[start:index + 1])
+        elif depth == 0 and not char.isspace() and char != ",":
+            raise ValueError(f"unexpected '{char}' in VALUES")
+        index += 1
+    if quote is not None or depth != 0:
+        raise ValueError("unterminated tuple in VALUES")
+    return tuples
+
+
+def parse_insert(query: str) -> Optional[InsertBatch]:
+    """Parse INSERT (satu atau banyak tuple VALUES); return None kalau bentuk query-nya bukan INSERT ... VALUES."""
+    match = _INSERT_PATTERN.match(query)
+    if not match:
+        return None
+    table, columns_text, values_text = match.groups()
+    columns = [col.strip() for col in columns_text.split(",")] if columns_text else []
+    rows = [parse_literal_list(value_tuple) for value_tuple in split_value_tuples(values_text)]
+    if not rows:
+        return None
+    return InsertBatch(table=table, columns=columns, rows=rows)
+
+
+def coerce_value(value: Any, column_type: str) -> Any:
+    """Sesuaikan value hasil parse dengan tipe kolom, raise ValueError kalau ga cocok."""
+    if value is None:
+        return None
+    if column_type in INTEGER_TYPES:
+        if isinstance(value, float):
+            if not value.is_integer():
+                raise ValueError(f"{value!r} is not an integer")
+            return int(value)
+        if isinstance(value, int):
+            return value
+        result = coerce_literal(str(value).strip(), column_type)
+        if isinstance(result, float):
+            raise ValueError(f"{value!r} is not an integer")
+        return result
+    if column_type in FLOAT_TYPES:
+        return float(value) if isinstance(value, (int, float)) else coerce_literal(str(value).strip(), column_type)
+    return value if isinstance(value, str) else str(value)
+
+
+def resolve_columns(table: str, columns: List[str], column_types: Optional[Dict[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Tentuin (kolom, tipe) yang diisi: kolom dari query / header, atau urutan schema kalau ga disebut.
+    Tipe "" artinya schema ga diketahui, value dikirim apa adanya.
+    """
+    columns = columns or list(column_types or [])
+    if not columns:
+        raise ValueError(f"no column list given and the schema of table '{table}' is unknown")
+    if column_types is not None:
+        unknown = [col for col in columns if col not in column_types]
+        if unknown:
+            raise ValueError(f"unknown column(s) {unknown} in table '{table}'")
+    return [(col, column_types.get(col, "") if column_types is not None else "") for col in columns]
+
+
+def convert_row(typed_columns: List[Tuple[str, str]], values: List[Any], row_number: int) -> Dict[str, Any]:
+    """Validasi jumlah value + coerce tiap value sesuai tipe kolom, return row dict."""
+    if len(values) != len(typed_columns):
+        raise ValueError(f"row {row_number} has {len(values)} values, expected {len(typed_columns)}")
+    row: Dict[str, Any] = {}
+    for (col, col_type), value in zip(typed_columns, values):
+        try:
+            row[col] = coerce_value(value, col_type) if col_type else value
+        except ValueError as e:
+            raise ValueError(f"row {row_number}, column '{col}': {e}") from None
+    return row
+
+
+def build_rows(batch: InsertBatch, column_types: Optional[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Validasi + coerce semua tuple terhadap schema sekali di depan, return list row dict.
+    Kolom yang ga disebut di query ga ikut di row (diisi storage manager / NULL).
+    """
+    typed_columns = resolve_columns(batch.table, batch.columns, column_types)
+    return [convert_row(typed_columns, values, row_number) for row_number, values in enumerate(batch.rows, start=1)]
+
+
+def chunked(rows: List[Any], size: int) -> Iterator[List[Any]]:
+    size = max(1, size)
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from qp_helper.aggregate import group_columns, parse_aggregate
+from qp_helper.condition_adapter import NormalizedCondition
+
+# operator yang cuma nge-filter / nge-reorder row tanpa ngubah kolomnya
+_SHAPE_PRESERVING = {"SIGMA", "SORT", "LIMIT"}
+
+# required columns disimpan sebagai dict (ordered set), None artinya butuh semua kolom
+Required = Optional[Dict[str, None]]
+
+
+@dataclass
+class ScanPlan:
+    # id(TABLE node) -> list kolom yang perlu di-fetch, TABLE yang ga ada di sini fetch "*"
+    table_columns: Dict[int, List[str]] = field(default_factory=dict)
+    # id(PROJECT node) yang kolomnya udah persis sama dengan hasil scan di bawahnya
+    redundant_projections: Set[int] = field(default_factory=set)
+    # id(GROUP node) -> AggregateSpec dari PROJECT di atasnya (diisi QP waktu build pipeline, bukan di plan pass)
+    group_aggregates: Dict[int, list] = field(default_factory=dict)
+
+
+def projection_columns(columns: Any) -> Optional[List[str]]:
+    """List kolom dari val PROJECT node, None kalau "*" / ga dikenal (semua kolom)."""
+    if isinstance(columns, str):
+        if columns.strip() == "*":
+            return None
+        col_list = [col.strip() for col in columns.split(",") if col.strip()]
+    elif isinstance(columns, (list, tuple)):
+        if len(columns) == 1 and str(columns[0]).strip() == "*":
+            return None
+        col_list = [str(col).strip() for col in columns if str(col).strip()]
+    else:
+        return None
+    return col_list or None
+
+
+def join_condition_columns(condition: Any) -> Optional[List[str]]:
+    """Operand kondisi JOIN/THETA_JOIN "a op b", None kalau kondisinya ga bisa di-parse."""
+    if not condition:
+        return []
+    if not isinstance(condition, str):
+        return None
+    for op in (">=", "<=", "!=", "=", ">", "<"):
+        if op in condition:
+            parts = condition.split(op)
+            return [parts[0].strip(), parts[1].strip().strip("'\"")]
+    return None
+
+
+def _with(required: Required, columns: Optional[List[str]]) -> Required:
+    if required is None or columns is None:
+        return None
+    merged = dict(required)
+    for col in columns:
+        merged.setdefault(col, None)
+    return merged
+
+
+def _sort_columns(order_by: Any) -> Optional[List[str]]:
+    try:
+        return [str(item.column.column) for item in order_by]
+    except (AttributeError, TypeError):
+        return None
+
+
+def _collect(node: Any, required: Required, column_types_for: Callable[[Any], Optional[dict]], plan: ScanPlan) -> None:
+    if node is None:
+        return
+
+    if node.type == "TABLE":
+        if required is None:
+            return
+        column_types = column_types_for(node.val)
+        if not column_types:
+            return
+        columns = [col for col in required if col in column_types]
+        # semua kolom kepake atau ga ada kolom yang dikenal -> fetch "*" aja
+        if columns and len(columns) < len(column_types):
+            plan.table_columns[id(node)] = columns
+        return
+
+    if node.type == "PROJECT":
+        columns = projection_columns(node.val)
+        child_required = dict.fromkeys(columns) if columns is not None else None
+        # aggregate butuh kolom argumennya, label-nya sendiri bukan kolom tabel
+        for spec in map(parse_aggregate, columns or []):
+            if spec and spec.argument != "*":
+                child_required.setdefault(spec.argument, None)
+        for child in node.childs:
+            _collect(child, child_required, column_types_for, plan)
+        if columns is not None and node.childs and _scan_output(node.childs[0], plan) == columns:
+            plan.redundant_projections.add(id(node))
+        return
+
+    if node.type == "SIGMA":
+        normalized = NormalizedCondition.normalize(node.val)
+        child_required = _with(required, [normalized.column] if normalized else None)
+    elif node.type == "SORT":
+        child_required = _with(required, _sort_columns(node.val))
+    elif node.type == "GROUP":
+        child_required = _with(required, group_columns(node.val))
+    elif node.type in ("JOIN", "THETA_JOIN"):
+        # kolom yang ga ada di tabel sisi tertentu nanti kebuang sendiri waktu dicocokin ke schema
+        child_required = _with(required, join_condition_columns(node.val))
+    elif node.type in ("LIMIT", "CARTESIAN", "OR"):
+        child_required = required
+    else:
+        # NATURAL_JOIN (common column baru ketahuan dari data), dll -> butuh semua kolom
+        child_required = None
+
+    for child in node.childs:
+        _collect(child, child_required, column_types_for, plan)
+
+
+# kolom output subtree kalau isinya cuma SIGMA/SORT/LIMIT di atas TABLE yang di-prune
+def _scan_output(node: Any, plan: ScanPlan) -> Optional[List[str]]:
+    while node is not None and node.type in _SHAPE_PRESERVING:
+        node = node.childs[0] if node.childs else None
+    if node is None or node.type != "TABLE":
+        return None
+    return plan.table_columns.get(id(node))
+
+
+def plan_scan_columns(root: Any, column_types_for: Callable[[Any], Optional[dict]]) -> ScanPlan:
+    """
+    Plan pass untuk projection pushdown: hitung kolom yang dibutuhin tiap TABLE leaf
+    (kolom PROJECT, argumen aggregate, kolom predicate, join key, group key, dan sort key),
+    dicocokin ke schema tabelnya.
+    """
+    plan = ScanPlan()
+    _collect(root, None, column_types_for, plan)
+    return plan
@@ -7,7 +7,10 @@ from typing import Any
 class NormalizedCondition:
     column: str
     operator: str  # '=', '!=', '>', '<', '>=', '<='
-    value: str
+    value: Any
+    # True kalau value-nya parameter prepared statement (tipe python dipakai apa adanya),
+    # False kalau value-nya teks literal dari query
+    typed: bool = False
     
     @classmethod
     def from_optimizer_node(cls, node: Any) -> NormalizedCondition | None:
@@ -48,6 +51,9 @@ class NormalizedCondition:
     
     @classmethod
     def normalize(cls, condition: Any) -> NormalizedCondition | None:
+        if isinstance(condition, cls):
+            return condition
+        
         if isinstance(condition, str):
             return cls.from_string(condition)
         
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import csv
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import IO, Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# COPY table [(col, ...)] FROM 'file.csv' [WITH] [(] [CSV] [HEADER [true|false]] [DELIMITER 'x'] [)]
+_COPY_PATTERN = re.compile(
+    r"""(?is)^\s*COPY\s+(\w+)\s*(?:\(([^)]*)\))?\s*FROM\s+'((?:[^']|'')*)'\s*(.*?)\s*;?\s*$"""
+)
+_HEADER_OPTION = re.compile(r"(?i)\bHEADER\b(?:\s+(TRUE|FALSE|ON|OFF|1|0))?")
+_DELIMITER_OPTION = re.compile(r"""(?i)\bDELIMITER\s+(?:AS\s+)?'((?:[^']|'')+)'""")
+
+
+@dataclass
+class CopyCommand:
+    table: str
+    columns: List[str]
+    path: str
+    header: bool = False
+    delimiter: str = ","
+
+
+@dataclass
+class CopyProgress:
+    rows: int = 0
+    chunks: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+
+def parse_copy(query: str) -> Optional[CopyCommand]:
+    """Parse COPY ... FROM 'file'; return None kalau bentuk query-nya ga dikenal."""
+    match = _COPY_PATTERN.match(query)
+    if not match:
+        return None
+    table, columns_text, path, options = match.groups()
+    columns = [col.strip() for col in columns_text.split(",")] if columns_text else []
+    command = CopyCommand(table=table, columns=columns, path=path.replace("''", "'"))
+
+    header = _HEADER_OPTION.search(options)
+    if header:
+        command.header = (header.group(1) or "TRUE").upper() in ("TRUE", "ON", "1")
+    delimiter = _DELIMITER_OPTION.search(options)
+    if delimiter:
+        command.delimiter = delimiter.group(1).replace("''", "'")
+    return command
+
+
+def resolve_copy_path(directory: Optional[str], path: str) -> str:
+    """
+    Path file COPY relatif terhadap directory, raise ValueError kalau COPY dari file dimatikan (directory None),
+    path-nya absolut, atau hasil resolve (termasuk ".." dan symlink) keluar dari directory.
+    """
+    if directory is None:
+        raise ValueError("COPY from a server file is disabled (no copy_directory configured)")
+    if not path or os.path.isabs(path) or os.path.splitdrive(path)[0]:
+        raise ValueError(f"COPY path must be relative to the copy directory: '{path}'")
+    base = os.path.realpath(directory)
+    resolved = os.path.realpath(os.path.join(base, path))
+    if os.path.commonpath([base, resolved]) != base:
+        raise ValueError(f"COPY path is outside the copy directory: '{path}'")
+    return resolved
+
+
+def csv_records(file: IO[str], delimiter: str = ",", header: bool = False) -> Tuple[List[str], Iterator[List[Optional[str]]]]:
+    """
+    Return (kolom dari baris header, iterator record). Record dibaca lazy dari file;
+    field kosong dianggap NULL (None) dan baris kosong dilewati.
+    """
+    reader = csv.reader(file, delimiter=delimiter)
+    columns = [col.strip() for col in next(reader, [])] if header else []
+    records = ([value if value != "" else None for value in record] for record in reader if record)
+    return columns, records
+
+
+def iter_chunks(records: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Kelompokin iterator jadi list berukuran maksimal size tanpa materialize semuanya."""
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, max(1, size)))
+        if not chunk:
+            return
+        yield chunk
+
+
+def progress_printer(label: str, interval: float = 1.0) -> Callable[[CopyProgress], None]:
+    """Callback progress yang nge-print paling sering sekali tiap interval detik."""
+    last_report = time.perf_counter()
+
+    def report(progress: CopyProgress) -> None:
+        nonlocal last_report
+        now = time.perf_counter()
+        if now - last_report >= interval:
+            last_report = now
+            print(f"[{label}] {progress.rows} rows loaded ({progress.rows_per_second:,.0f} rows/s)")
+
+    return report
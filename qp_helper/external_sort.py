@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import heapq
+import pickle
+import sys
+import tempfile
+from typing import IO, Any, Callable, Iterable, Iterator, List, Optional
+
+# external merge sort: input di-buffer sampai memory budget, tiap buffer penuh di-sort
+# dan ditulis ke temp file sebagai "run", lalu semua run di-merge k-way sebagai stream
+
+# row per record pickle di dalam run file; pickle nge-memo key dict yang sama
+# dalam satu dump, jadi nama kolom cuma ditulis sekali per chunk
+_CHUNK_ROWS = 1024
+
+
+def estimate_row_size(row: Any) -> int:
+    if isinstance(row, dict):
+        return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values())
+    return sys.getsizeof(row)
+
+
+def _write_run(rows: List[Any], tmp_dir: Optional[str]) -> IO[bytes]:
+    run_file = tempfile.TemporaryFile(dir=tmp_dir)
+    for start in range(0, len(rows), _CHUNK_ROWS):
+        pickle.dump(rows[start:start + _CHUNK_ROWS], run_file, protocol=pickle.HIGHEST_PROTOCOL)
+    run_file.seek(0)
+    return run_file
+
+
+def _read_run(run_file: IO[bytes]) -> Iterator[Any]:
+    while True:
+        try:
+            chunk = pickle.load(run_file)
+        except EOFError:
+            return
+        yield from chunk
+
+
+def external_sort(
+    rows: Iterable[Any],
+    key: Callable[[Any], Any],
+    memory_limit: int,
+    tmp_dir: Optional[str] = None,
+) -> Iterator[Any]:
+    """
+    Sort stabil dengan memory budget (byte, estimasi pakai sys.getsizeof).
+    Kalau semua row muat di budget, hasilnya sorted() biasa di memory.
+    Kalau ga, run-run sorted di-spill ke temp file lalu di-merge pakai heapq.merge;
+    row dengan key sama tetap urut sesuai input karena run di-merge sesuai urutan dibuatnya.
+    """
+    buffer: List[Any] = []
+    buffered_bytes = 0
+    runs: List[IO[bytes]] = []
+
+    try:
+        for row in rows:
+            buffer.append(row)
+            buffered_bytes += estimate_row_size(row)
+            if buffered_bytes >= memory_limit:
+                buffer.sort(key=key)
+                runs.append(_write_run(buffer, tmp_dir))
+                buffer = []
+                buffered_bytes = 0
+
+        buffer.sort(key=key)
+        if not runs:
+            yield from buffer
+            return
+
+        # buffer terakhir ga perlu di-spill, ikut di-merge langsung dari memory sebagai run paling akhir
+        yield from heapq.merge(*[_read_run(run_file) for run_file in runs], buffer, key=key)
+    finally:
+        for run_file in runs:
+            run_file.close()
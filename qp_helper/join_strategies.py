@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional
+
+from qp_helper.predicate import to_number
+
+# key function return None kalau row ga bisa ikut join (misal kolom join ga ada)
+KeyFunc = Callable[[Any], Optional[Hashable]]
+CombineFunc = Callable[[Any, Any], Any]
+
+# penanda row yang ga ikut range join (None masih valid sebagai value)
+SKIP_ROW = object()
+
+
+def equi_join_key(value: Any) -> tuple:
+    # samain semantics sama predicate.compile_comparison untuk operator "=":
+    # kalau bisa di-float-kan dibandingin sebagai angka, kalau ga sebagai string
+    num = to_number(value)
+    if num is None:
+        return ("s", str(value))
+    return ("n", num)
+
+
+def _build_hash_table(rows: Iterable[Any], key_func: KeyFunc) -> Dict[Hashable, List[Any]]:
+    table: Dict[Hashable, List[Any]] = {}
+    for row in rows:
+        key = key_func(row)
+        if key is None:
+            continue
+        bucket = table.get(key)
+        if bucket is None:
+            table[key] = [row]
+        else:
+            bucket.append(row)
+    return table
+
+
+def hash_join(
+    left_rows: Iterable[Any],
+    right_rows: List[Any],
+    left_key: KeyFunc,
+    right_key: KeyFunc,
+    combine: CombineFunc,
+) -> Iterator[Any]:
+    """
+    Equi-join dengan hash table di input yang lebih kecil.
+    Sisi kiri boleh berupa stream: dibaca paling banyak len(right_rows) + 1 row dulu
+    buat nentuin sisi mana yang lebih kecil, jadi buffer maksimal min(|L|, |R|) + |R|.
+    combine selalu dipanggil dengan urutan (left_row, right_row).
+    """
+    left_iter = iter(left_rows)
+    left_prefix = list(islice(left_iter, len(right_rows) + 1))
+
+    if len(left_prefix) <= len(right_rows):
+        # kiri habis duluan -> kiri lebih kecil, build di kiri dan probe pakai kanan
+        table = _build_hash_table(left_prefix, left_key)
+        if not table:
+            return
+        for right_row in right_rows:
+            key = right_key(right_row)
+            if key is None:
+                continue
+            for left_row in table.get(key, ()):
+                yield combine(left_row, right_row)
+        return
+
+    # kanan lebih kecil, build di kanan lalu probe sambil stream sisa kiri
+    table = _build_hash_table(right_rows, right_key)
+    if not table:
+        return
+    for left_row in chain(left_prefix, left_iter):
+        key = left_key(left_row)
+        if key is None:
+            continue
+        for right_row in table.get(key, ()):
+            yield combine(left_row, right_row)
+
+
+# range yang match untuk "left op right" di list key kanan yang udah sorted
+def _matching_range(keys: List[Any], operator: str, left: Any) -> range:
+    if operator == "<":
+        return range(bisect_right(keys, left), len(keys))
+    elif operator == "<=":
+        return range(bisect_left(keys, left), len(keys))
+    elif operator == ">":
+        return range(0, bisect_left(keys, left))
+    elif operator == ">=":
+        return range(0, bisect_right(keys, left))
+    return range(0)
+
+
+RANGE_OPERATORS = (">=", "<=", ">", "<")
+
+
+def range_join(
+    left_rows: Iterable[Any],
+    right_rows: List[Any],
+    left_value: Callable[[Any], Any],
+    right_value: Callable[[Any], Any],
+    operator: str,
+    combine: CombineFunc,
+) -> Iterator[Any]:
+    """
+    Band/range join untuk kondisi "<", "<=", ">", ">=".
+    Sisi kanan di-sort sekali, tiap row kiri cari range yang match pakai binary search,
+    jadi cost O((|L| + |R|) log |R| + output) bukan O(|L| * |R|).
+    left_value return SKIP_ROW kalau row kiri ga ikut join.
+
+    Semantics sama kaya predicate.compile_comparison: kalau dua value bisa di-float-kan
+    dibandingin numerik, kalau salah satu ga bisa dibandingin sebagai string. Karena itu
+    sisi kanan disimpan dalam tiga urutan: numerik, string untuk value non-numerik,
+    dan string untuk semua value (dipakai kalau value kiri non-numerik).
+    """
+    if operator not in RANGE_OPERATORS:
+        raise ValueError(f"range_join does not support operator {operator!r}")
+
+    numeric: List[tuple] = []
+    non_numeric: List[tuple] = []
+    all_as_str: List[tuple] = []
+    for row in right_rows:
+        value = right_value(row)
+        if value is SKIP_ROW:
+            continue
+        as_str = str(value)
+        num = to_number(value)
+        all_as_str.append((as_str, row))
+        if num is None:
+            non_numeric.append((as_str, row))
+        elif num == num:
+            # NaN ga pernah lolos perbandingan numerik, jadi ga perlu masuk index numerik
+            numeric.append((num, row))
+
+    # sort stabil per key aja, row dengan key sama tetap urut sesuai input
+    sides = []
+    for entries in (numeric, non_numeric, all_as_str):
+        entries.sort(key=lambda entry: entry[0])
+        sides.append(([entry[0] for entry in entries], [entry[1] for entry in entries]))
+    (num_keys, num_rows), (str_keys, str_rows), (all_keys, all_rows) = sides
+
+    for left_row in left_rows:
+        value = left_value(left_row)
+        if value is SKIP_ROW:
+            continue
+        num = to_number(value)
+        if num is None:
+            for i in _matching_range(all_keys, operator, str(value)):
+                yield combine(left_row, all_rows[i])
+            continue
+        if num == num:
+            for i in _matching_range(num_keys, operator, num):
+                yield combine(left_row, num_rows[i])
+        for i in _matching_range(str_keys, operator, str(value)):
+            yield combine(left_row, str_rows[i])
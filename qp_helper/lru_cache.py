@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    LRU cache thread-safe dengan kapasitas berbasis "weight".
+    Default tiap entry weight-nya 1 (kapasitas = jumlah entry); kasih weigher
+    (misal estimasi byte) kalau mau budget-nya dalam byte.
+    Entry yang weight-nya sendiri udah lebih dari kapasitas ga disimpan.
+    """
+
+    def __init__(self, capacity: int, weigher: Optional[Callable[[V], int]] = None) -> None:
+        self.capacity = capacity
+        self._weigher = weigher
+        self._entries: "OrderedDict[K, tuple]" = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: K, value: V) -> bool:
+        weight = self._weigher(value) if self._weigher else 1
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._weight -= old[1]
+            if self.capacity <= 0 or weight > self.capacity:
+                return False
+            self._entries[key] = (value, weight)
+            self._weight += weight
+            while self._weight > self.capacity:
+                _, (_, evicted_weight) = self._entries.popitem(last=False)
+                self._weight -= evicted_weight
+                self.evictions += 1
+            return True
+
+    def pop(self, key: K, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._weight -= entry[1]
+            return entry[0]
+
+    def invalidate(self, predicate: Callable[[K, V], bool]) -> int:
+        """Buang semua entry yang predicate(key, value)-nya True, return jumlah yang dibuang."""
+        with self._lock:
+            stale = [key for key, (value, _) in self._entries.items() if predicate(key, value)]
+            for key in stale:
+                self._weight -= self._entries.pop(key)[1]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+
+    @property
+    def weight(self) -> int:
+        return self._weight
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "weight": self._weight,
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
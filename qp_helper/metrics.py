@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# metrics in-process dengan output format text Prometheus.
+# counter dan histogram disimpan per thread (shard), jadi update di jalur query ga butuh lock:
+# cuma thread pemilik yang nulis ke shard-nya, scrape ngejumlahin semua shard
+
+Labels = Tuple[Tuple[str, str], ...]
+# (nama metric, labels, value) dari collector
+Sample = Tuple[str, Labels, float]
+
+# batas bucket histogram latency (detik)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# jendela (detik) buat ngitung QPS
+QPS_WINDOW = 60
+
+
+@dataclass
+class _Shard:
+    counters: Dict[Tuple[str, Labels], float] = field(default_factory=dict)
+    # per key: count per bucket (index terakhir = +Inf), lalu total value di paling belakang
+    histograms: Dict[Tuple[str, Labels], List[float]] = field(default_factory=dict)
+    # ring buffer jumlah query per detik untuk QPS
+    qps_seconds: List[int] = field(default_factory=lambda: [-1] * QPS_WINDOW)
+    qps_counts: List[int] = field(default_factory=lambda: [0] * QPS_WINDOW)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Registry counter / histogram / gauge. Metric harus di-describe dulu (tipe + help) supaya
+    muncul dengan # HELP / # TYPE di output. Gauge berupa callback yang dipanggil waktu scrape.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.started = time.time()
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()
+        self._descriptions: Dict[str, Tuple[str, str]] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def describe(self, name: str, metric_type: str, help_text: str) -> None:
+        self._descriptions[name] = (metric_type, help_text)
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """collector() dipanggil tiap scrape dan return sample gauge (nama, labels, value)."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1) -> None:
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        histograms = self._shard().histograms
+        key = (name, labels)
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = [0] * (len(self.buckets) + 2)
+        histogram[bisect_left(self.buckets, value)] += 1
+        histogram[-1] += value
+
+    def mark_query(self) -> None:
+        """Catat satu query buat QPS (jumlah query di QPS_WINDOW detik terakhir)."""
+        shard = self._shard()
+        second = int(time.monotonic())
+        index = second % QPS_WINDOW
+        if shard.qps_seconds[index] != second:
+            shard.qps_seconds[index] = second
+            shard.qps_counts[index] = 0
+        shard.qps_counts[index] += 1
+
+    def queries_per_second(self) -> float:
+        now = int(time.monotonic())
+        # server yang baru nyala belum punya data satu jendela penuh
+        window = min(QPS_WINDOW, max(1.0, time.time() - self.started))
+        total = 0
+        for shard in self._snapshot_shards():
+            for second, count in zip(list(shard.qps_seconds), list(shard.qps_counts)):
+                if now - second < QPS_WINDOW:
+                    total += count
+        return total / window
+
+    def _snapshot_shards(self) -> List[_Shard]:
+        with self._lock:
+            return list(self._shards)
+
+    def collect(self) -> Tuple[Dict[Tuple[str, Labels], float], Dict[Tuple[str, Labels], List[float]]]:
+        """Jumlahin counter dan histogram dari semua shard."""
+        counters: Dict[Tuple[str, Labels], float] = {}
+        histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        for shard in self._snapshot_shards():
+            # copy() dict itu atomic, jadi aman walaupun thread pemilik lagi nulis
+            for key, value in shard.counters.copy().items():
+                counters[key] = counters.get(key, 0) + value
+            for key, values in shard.histograms.copy().items():
+                merged = histograms.setdefault(key, [0] * len(values))
+                for index, value in enumerate(list(values)):
+                    merged[index] += value
+        return counters, histograms
+
+    def render(self) -> str:
+        """Semua metric dalam format text Prometheus (exposition format 0.0.4)."""
+        counters, histograms = self.collect()
+        samples: Dict[str, List[str]] = {}
+
+        for (name, labels), value in sorted(counters.items()):
+            samples.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for (name, labels), values in sorted(histograms.items()):
+            lines = samples.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                cumulative += count
+                bucket_labels = labels + (("le", _format_value(bound)),)
+                lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {_format_value(cumulative)}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(values[-1])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {_format_value(cumulative)}")
+
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            for name, labels, value in collector():
+                samples.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        output = []
+        for name in sorted(samples):
+            if name in self._descriptions:
+                metric_type, help_text = self._descriptions[name]
+                output.append(f"# HELP {name} {help_text}")
+                output.append(f"# TYPE {name} {metric_type}")
+            output.extend(samples[name])
+        return "\n".join(output) + "\n"
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from qp_helper.condition_adapter import NormalizedCondition
+from qp_helper.predicate import compile_selection
+
+# scan + filter paralel: row hasil read_block dipecah jadi beberapa partisi, tiap partisi
+# di-filter di worker (process, biar ga kena GIL), hasilnya digabung lagi.
+# predicate hasil compile_selection itu closure (ga bisa di-pickle), jadi yang dikirim ke worker
+# kondisinya (NormalizedCondition + tipe kolom) dan di-compile ulang di worker
+
+PARALLEL_MODES = ("process", "thread")
+# partisi per worker, biar worker yang selesai duluan bisa ambil partisi lain
+PARTITIONS_PER_WORKER = 4
+
+Filter = Tuple[NormalizedCondition, Optional[str]]
+
+
+def _process_context() -> multiprocessing.context.BaseContext:
+    # server jalan multi-thread, fork bisa nyalin lock yang lagi dipegang thread lain (worker deadlock).
+    # forkserver / spawn bikin worker dari proses bersih; forkserver ga ada di windows
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+class WorkerPool:
+    """Executor (process / thread) yang dibikin lazy waktu pertama dipakai dan di-share antar query."""
+
+    def __init__(self, degree: int, mode: str = "process") -> None:
+        if mode not in PARALLEL_MODES:
+            raise ValueError(f"parallel mode must be one of {PARALLEL_MODES}, got {mode!r}")
+        self.degree = degree
+        self.mode = mode
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.degree, mp_context=_process_context())
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.degree, thread_name_prefix="qp-parallel")
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+def partition_bounds(total: int, parts: int) -> List[Tuple[int, int]]:
+    """Bagi range [0, total) jadi maksimal `parts` potongan berurutan yang ukurannya hampir sama."""
+    parts = max(1, min(parts, total))
+    size, extra = divmod(total, parts)
+    bounds = []
+    start = 0
+    for index in range(parts):
+        end = start + size + (1 if index < extra else 0)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def filter_partition(rows: Sequence[Any], filters: Sequence[Filter]) -> List[Any]:
+    """Jalan di worker: compile kondisi lalu filter satu partisi."""
+    result: Any = rows
+    for condition, column_type in filters:
+        result = filter(compile_selection(condition, column_type), result)
+    return list(result)
+
+
+def parallel_filter(
+    pool: WorkerPool,
+    rows: Sequence[Any],
+    filters: Sequence[Filter],
+    ordered: bool = True,
+) -> Iterator[Any]:
+    """
+    Filter rows di worker pool. ordered=True: hasil keluar dengan urutan yang sama kaya filter serial;
+    ordered=False: partisi yang selesai duluan langsung di-yield.
+    """
+    bounds = partition_bounds(len(rows), pool.degree * PARTITIONS_PER_WORKER)
+    futures = [pool.executor.submit(filter_partition, rows[start:end], filters) for start, end in bounds]
+    try:
+        for future in (futures if ordered else as_completed(futures)):
+            yield from future.result()
+    finally:
+        # consumer berhenti duluan (misal LIMIT): partisi yang belum jalan ga usah dikerjain
+        for future in futures:
+            future.cancel()
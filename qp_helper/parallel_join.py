@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import os
+import pickle
+import shutil
+import tempfile
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+from typing import Any, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from qp_helper.external_sort import estimate_row_size
+from qp_helper.join_strategies import equi_join_key, hash_join
+from qp_helper.parallel import PARTITIONS_PER_WORKER, WorkerPool
+
+# radix-partitioned hash join: dua input di-partisi pakai hash key join ke N bucket
+# (N pangkat 2, index = hash(key) & (N - 1)), lalu tiap pasangan bucket di-join di worker pool.
+# row dengan key sama pasti masuk bucket yang sama, jadi bucket bisa di-join sendiri-sendiri.
+# bucket yang bikin total buffer lewat memory budget di-spill ke file, worker baca file-nya sendiri
+
+
+@dataclass(frozen=True)
+class JoinSpec:
+    """
+    Deskripsi equi-join yang bisa di-pickle (closure key function ga bisa dikirim ke process worker).
+    natural=True: key tuple value kolom yang sama, kolom kanan yang sama dibuang waktu combine.
+    natural=False: "left_col = right_col", key pakai equi_join_key dan row kanan yang ga punya
+    right_col dibandingin ke literal right_col (sama kaya nested loop).
+    """
+    left_columns: Tuple[str, ...]
+    right_columns: Tuple[str, ...]
+    natural: bool
+
+    def left_key(self, row: Any) -> Optional[Hashable]:
+        if not isinstance(row, dict):
+            return None
+        if self.natural:
+            return tuple(row.get(col) for col in self.left_columns)
+        column = self.left_columns[0]
+        if column not in row:
+            return None
+        return equi_join_key(row[column])
+
+    def right_key(self, row: Any) -> Optional[Hashable]:
+        if not isinstance(row, dict):
+            return None
+        if self.natural:
+            return tuple(row.get(col) for col in self.right_columns)
+        column = self.right_columns[0]
+        return equi_join_key(row[column] if column in row else column)
+
+    def combine(self, left_row: dict, right_row: dict) -> dict:
+        if not self.natural:
+            return {**left_row, **right_row}
+        combined = {**left_row}
+        for key, value in right_row.items():
+            if key not in self.left_columns:
+                combined[key] = value
+        return combined
+
+
+@dataclass(frozen=True)
+class PartitionSource:
+    rows: List[Any]             # bagian bucket yang masih di memory
+    path: Optional[str] = None  # bagian bucket yang udah di-spill (chunk pickle berurutan)
+
+    def load(self) -> List[Any]:
+        if self.path is None:
+            return self.rows
+        loaded: List[Any] = []
+        with open(self.path, "rb") as spill_file:
+            while True:
+                try:
+                    loaded.extend(pickle.load(spill_file))
+                except EOFError:
+                    break
+        loaded.extend(self.rows)
+        return loaded
+
+
+class PartitionSpool:
+    """Buffer row per bucket dengan memory budget; kalau lewat, bucket terbesar di-spill ke file."""
+
+    def __init__(self, partitions: int, memory_limit: int, spill_dir: "SpillDirectory", name: str) -> None:
+        self._buffers: List[List[Any]] = [[] for _ in range(partitions)]
+        self._sizes = [0] * partitions
+        self._paths: List[Optional[str]] = [None] * partitions
+        self._total = 0
+        self._memory_limit = memory_limit
+        self._spill_dir = spill_dir
+        self._name = name
+        self.spilled_partitions = 0
+
+    def add(self, index: int, row: Any) -> None:
+        self._buffers[index].append(row)
+        size = estimate_row_size(row)
+        self._sizes[index] += size
+        self._total += size
+        if self._total > self._memory_limit:
+            self._spill(max(range(len(self._sizes)), key=self._sizes.__getitem__))
+
+    def _spill(self, index: int) -> None:
+        if self._paths[index] is None:
+            self._paths[index] = self._spill_dir.path(f"{self._name}-{index}")
+            self.spilled_partitions += 1
+        with open(self._paths[index], "ab") as spill_file:
+            pickle.dump(self._buffers[index], spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._total -= self._sizes[index]
+        self._buffers[index] = []
+        self._sizes[index] = 0
+
+    def is_empty(self, index: int) -> bool:
+        return not self._buffers[index] and self._paths[index] is None
+
+    def source(self, index: int) -> PartitionSource:
+        return PartitionSource(rows=self._buffers[index], path=self._paths[index])
+
+
+class SpillDirectory:
+    """Temp directory yang baru dibikin waktu ada bucket pertama yang di-spill."""
+
+    def __init__(self, tmp_dir: Optional[str] = None) -> None:
+        self._tmp_dir = tmp_dir
+        self._directory: Optional[str] = None
+
+    def path(self, name: str) -> str:
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="qp-join-", dir=self._tmp_dir)
+        return os.path.join(self._directory, name)
+
+    def cleanup(self) -> None:
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+
+def partition_count(degree: int) -> int:
+    """Jumlah bucket: pangkat 2 terkecil >= degree * PARTITIONS_PER_WORKER."""
+    target = max(1, degree * PARTITIONS_PER_WORKER)
+    return 1 << (target - 1).bit_length()
+
+
+def join_partition(spec: JoinSpec, left: PartitionSource, right: PartitionSource) -> List[Any]:
+    """Jalan di worker: hash join satu pasangan bucket (build di sisi yang lebih kecil)."""
+    return list(hash_join(left.load(), right.load(), spec.left_key, spec.right_key, spec.combine))
+
+
+def parallel_hash_join(
+    pool: WorkerPool,
+    left_rows: Iterable[Any],
+    right_rows: Iterable[Any],
+    spec: JoinSpec,
+    memory_limit: int,
+    tmp_dir: Optional[str] = None,
+) -> Iterator[Any]:
+    """
+    Partisi dua input ke bucket lalu join tiap pasangan bucket di pool.
+    Hasil di-stream per bucket begitu selesai, jadi urutan row beda dengan hash join serial.
+    memory_limit dibagi dua untuk buffer bucket kiri dan kanan. Budget ini cuma buat buffer bucket:
+    kalau caller ngasih right_rows berupa list (QP selalu materialize input kanan), list itu tetap di memory.
+    """
+    partitions = partition_count(pool.degree)
+    mask = partitions - 1
+    spill_dir = SpillDirectory(tmp_dir)
+    futures = []
+    try:
+        left_spool = PartitionSpool(partitions, memory_limit // 2, spill_dir, "left")
+        right_spool = PartitionSpool(partitions, memory_limit // 2, spill_dir, "right")
+        for spool, rows, key_func in ((right_spool, right_rows, spec.right_key), (left_spool, left_rows, spec.left_key)):
+            for row in rows:
+                key = key_func(row)
+                if key is not None:
+                    spool.add(hash(key) & mask, row)
+
+        futures = [
+            pool.executor.submit(join_partition, spec, left_spool.source(index), right_spool.source(index))
+            for index in range(partitions)
+            if not left_spool.is_empty(index) and not right_spool.is_empty(index)
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        spill_dir.cleanup()
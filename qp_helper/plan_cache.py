@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set
+
+from qp_helper.lru_cache import LRUCache
+from qp_helper.query_utils import normalize_query
+
+
+@dataclass(frozen=True)
+class CachedPlan:
+    parsed_query: Any           # hasil parse_query / optimize_query (punya .query_tree)
+    tables: FrozenSet[str]      # nama tabel (lowercase) yang dibaca plan ini
+
+
+class PlanCache:
+    """
+    Cache hasil parse + optimize per query text yang udah dinormalisasi.
+    Key-nya (kind, normalized query); kind bedain plan yang di-optimize (SELECT)
+    sama yang cuma di-parse (UPDATE / DELETE).
+    Plan yang disimpan di-share antar eksekusi, jadi query tree-nya ga boleh dimutasi.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._cache: LRUCache[tuple, CachedPlan] = LRUCache(capacity)
+
+    def get(self, kind: str, query: str) -> Optional[Any]:
+        cached = self._cache.get((kind, normalize_query(query)))
+        return cached.parsed_query if cached is not None else None
+
+    def put(self, kind: str, query: str, parsed_query: Any, tables: Iterable[str]) -> None:
+        plan = CachedPlan(parsed_query=parsed_query, tables=frozenset(t.lower() for t in tables))
+        self._cache.put((kind, normalize_query(query)), plan)
+
+    def invalidate_table(self, table_name: str) -> int:
+        table = table_name.lower()
+        return self._cache.invalidate(lambda _key, plan: table in plan.tables)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+def describe_value(value: Any, _ancestors: Optional[Set[int]] = None) -> str:
+    """
+    Representasi stabil val node query tree (ga ada alamat memory kaya repr() object biasa),
+    dipakai buat fingerprint plan dan tampilan EXPLAIN.
+    Ga ada batas kedalaman (dua plan beda ga boleh dapat teks yang sama); referensi balik
+    ke object yang lagi di-describe (parent, dll) ditulis sebagai TypeName(<cycle>).
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return repr(value)
+    ancestors = _ancestors if _ancestors is not None else set()
+    if id(value) in ancestors:
+        return f"{type(value).__name__}(<cycle>)"
+    ancestors.add(id(value))
+    try:
+        if isinstance(value, (list, tuple)):
+            return "[" + ", ".join(describe_value(item, ancestors) for item in value) + "]"
+        if isinstance(value, dict):
+            items = sorted(value.items(), key=lambda kv: str(kv[0]))
+            return "{" + ", ".join(f"{key}: {describe_value(item, ancestors)}" for key, item in items) + "}"
+        attributes = getattr(value, "__dict__", None)
+        if attributes:
+            fields = ", ".join(
+                f"{key}={describe_value(item, ancestors)}"
+                for key, item in sorted(attributes.items())
+                if not key.startswith("_") and key != "parent"
+            )
+            return f"{type(value).__name__}({fields})"
+        return repr(value)
+    finally:
+        ancestors.discard(id(value))
+
+
+def plan_fingerprint(root: Any) -> str:
+    """Hash struktur + value query tree; plan yang sama (termasuk literal-nya) dapat fingerprint yang sama."""
+    digest = hashlib.sha1()
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if node is None:
+            digest.update(f"{depth}:None;".encode())
+            continue
+        digest.update(f"{depth}:{node.type}:{describe_value(node.val)};".encode())
+        for child in reversed(node.childs or []):
+            stack.append((child, depth + 1))
+    return digest.hexdigest()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import operator
+from typing import Any, Callable, Dict, Optional
+
+from qp_helper.condition_adapter import NormalizedCondition
+from qp_helper.schema_utils import NUMERIC_TYPES
+
+# compile kondisi sekali per query jadi callable, biar per row ga perlu
+# str() + float() literal + rantai if/elif operator lagi
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+}
+
+RowPredicate = Callable[[Any], bool]
+Comparator = Callable[[Any, Any], bool]
+
+
+def to_number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _never(row: Any) -> bool:
+    return False
+
+
+def compile_selection(condition: NormalizedCondition, column_type: Optional[str] = None) -> RowPredicate:
+    """
+    Compile kondisi SIGMA jadi predicate per row, semantics sama dengan filter lama:
+    - row harus dict dan punya kolomnya
+    - kalau value row dan literal dua-duanya angka -> compare numerik
+    - kalau salah satu bukan angka -> cuma "=" dan "!=" yang dibandingin sebagai string
+    - parameter prepared statement (condition.typed): string tetap string, None ga match apa-apa
+    column_type dari schema dipakai buat langsung float() value kolom numerik tanpa cek tipe dulu.
+    """
+    column = condition.column
+    literal = condition.value
+    compare = OPERATORS.get(condition.operator)
+    if compare is None:
+        return _never
+
+    if not condition.typed:
+        literal_num = to_number(literal)
+    elif literal is None:
+        # parameter NULL: perbandingan dengan NULL ga pernah true
+        return _never
+    elif type(literal) is str:
+        # parameter string selalu dibandingin sebagai string walaupun isinya kaya angka,
+        # dan row NULL ga ikut (bukan dibandingin sebagai teks "None")
+        if condition.operator not in ("=", "!="):
+            return _never
+
+        def match_parameter(row: Any) -> bool:
+            if not isinstance(row, dict) or row.get(column) is None:
+                return False
+            value = row[column]
+            return compare(value if type(value) is str else str(value), literal)
+
+        return match_parameter
+    else:
+        literal_num = to_number(literal)
+        if literal_num is None:
+            literal = str(literal)
+    string_op = condition.operator in ("=", "!=")
+
+    if literal_num is None:
+        # literal bukan angka: semua row jatuh ke perbandingan string
+        if not string_op:
+            return _never
+
+        def match_string(row: Any) -> bool:
+            if not isinstance(row, dict) or column not in row:
+                return False
+            value = row[column]
+            return compare(value if type(value) is str else str(value), literal)
+
+        return match_string
+
+    def fallback(value: Any) -> bool:
+        # value row bukan angka (atau bool/None yang str()-nya bukan angka)
+        as_str = value if type(value) is str else str(value)
+        try:
+            return compare(float(as_str), literal_num)
+        except ValueError:
+            return string_op and compare(as_str, literal)
+
+    if column_type in NUMERIC_TYPES:
+        def match_numeric_column(row: Any) -> bool:
+            if not isinstance(row, dict) or column not in row:
+                return False
+            value = row[column]
+            if type(value) is bool:
+                return fallback(value)
+            try:
+                return compare(float(value), literal_num)
+            except (TypeError, ValueError):
+                return fallback(value)
+
+        return match_numeric_column
+
+    def match(row: Any) -> bool:
+        if not isinstance(row, dict) or column not in row:
+            return False
+        value = row[column]
+        value_type = type(value)
+        if value_type is int or value_type is float:
+            return compare(float(value), literal_num)
+        return fallback(value)
+
+    return match
+
+
+def compile_comparison(op: str) -> Comparator:
+    """
+    Comparator dua value (dipakai join): numerik kalau dua-duanya bisa di-float-kan,
+    kalau ga dibandingin sebagai string untuk semua operator.
+    """
+    compare = OPERATORS.get(op)
+    if compare is None:
+        return lambda left, right: False
+
+    def comparator(left: Any, right: Any) -> bool:
+        try:
+            return compare(float(left), float(right))
+        except (ValueError, TypeError):
+            return compare(str(left), str(right))
+
+    return comparator
+
+
+COMPARATORS: Dict[str, Comparator] = {op: compile_comparison(op) for op in OPERATORS}
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import copy
+import re
+from typing import Any, Dict, List, Sequence, Tuple
+
+from qp_helper.condition_adapter import NormalizedCondition
+from qp_model.PreparedStatement import ParameterSlot
+
+# prepared statement: placeholder "?" diganti literal penanda sebelum di-parse optimizer,
+# lalu posisi penanda di query tree dicatat supaya waktu execute tinggal ditimpa value-nya
+
+_PARAM_MARKER = "__qp_param_{}__"
+_MARKER_PATTERN = re.compile(r"__qp_param_(\d+)__")
+# string literal atau placeholder di luar literal
+_LITERAL_OR_PLACEHOLDER = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|\?""")
+
+
+def replace_placeholders(query: str) -> Tuple[str, int]:
+    """Ganti tiap "?" (di luar string literal) dengan literal penanda, return (query baru, jumlah parameter)."""
+    count = 0
+
+    def substitute(match: re.Match) -> str:
+        nonlocal count
+        if match.group(1):
+            return match.group(1)
+        marker = "'" + _PARAM_MARKER.format(count) + "'"
+        count += 1
+        return marker
+
+    return _LITERAL_OR_PLACEHOLDER.sub(substitute, query), count
+
+
+def _marker_index(value: Any) -> int:
+    match = _MARKER_PATTERN.fullmatch(str(value).strip().strip("'\""))
+    return int(match.group(1)) if match else -1
+
+
+def find_parameter_slots(root: Any) -> List[ParameterSlot]:
+    """Cari semua penanda parameter di node SIGMA (kondisi) dan UPDATE (item SET)."""
+    slots: List[ParameterSlot] = []
+    stack: List[Tuple[Any, Tuple[int, ...]]] = [(root, ())]
+    while stack:
+        node, path = stack.pop()
+        if node is None:
+            continue
+        if node.type == "SIGMA":
+            if isinstance(node.val, str):
+                # penanda cuma dihitung kalau dia operand kondisinya (bukan nama kolom)
+                condition = NormalizedCondition.from_string(node.val)
+                index = _marker_index(condition.value) if condition else -1
+                if index >= 0:
+                    slots.append(ParameterSlot(path=path, kind="text", param_index=index))
+            elif hasattr(node.val, "value"):
+                index = _marker_index(node.val.value)
+                if index >= 0:
+                    slots.append(ParameterSlot(path=path, kind="condition", param_index=index))
+        elif node.type == "UPDATE" and isinstance(node.val, (list, tuple)):
+            for item_index, item in enumerate(node.val):
+                index = _marker_index(getattr(item, "value", None))
+                if index >= 0:
+                    slots.append(ParameterSlot(path=path, kind="update", param_index=index, item_index=item_index))
+        for child_index, child in enumerate(node.childs or []):
+            stack.append((child, path + (child_index,)))
+    return slots
+
+
+def _copy_path(root: Any, path: Tuple[int, ...], copies: Dict[Tuple[int, ...], Any]) -> Any:
+    # shallow copy node dari root sampai target, node lain tetap di-share dengan plan asli
+    if () not in copies:
+        copies[()] = copy.copy(root)
+        copies[()].childs = list(root.childs or [])
+    node = copies[()]
+    for depth in range(1, len(path) + 1):
+        prefix = path[:depth]
+        if prefix not in copies:
+            child = copy.copy(node.childs[path[depth - 1]])
+            child.childs = list(child.childs or [])
+            node.childs[path[depth - 1]] = child
+            copies[prefix] = child
+        node = copies[prefix]
+    return node
+
+
+def bind_parameters(root: Any, slots: Sequence[ParameterSlot], params: Sequence[Any]) -> Any:
+    """
+    Return query tree baru dengan value parameter terpasang. Cuma node di jalur
+    menuju placeholder yang di-copy, query tree asli (yang di-share) ga diubah.
+    """
+    if not slots:
+        return root
+    copies: Dict[Tuple[int, ...], Any] = {}
+    copied_update_lists = set()
+    for slot in slots:
+        node = _copy_path(root, slot.path, copies)
+        value = params[slot.param_index]
+        if slot.kind == "condition":
+            node.val = copy.copy(node.val)
+            node.val.value = value
+        elif slot.kind == "text":
+            # kondisi teks diganti NormalizedCondition dengan value parameter apa adanya,
+            # bukan di-splice balik ke teks, jadi quote / operator / None di value ga ngerusak kondisinya
+            condition = NormalizedCondition.from_string(node.val)
+            node.val = NormalizedCondition(column=condition.column, operator=condition.operator, value=value, typed=True)
+        elif slot.kind == "update":
+            if slot.path not in copied_update_lists:
+                node.val = list(node.val)
+                copied_update_lists.add(slot.path)
+            item = copy.copy(node.val[slot.item_index])
+            item.value = value
+            node.val[slot.item_index] = item
+    return copies[()]
+
+
+def parse_literal_list(text: str) -> List[Any]:
+    """
+    Parse list literal parameter, misal "17, 'Budi', 3.5" -> [17, "Budi", 3.5].
+    Literal berkutip jadi string, angka jadi int/float, NULL jadi None.
+    """
+    values: List[Any] = []
+    text = text.strip()
+    if text.startswith("(") and text.endswith(")"):
+        text = text[1:-1]
+    if not text.strip():
+        return values
+    for token in re.findall(r"""\s*('(?:[^']|'')*'|"(?:[^"]|"")*"|[^,]+)\s*(?:,|$)""", text):
+        token = token.strip()
+        if len(token) >= 2 and token[0] == token[-1] and token[0] in "'\"":
+            quote = token[0]
+            values.append(token[1:-1].replace(quote * 2, quote))
+        elif token.upper() == "NULL":
+            values.append(None)
+        else:
+            try:
+                values.append(int(token))
+            except ValueError:
+                try:
+                    values.append(float(token))
+                except ValueError:
+                    values.append(token)
+    return values
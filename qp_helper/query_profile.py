@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from qp_helper.external_sort import estimate_row_size
+from qp_helper.plan_cache import describe_value
+
+# EXPLAIN [ANALYZE] <query>
+_EXPLAIN_PATTERN = re.compile(r"(?is)^\s*EXPLAIN(\s+ANALYZE)?\s+(.+)$")
+
+# node yang lagi jalan di thread ini (di-set selama next() iterator node yang di-profile),
+# storage call yang terjadi di dalamnya dicatat ke node itu
+_active = threading.local()
+
+
+@dataclass
+class NodeStats:
+    node_id: int
+    parent_id: Optional[int]
+    depth: int
+    operator: str
+    detail: str
+    executed: bool = False      # False: node di-fuse ke parent (push-down), ga punya iterator sendiri
+    rows_out: int = 0
+    elapsed: float = 0.0        # inklusif child, termasuk waktu build pipeline node ini
+    storage_calls: int = 0
+    storage_rows: int = 0
+    storage_bytes: int = 0      # estimasi ukuran row yang dibalikin read_block
+
+
+class QueryProfile:
+    """
+    Statistik per node query tree untuk EXPLAIN ANALYZE.
+    Cuma dibikin kalau diminta, jadi eksekusi biasa ga bayar apa-apa selain cek `profile is None` per node.
+    """
+
+    def __init__(self, root: Any) -> None:
+        self.nodes: Dict[int, NodeStats] = {}
+        self._order: List[NodeStats] = []
+        stack: List[Tuple[Any, Optional[int], int]] = [(root, None, 0)]
+        while stack:
+            node, parent_id, depth = stack.pop()
+            if node is None:
+                continue
+            stats = NodeStats(
+                node_id=len(self._order) + 1,
+                parent_id=parent_id,
+                depth=depth,
+                operator=str(node.type),
+                detail=describe_value(node.val) if node.val not in (None, "") else "",
+            )
+            self.nodes[id(node)] = stats
+            self._order.append(stats)
+            stack.extend((child, stats.node_id, depth + 1) for child in reversed(node.childs or []))
+
+    def measure(self, node: Any, build: Callable[[], Iterator[Any]]) -> Iterator[Any]:
+        """Jalanin build() (bikin iterator node) lalu bungkus hasilnya biar waktu + row-nya kehitung."""
+        stats = self.nodes[id(node)]
+        stats.executed = True
+        previous = getattr(_active, "stats", None)
+        _active.stats = stats
+        start = time.perf_counter()
+        try:
+            rows = iter(build())
+        finally:
+            stats.elapsed += time.perf_counter() - start
+            _active.stats = previous
+        return self._count(stats, rows)
+
+    @staticmethod
+    def _count(stats: NodeStats, rows: Iterator[Any]) -> Iterator[Any]:
+        perf_counter = time.perf_counter
+        while True:
+            previous = getattr(_active, "stats", None)
+            _active.stats = stats
+            start = perf_counter()
+            try:
+                row = next(rows)
+            except StopIteration:
+                return
+            finally:
+                stats.elapsed += perf_counter() - start
+                _active.stats = previous
+            stats.rows_out += 1
+            yield row
+
+    def rows(self, analyze: bool) -> List[Dict[str, Any]]:
+        """Satu row per node (urutan pre-order), kolom statistik cuma ada kalau analyze."""
+        children: Dict[int, List[NodeStats]] = {}
+        for stats in self._order:
+            if stats.parent_id is not None:
+                children.setdefault(stats.parent_id, []).append(stats)
+
+        def inputs(stats: NodeStats) -> List[NodeStats]:
+            # child yang di-fuse ke node ini dilewati, input-nya diambil dari node executed terdekat di bawahnya
+            found = []
+            for kid in children.get(stats.node_id, []):
+                found.extend([kid] if kid.executed else inputs(kid))
+            return found
+
+        result = []
+        for stats in self._order:
+            row: Dict[str, Any] = {
+                "id": stats.node_id,
+                "parent": stats.parent_id,
+                "operator": "  " * stats.depth + stats.operator,
+                "detail": stats.detail,
+            }
+            if analyze:
+                executed = stats.executed
+                sources = inputs(stats) if executed else []
+                # node tanpa input executed (scan / SIGMA yang di-push ke storage) input-nya row dari read_block
+                rows_in = sum(source.rows_out for source in sources) if sources else stats.storage_rows
+                child_time = sum(source.elapsed for source in sources)
+                row.update({
+                    "executed": executed,
+                    "rows_in": rows_in if executed else None,
+                    "rows_out": stats.rows_out if executed else None,
+                    "time_ms": round(stats.elapsed * 1000, 3) if executed else None,
+                    "self_ms": round(max(stats.elapsed - child_time, 0.0) * 1000, 3) if executed else None,
+                    "storage_calls": stats.storage_calls,
+                    "storage_bytes": stats.storage_bytes,
+                })
+            result.append(row)
+        return result
+
+
+def is_profiling() -> bool:
+    """True kalau thread ini lagi jalanin node yang di-profile EXPLAIN ANALYZE."""
+    return getattr(_active, "stats", None) is not None
+
+
+def record_storage_read(rows: Any) -> None:
+    """Dipanggil tiap read_block ke storage manager; no-op kalau ga ada EXPLAIN ANALYZE yang jalan."""
+    stats = getattr(_active, "stats", None)
+    if stats is None:
+        return
+    stats.storage_calls += 1
+    if isinstance(rows, list):
+        stats.storage_rows += len(rows)
+        stats.storage_bytes += sum(estimate_row_size(row) for row in rows)
+
+
+def parse_explain(query: str) -> Optional[Tuple[bool, str]]:
+    """Return (analyze, query di dalamnya), atau None kalau bukan EXPLAIN."""
+    match = _EXPLAIN_PATTERN.match(query)
+    if not match:
+        return None
+    return match.group(1) is not None, match.group(2).strip()
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+# statistik query yang lagi jalan di thread ini. QP nyatet waktu per fase (parse / optimize) ke sini
+# tanpa harus tau siapa yang baca; kalau ga ada query yang di-track, timed_phase ga ngapa-ngapain
+_current = threading.local()
+
+
+@dataclass
+class QueryStats:
+    started: float = field(default_factory=time.perf_counter)
+    phases: Dict[str, float] = field(default_factory=dict)   # nama fase -> detik
+    rows_scanned: int = 0                                     # row yang dibaca dari tabel (storage / buffer cache)
+    plan: Any = None                                          # query tree terakhir yang dipakai query ini
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+def begin_query() -> QueryStats:
+    """Mulai tracking query baru di thread ini (query sebelumnya yang belum di-end ketimpa)."""
+    stats = QueryStats()
+    _current.stats = stats
+    return stats
+
+
+def resume_query(stats: QueryStats) -> None:
+    """Lanjut tracking query yang dieksekusi bertahap (iterator streaming) di thread yang sekarang."""
+    _current.stats = stats
+
+
+def end_query(stats: QueryStats) -> None:
+    if getattr(_current, "stats", None) is stats:
+        _current.stats = None
+
+
+def current_query() -> Optional[QueryStats]:
+    return getattr(_current, "stats", None)
+
+
+@contextmanager
+def timed_phase(name: str) -> Iterator[None]:
+    """Catat lama blok ini sebagai fase `name` query yang lagi di-track di thread ini."""
+    stats = getattr(_current, "stats", None)
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_phase(name, time.perf_counter() - start)
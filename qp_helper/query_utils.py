@@ -1,4 +1,5 @@
 from enum import Enum, auto
+import re
 
 class QueryType(Enum):
     """
@@ -11,6 +12,8 @@ class QueryType(Enum):
     INSERT_INTO = auto() # Bonus
     CREATE_TABLE = auto() # Bonus
     DROP_TABLE = auto() # Bonus
+    COPY = auto() # bulk load CSV
+    EXPLAIN = auto() # EXPLAIN [ANALYZE] SELECT ...
     
     # transaction queries
     BEGIN_TRANSACTION = auto()
@@ -28,6 +31,8 @@ DATA_QUERIES = {
     QueryType.INSERT_INTO,
     QueryType.CREATE_TABLE,
     QueryType.DROP_TABLE,
+    QueryType.COPY,
+    QueryType.EXPLAIN,
 }
 
 TRANSACTION_QUERIES = {
@@ -53,6 +58,10 @@ def get_query_type(query: str) -> QueryType:
         return QueryType.CREATE_TABLE
     elif q.startswith("DROP TABLE"):
         return QueryType.DROP_TABLE
+    elif q.startswith("COPY"):
+        return QueryType.COPY
+    elif q.startswith("EXPLAIN"):
+        return QueryType.EXPLAIN
     elif q.startswith("BEGIN TRANSACTION"):
         return QueryType.BEGIN_TRANSACTION
     elif q.startswith("SELECT"):
@@ -70,3 +79,40 @@ def get_query_type(query: str) -> QueryType:
     
     else:
         return QueryType.UNKNOWN
+
+# string literal ('...' / "...") atau whitespace di luar literal
+_LITERAL_OR_SPACE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|\s+""")
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize query text untuk dipakai sebagai cache key:
+    whitespace di luar string literal diringkas jadi satu spasi dan ';' di akhir dibuang.
+    Isi literal dan huruf besar/kecil ga diubah.
+    """
+    if not query:
+        return ""
+
+    normalized = _LITERAL_OR_SPACE.sub(lambda m: m.group(1) if m.group(1) else " ", query.strip())
+    return normalized.rstrip("; ").strip()
+
+# string literal atau ';' di luar literal
+_LITERAL_OR_SEMICOLON = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|;""")
+
+def split_statements(text: str) -> list:
+    """
+    Pecah batch "stmt1; stmt2; ..." jadi list statement (';' di dalam string literal ga dihitung).
+    Tiap statement tetap diakhiri ';', statement kosong dibuang.
+    """
+    statements = []
+    start = 0
+    for match in _LITERAL_OR_SEMICOLON.finditer(text):
+        if match.group(1):
+            continue
+        statement = text[start:match.start()].strip()
+        if statement:
+            statements.append(statement + ";")
+        start = match.end()
+    rest = text[start:].strip()
+    if rest:
+        statements.append(rest)
+    return statements
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from qp_helper.external_sort import estimate_row_size
+from qp_helper.lru_cache import LRUCache
+
+
+def copy_rows(rows: Iterable[Any]) -> List[Any]:
+    # row dict di-copy satu level (value-nya skalar), row non-dict dipakai apa adanya
+    return [dict(row) if isinstance(row, dict) else row for row in rows]
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    rows: Tuple[Any, ...]
+    # (tabel, versi) waktu query mulai dieksekusi; entry basi kalau ada versi yang udah naik
+    versions: Tuple[Tuple[str, int], ...]
+    size: int
+
+
+class ResultCache:
+    """
+    Cache hasil SELECT per plan fingerprint dengan budget byte (LRU).
+    Tiap tabel punya version counter yang dinaikin setiap QP nulis ke tabel itu;
+    entry yang dibuat dari versi lama otomatis ga dipakai lagi. Thread-safe.
+    Cache nyimpen copy row sendiri dan tiap hit dapat copy baru, jadi caller bebas mutasi row hasilnya.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._cache: LRUCache[Hashable, CachedResult] = LRUCache(max_bytes, weigher=lambda entry: entry.size)
+        self._versions: Dict[str, int] = {}
+        self._versions_lock = threading.Lock()
+
+    def snapshot(self, tables: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+        """Ambil versi tabel sebelum query dieksekusi, nanti dipakai waktu put()."""
+        with self._versions_lock:
+            return tuple(sorted((table.lower(), self._versions.get(table.lower(), 0)) for table in tables))
+
+    def get(self, fingerprint: Hashable) -> Optional[List[Any]]:
+        entry = self._cache.get(fingerprint)
+        if entry is None:
+            return None
+        if self.snapshot(table for table, _ in entry.versions) != entry.versions:
+            self._cache.pop(fingerprint)
+            return None
+        return copy_rows(entry.rows)
+
+    def put(self, fingerprint: Hashable, versions: Tuple[Tuple[str, int], ...], rows: List[Any]) -> bool:
+        # hasil yang versinya udah basi waktu selesai dieksekusi ga usah disimpan
+        if self.snapshot(table for table, _ in versions) != versions:
+            return False
+        size = sys.getsizeof(rows) + sum(estimate_row_size(row) for row in rows)
+        return self._cache.put(fingerprint, CachedResult(rows=tuple(copy_rows(rows)), versions=versions, size=size))
+
+    def bump(self, table_name: str) -> None:
+        """Dipanggil setiap ada write ke tabel: naikin versi dan buang entry yang baca tabel itu."""
+        table = table_name.lower()
+        with self._versions_lock:
+            self._versions[table] = self._versions.get(table, 0) + 1
+        self._cache.invalidate(lambda _key, entry: any(name == table for name, _ in entry.versions))
+
+    def table_version(self, table_name: str) -> int:
+        with self._versions_lock:
+            return self._versions.get(table_name.lower(), 0)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
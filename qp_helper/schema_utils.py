@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+# schema dari storage manager dibikin lewat add_attribute(name, type, size),
+# tapi cara baca baliknya beda-beda (method / attribute, dict / object / tuple),
+# jadi semua akses schema di QP lewat helper ini
+
+INTEGER_TYPES = {"int", "integer", "smallint", "bigint"}
+FLOAT_TYPES = {"float", "real", "double", "decimal", "numeric"}
+NUMERIC_TYPES = INTEGER_TYPES | FLOAT_TYPES
+
+
+def _attribute_entries(schema: Any) -> Any:
+    for getter in ("get_attributes", "get_columns"):
+        fn = getattr(schema, getter, None)
+        if callable(fn):
+            return fn()
+    for attr in ("attributes", "columns"):
+        entries = getattr(schema, attr, None)
+        if entries is not None:
+            return entries
+    return None
+
+
+def _entry_name_type(entry: Any) -> Optional[tuple]:
+    if isinstance(entry, dict):
+        name = entry.get("name")
+        col_type = entry.get("type")
+    elif isinstance(entry, (list, tuple)) and len(entry) >= 2:
+        name, col_type = entry[0], entry[1]
+    else:
+        name = getattr(entry, "name", None)
+        col_type = getattr(entry, "type", None)
+    if not name:
+        return None
+    return str(name), str(col_type or "").lower()
+
+
+def get_column_types(schema: Any) -> Optional[Dict[str, str]]:
+    """
+    Return {column_name: type} (type lowercase, tanpa size) sesuai urutan di schema,
+    atau None kalau schema ga ada / formatnya ga dikenal.
+    """
+    if schema is None:
+        return None
+    try:
+        entries = _attribute_entries(schema)
+        if entries is None:
+            return None
+        if isinstance(entries, dict):
+            entries = [{"name": name, "type": info.get("type") if isinstance(info, dict) else info} for name, info in entries.items()]
+        column_types: Dict[str, str] = {}
+        for entry in entries:
+            parsed = _entry_name_type(entry)
+            if parsed is None:
+                return None
+            name, col_type = parsed
+            column_types[name] = col_type.split("(", 1)[0].strip()
+        return column_types or None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def coerce_literal(value: str, column_type: str) -> Any:
+    """
+    Convert literal dari query ke tipe python sesuai tipe kolom.
+    Raise ValueError kalau literal ga cocok sama tipe kolomnya.
+    """
+    if column_type in INTEGER_TYPES:
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+    if column_type in FLOAT_TYPES:
+        return float(value)
+    return value
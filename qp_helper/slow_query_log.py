@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import queue
+import re
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from qp_helper.plan_cache import plan_fingerprint
+from qp_helper.query_profile import QueryProfile
+from qp_helper.query_utils import normalize_query
+
+try:
+    import resource
+except ImportError:  # resource cuma ada di Unix, peak memory dicatat None
+    resource = None
+
+# slow query log: query yang lebih lama dari threshold dicatat sebagai satu baris JSON.
+# thread query cuma masukin entry ke queue (ga pernah nunggu), format + tulis + rotasi file
+# dikerjain thread writer di background
+
+# ukuran file log maksimal sebelum di-rotate, dan jumlah file lama (log.1, log.2, ...) yang disimpan
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+# entry yang antri ke writer; kalau penuh entry baru dibuang (dihitung di dropped)
+DEFAULT_QUEUE_SIZE = 10_000
+
+# string literal atau angka (di luar identifier) -> diganti '?' buat fingerprint
+_FINGERPRINT_LITERAL = re.compile(r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])""")
+
+
+def query_fingerprint(query: str) -> str:
+    """Hash bentuk query: literal diganti '?', whitespace diringkas, case diabaikan. Query yang beda literal-nya doang dapat fingerprint sama."""
+    shape = _FINGERPRINT_LITERAL.sub("?", normalize_query(query)).lower()
+    return hashlib.sha1(shape.encode("utf-8")).hexdigest()[:16]
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident memory proses (bukan per query), None kalau ga didukung platform."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux ngasih KiB, macOS byte
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class SlowQueryEntry:
+    query: str
+    duration: float                             # detik
+    phases: Dict[str, float] = field(default_factory=dict)
+    rows_scanned: int = 0
+    rows_returned: int = 0
+    plan: Any = None                            # query tree (di-render di thread writer)
+    error: bool = False
+    peak_memory: Optional[int] = None
+    timestamp: datetime = field(default_factory=datetime.now)
+
+    def to_json_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "duration_ms": round(self.duration * 1000, 3),
+            "query": self.query,
+            "fingerprint": query_fingerprint(self.query),
+            "plan_fingerprint": plan_fingerprint(self.plan) if self.plan is not None else None,
+            "plan": QueryProfile(self.plan).rows(analyze=False) if self.plan is not None else None,
+            "phases_ms": {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()},
+            "rows_scanned": self.rows_scanned,
+            "rows_returned": self.rows_returned,
+            "peak_memory_bytes": self.peak_memory,
+            "error": self.error,
+        }
+
+
+class SlowQueryLog:
+    """File JSON lines untuk query yang durasinya >= threshold detik, ditulis thread background dan di-rotate per ukuran."""
+
+    def __init__(
+        self,
+        path: str,
+        threshold: float,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        self.path = path
+        self.threshold = threshold
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="qp-slow-log", daemon=True)
+        self._thread.start()
+
+    def is_slow(self, duration: float) -> bool:
+        return duration >= self.threshold
+
+    def submit(self, entry: SlowQueryEntry) -> None:
+        """Antriin entry tanpa nunggu; kalau writer ketinggalan jauh entry-nya dibuang."""
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Tulis semua entry yang masih antri lalu hentikan writer."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self) -> None:
+        log_file = None
+        try:
+            while True:
+                entry = self._queue.get()
+                if entry is None:
+                    return
+                try:
+                    line = (json.dumps(entry.to_json_dict(), default=str) + "\n").encode("utf-8")
+                    if log_file is None:
+                        log_file = self._open()
+                    if log_file.tell() > 0 and log_file.tell() + len(line) > self.max_bytes:
+                        log_file.close()
+                        self._rotate()
+                        log_file = self._open()
+                    log_file.write(line)
+                    # flush per entry biar log kebaca walaupun proses mati mendadak
+                    log_file.flush()
+                except Exception as e:
+                    print(f"Error writing slow query log: {e}")
+        finally:
+            if log_file is not None:
+                log_file.close()
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return open(self.path, "ab")
+
+    def _rotate(self) -> None:
+        # log -> log.1 -> log.2 ... file paling lama (log.<backup_count>) ketimpa
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
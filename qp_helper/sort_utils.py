@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import heapq
+from typing import Any, Callable, Iterable, List
+
+# urutan antar tipe biar sort ga raise waktu kolomnya campur (None/int/str):
+# angka < NaN < string < tipe lain (dibandingin via str) < None
+# None paling besar, jadi ASC -> NULL di akhir, DESC -> NULL di awal
+_RANK_NUMBER = 0
+_RANK_NAN = 1
+_RANK_STRING = 2
+_RANK_OTHER = 3
+_RANK_NONE = 4
+
+
+def sort_value_key(value: Any) -> tuple:
+    if value is None:
+        return (_RANK_NONE, 0)
+    value_type = type(value)
+    if value_type is int or value_type is float or value_type is bool:
+        if value != value:
+            return (_RANK_NAN, 0)
+        return (_RANK_NUMBER, value)
+    if value_type is str:
+        return (_RANK_STRING, value)
+    return (_RANK_OTHER, str(value))
+
+
+class _Descending:
+    # bungkus key supaya urutannya kebalik, dipakai untuk item ORDER BY ... DESC
+    __slots__ = ("key",)
+
+    def __init__(self, key: Any) -> None:
+        self.key = key
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.key < self.key
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.key == other.key
+
+
+def order_by_key(order_by: Any) -> Callable[[Any], tuple]:
+    """
+    Composite key untuk list OrderByItem (item.column.column, item.direction).
+    Satu kali sort stabil pakai key ini hasilnya sama dengan sort berulang per item dari belakang.
+    """
+    columns = []
+    for item in order_by:
+        columns.append((item.column.column, str(item.direction).upper() != "DESC"))
+
+    if all(ascending for _, ascending in columns):
+        names = [name for name, _ in columns]
+
+        def ascending_key(row: Any) -> tuple:
+            if not isinstance(row, dict):
+                return tuple(sort_value_key(None) for _ in names)
+            return tuple(sort_value_key(row.get(name)) for name in names)
+
+        return ascending_key
+
+    def mixed_key(row: Any) -> tuple:
+        values = row if isinstance(row, dict) else {}
+        return tuple(
+            sort_value_key(values.get(name)) if ascending else _Descending(sort_value_key(values.get(name)))
+            for name, ascending in columns
+        )
+
+    return mixed_key
+
+
+def top_n(rows: Iterable[Any], order_by: Any, n: int) -> List[Any]:
+    """
+    ORDER BY ... LIMIT n pakai bounded heap: O(len(rows) log n) waktu, O(n) memory.
+    Hasilnya sama persis dengan sorted(rows, key=order_by_key(order_by))[:n],
+    termasuk urutan row yang key-nya sama.
+    """
+    if n <= 0:
+        return []
+    return heapq.nsmallest(n, rows, key=order_by_key(order_by))
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import Any
+
+# kontrak write_block standar (IDataWrite) cuma satu row per INSERT (column=None, new_value=row dict)
+# dan satu kolom per UPDATE (column=nama kolom, new_value=value).
+# storage manager yang bisa nerima bentuk lain ngiklanin lewat atribut boolean di objeknya;
+# kalau atributnya ga ada, QP tetap pakai bentuk standar
+
+# INSERT banyak row dalam satu write_block: column=None, new_value=list row dict
+BATCH_WRITE = "supports_batch_write"
+# UPDATE banyak kolom dalam satu write_block: column=list nama kolom, new_value=dict kolom -> value
+MULTI_COLUMN_WRITE = "supports_multi_column_write"
+
+
+def supports(storage_manager: Any, capability: str) -> bool:
+    """True kalau storage manager ngeset atribut capability ke True."""
+    return getattr(storage_manager, capability, False) is True
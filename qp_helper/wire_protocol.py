@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import struct
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from qp_model.ExecutionResult import ExecutionResult
+from qp_model.Rows import Rows
+
+try:
+    import msgpack
+except ImportError:  # msgpack opsional, fallback ke JSON
+    msgpack = None
+
+# protokol binary: tiap frame = [kind: 1 byte][codec: 1 byte][panjang payload: uint32 big-endian][payload]
+# satu result = frame HEADER, nol atau lebih frame BATCH (row), lalu satu frame TRAILER
+FRAME_HEADER = ord("H")
+FRAME_BATCH = ord("B")
+FRAME_TRAILER = ord("T")
+
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+DEFAULT_CODEC = CODEC_MSGPACK if msgpack is not None else CODEC_JSON
+
+FRAME_PREFIX = struct.Struct(">BBI")
+# jumlah row per frame BATCH
+DEFAULT_BATCH_ROWS = 1000
+
+
+def encode_payload(value: Any, codec: int) -> bytes:
+    if codec == CODEC_MSGPACK:
+        return msgpack.packb(value, default=str, use_bin_type=True)
+    return json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def decode_payload(payload: bytes, codec: int) -> Any:
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise ValueError("received a msgpack frame but msgpack is not installed")
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload.decode("utf-8"))
+
+
+def encode_frame(kind: int, value: Any, codec: int = DEFAULT_CODEC) -> bytes:
+    payload = encode_payload(value, codec)
+    return FRAME_PREFIX.pack(kind, codec, len(payload)) + payload
+
+
+def read_frame(read_exactly: Callable[[int], bytes]) -> Tuple[int, Any]:
+    """Baca satu frame; read_exactly(n) harus return tepat n byte (raise kalau koneksi putus)."""
+    kind, codec, length = FRAME_PREFIX.unpack(read_exactly(FRAME_PREFIX.size))
+    return kind, decode_payload(read_exactly(length), codec)
+
+
+def _plain(value: Any) -> Any:
+    # object non-dict (misal model dari storage manager) dikirim sebagai dict atribut, sama kaya to_json_dict
+    return value.__dict__ if hasattr(value, "__dict__") else value
+
+
+def _encode_row(row: Any, columns: Optional[List[str]]) -> Any:
+    # row dict yang kolomnya sama dengan header cukup dikirim value-nya (urutan kolom header)
+    if columns is not None and isinstance(row, dict) and len(row) == len(columns) and all(col in row for col in columns):
+        return [row[col] for col in columns]
+    return _plain(row)
+
+
+def decode_rows(batch: List[Any], columns: Optional[List[str]]) -> List[Any]:
+    """Balikin row dari frame BATCH ke bentuk dict (kebalikan _encode_row)."""
+    if columns is None:
+        return batch
+    return [dict(zip(columns, row)) if isinstance(row, list) else row for row in batch]
+
+
+def result_frames(
+    result: ExecutionResult,
+    rows: Optional[Iterable[Any]] = None,
+    codec: int = DEFAULT_CODEC,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    statement_id: Optional[int] = None,
+) -> Iterator[bytes]:
+    """
+    Encode ExecutionResult jadi frame HEADER, BATCH..., TRAILER.
+    Kalau rows dikasih (iterator SELECT streaming), row diambil dari situ bukan dari result.data,
+    jadi frame pertama udah bisa dikirim sebelum query selesai. Error di tengah iterasi
+    dilaporkan di TRAILER (message "Error: ..." dan data -1).
+    statement_id (kalau ada) ikut di HEADER dan TRAILER supaya client bisa cocokin response pipelining.
+    """
+    if rows is None and isinstance(result.data, Rows):
+        rows = result.data.data
+    iterator = iter(rows) if rows is not None else iter(())
+
+    message = result.message
+    data = None if rows is not None else result.data
+    rows_count = 0
+    try:
+        first = next(iterator, None) if rows is not None else None
+    except Exception as e:
+        first, message, data = None, f"Error: {e}", -1
+
+    columns = list(first.keys()) if isinstance(first, dict) else None
+    yield encode_frame(FRAME_HEADER, {"statement_id": statement_id, "query": result.query, "columns": columns}, codec)
+
+    if first is not None:
+        batch = [_encode_row(first, columns)]
+        try:
+            for row in iterator:
+                batch.append(_encode_row(row, columns))
+                if len(batch) >= batch_rows:
+                    rows_count += len(batch)
+                    yield encode_frame(FRAME_BATCH, batch, codec)
+                    batch = []
+        except Exception as e:
+            message, data = f"Error: {e}", -1
+        if batch:
+            rows_count += len(batch)
+            yield encode_frame(FRAME_BATCH, batch, codec)
+
+    yield encode_frame(FRAME_TRAILER, {
+        "statement_id": statement_id,
+        "transaction_id": result.transaction_id,
+        "timestamp": result.timestamp.isoformat() if result.timestamp else None,
+        "message": message,
+        "rows_count": rows_count,
+        "data": data,
+    }, codec)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+import threading
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Iterator, List, Optional
+
+@dataclass
+class Cursor:
+    name: str
+    query: str
+    rows: Iterator[Any]      # pipeline SELECT yang di-suspend, row di-pull tiap FETCH
+    fetched: int = 0
+    exhausted: bool = False
+    last_used: float = field(default_factory=time.monotonic)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def fetch(self, count: Optional[int]) -> List[Any]:
+        """Ambil maksimal count row berikutnya (None = semua sisa row)"""
+        with self.lock:
+            self.last_used = time.monotonic()
+            if self.exhausted:
+                return []
+            try:
+                batch = list(islice(self.rows, count))
+            except Exception:
+                self._release()
+                raise
+            self.fetched += len(batch)
+            if count is None or len(batch) < count:
+                self._release()
+            return batch
+
+    def close(self, blocking: bool = True) -> bool:
+        """Hentikan pipeline (generator di-close); return False kalau lagi dipakai FETCH dan blocking=False"""
+        if not self.lock.acquire(blocking):
+            return False
+        try:
+            self._release()
+        finally:
+            self.lock.release()
+        return True
+
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_used
+
+    def _release(self) -> None:
+        self.exhausted = True
+        close = getattr(self.rows, "close", None)
+        if close is not None:
+            close()
+        self.rows = iter(())
@@ -0,0 +1,19 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, List, Tuple
+
+@dataclass(frozen=True)
+class ParameterSlot:
+    path: Tuple[int, ...]   # index child dari root sampai node yang punya placeholder
+    kind: str               # "condition" (ConditionNode.value), "text" (kondisi string), "update" (SET item)
+    param_index: int
+    item_index: int = -1    # index item SET untuk kind "update"
+
+@dataclass
+class PreparedStatement:
+    statement_id: str
+    query: str
+    query_type: Any          # QueryType
+    param_count: int
+    parsed_query: Any        # hasil parse / optimize dengan placeholder, ga pernah dimutasi
+    slots: List[ParameterSlot] = field(default_factory=list)